@@ -0,0 +1,133 @@
+# bench/fault_bench.py
+"""
+Interview turns under injected upstream faults (bench/stubs.py --faults):
+turn latency, HTTP errors, how many questions fell back to the ungrounded
+template, and the upstream layer's breaker/retry/hedge counters per scenario.
+
+  baseline      no faults
+  slow_tail     5% of embeddings / Qdrant searches stall (hedging off, then on)
+  embed_down    every embedding call fails: the breaker opens, turns keep the retrieval
+                prepared for their target (or fall back) without waiting on the upstream
+  chat_down     every chat call fails
+  recovery      faults cleared after the breaker cooldown: grounded questions again
+
+Retrieval is forced through Qdrant (SESSION_CONTEXT_MAX_POINTS=0) so search
+faults are on the path, and the embedding cache is cleared before each
+scenario so query embeddings go to the (faulty) upstream.
+
+  python bench/fault_bench.py --sessions 20 --turns 5
+"""
+import argparse, asyncio, json, os, random, sys, tempfile, time
+from typing import Any, Dict, List
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+from run_bench import start_stubs, configure_env, percentiles  # noqa: E402
+
+FALLBACK_PREFIXES = ("Staying on ", "Could you briefly walk me through")
+
+SCENARIOS = [
+    ("baseline", "", {}),
+    ("slow_tail", "embed=slow:0.05:1500,qdrant=slow:0.05:800", {"hedge": False}),
+    ("slow_tail_hedged", "embed=slow:0.05:1500,qdrant=slow:0.05:800", {"hedge": True}),
+    ("embed_down", "embed=down", {}),
+    ("chat_down", "chat=down", {}),
+    ("recovery", "", {"wait_cooldown": True}),
+]
+
+async def run_turns(app, *, sessions: int, concurrency: int, turns: int, seed: int) -> Dict[str, Any]:
+    import httpx
+    from data.content import RESUMES
+    pairs = list(RESUMES)
+    rng = random.Random(seed)
+    turn_ms: List[float] = []
+    errors: List[str] = []
+    answered = fallback = 0
+    sem = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=120) as c:
+        async def interview(i: int):
+            nonlocal answered, fallback
+            name, role = pairs[i % len(pairs)]
+            async with sem:
+                r = await c.post("/startup_interview", json={"candidate_name": name, "role": role})
+                if r.status_code != 200:
+                    errors.append(f"startup:{r.status_code}")
+                    return
+                sid = r.json()["session_id"]
+                await c.post("/transcribe", data={"session_id": sid}, files={"file": ("ready.webm", b"0" * 8000, "audio/webm")})
+                for _ in range(turns):
+                    audio = os.urandom(rng.randrange(20_000, 200_000))  # distinct transcript per answer
+                    t0 = time.perf_counter()
+                    r = await c.post("/transcribe", data={"session_id": sid},
+                                     files={"file": ("answer.webm", audio, "audio/webm")})
+                    turn_ms.append((time.perf_counter() - t0) * 1000)
+                    if r.status_code != 200:
+                        errors.append(f"turn:{r.status_code}")
+                        continue
+                    answered += 1
+                    fallback += r.json()["ai_question"]["question"].startswith(FALLBACK_PREFIXES)
+
+        await asyncio.gather(*[interview(i) for i in range(sessions)])
+    return {"turn_latency_ms": percentiles(turn_ms), "errors": len(errors), "answered": answered,
+            "fallback_share": round(fallback / answered, 3) if answered else None}
+
+COUNTS = ("calls", "failed", "short_circuited", "retries", "hedges", "hedge_wins", "opened")
+
+def degraded_counts() -> Dict[str, float]:
+    import metrics
+    with metrics._lock:
+        return {dict(labels)["stage"]: v for (name, labels), v in metrics._counters.items() if name == "degraded_total"}
+
+async def run_scenarios(app, args) -> Dict[str, Any]:
+    import httpx, embeddings, upstream
+    out: Dict[str, Any] = {}
+    wanted = args.scenarios.split(",")
+    for i, (name, faults, opts) in enumerate(s for s in SCENARIOS if s[0] in wanted):
+        httpx.post(f"http://127.0.0.1:{args.port}/_faults", json={"spec": faults})
+        upstream.UPSTREAM_HEDGE = opts.get("hedge", True)
+        if opts.get("wait_cooldown"):
+            await asyncio.sleep(args.cooldown)
+        embeddings._mem.clear()  # answers repeat across scenarios; keep query embeddings on the wire
+        before, degraded = upstream.state(), degraded_counts()
+        t0 = time.perf_counter()
+        run = await run_turns(app, sessions=args.sessions, concurrency=args.concurrency, turns=args.turns, seed=i)
+        after = upstream.state()
+        out[name] = {"faults": faults, "wall_s": round(time.perf_counter() - t0, 2), **run,
+                     "degraded": {k: v - degraded.get(k, 0) for k, v in degraded_counts().items() if v > degraded.get(k, 0)},
+                     "breakers": {kind: s["state"] for kind, s in after.items()},
+                     "upstream": {kind: {k: s[k] - before.get(kind, {}).get(k, 0) for k in COUNTS}
+                                  for kind, s in after.items()}}
+        print(f"{name}: {json.dumps(run['turn_latency_ms'])} fallback={run['fallback_share']} "
+              f"errors={run['errors']}", file=sys.stderr)
+    return out
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sessions", type=int, default=20)
+    ap.add_argument("--concurrency", type=int, default=10)
+    ap.add_argument("--turns", type=int, default=5)
+    ap.add_argument("--scenarios", default=",".join(n for n, _, _ in SCENARIOS))
+    ap.add_argument("--port", type=int, default=8768)
+    ap.add_argument("--latency", default="embed=40,chat=300,transcribe=100,qdrant=5")
+    ap.add_argument("--cooldown", type=float, default=2.0, help="UPSTREAM_BREAKER_COOLDOWN for the run")
+    args = ap.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="intervuum-faults-")
+    stubs = start_stubs(args.port, args.latency, 0.2)
+    report: Dict[str, Any] = {"config": vars(args)}
+    try:
+        configure_env(args.port, workdir, "qdrant")
+        os.environ.update({"SESSION_CONTEXT_MAX_POINTS": "0", "UPSTREAM_BREAKER_COOLDOWN": str(args.cooldown),
+                           "PREWARM_ARTIFACTS": "0"})
+        import main as app_main
+        app_main.brain_prepare_worker()
+        # One event loop for every scenario: the shared async clients' pools belong to it
+        report["scenarios"] = asyncio.run(run_scenarios(app_main.app, args))
+    finally:
+        stubs.terminate()
+        stubs.wait()
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
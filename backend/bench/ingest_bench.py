@@ -0,0 +1,68 @@
+# bench/ingest_bench.py
+"""
+Bulk indexing throughput (docs/sec) for a synthetic resume corpus: the
+per-document path behind index_all_content (vectorstore.upsert_document, one
+embedding request per document, run serially) versus core/ingest.py (token
+chunking, packed embedding requests, bounded concurrency, batched upserts).
+Embeddings come from the stub server in bench/stubs.py; each mode embeds its
+own texts so the embedding cache does not favour the second run.
+
+  python bench/ingest_bench.py --docs 1000 --latency embed=80
+  python bench/ingest_bench.py --docs 5000 --skip-serial --concurrency 8
+"""
+import argparse, json, os, sys, tempfile, time
+from typing import Any, Dict, Iterator
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+from run_bench import start_stubs, configure_env  # noqa: E402
+
+SKILLS = ["Kafka", "Spark", "Airflow", "dbt", "Snowflake", "Flink", "Postgres", "Kubernetes", "Terraform", "Python"]
+
+def corpus(n: int, tag: str, seed: int = 0) -> Iterator[Dict[str, Any]]:
+    """Resumes of 3-60 sentences, so documents span one to several chunks."""
+    rng = np.random.default_rng(seed)
+    for i in range(n):
+        lines = [f"{tag} candidate {i} built {rng.choice(SKILLS)} pipelines handling {rng.integers(1, 900)}K events/sec "
+                 f"and cut cost by {rng.integers(5, 60)}% using {rng.choice(SKILLS)}." for _ in range(rng.integers(3, 60))]
+        yield {"doc_id": f"resume::{tag}{i}::Data Engineer", "text": "\n".join(lines),
+               "meta": {"dtype": "resume", "role": "Data Engineer", "candidate_name": f"{tag}{i}"}}
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--docs", type=int, default=1000)
+    ap.add_argument("--concurrency", type=int, default=4, help="INGEST_CONCURRENCY")
+    ap.add_argument("--window-docs", type=int, default=256)
+    ap.add_argument("--skip-serial", action="store_true")
+    ap.add_argument("--backend", default="local", choices=["local", "qdrant"])
+    ap.add_argument("--port", type=int, default=8767)
+    ap.add_argument("--latency", default="embed=80,qdrant=3")
+    args = ap.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="intervuum-ingest-")
+    stubs = start_stubs(args.port, args.latency, 0.0)
+    report: Dict[str, Any] = {"config": vars(args)}
+    try:
+        configure_env(args.port, workdir, args.backend)
+        import ingest, vectorstore
+        from embeddings import cache_stats
+        vectorstore.ensure_collection()
+        if not args.skip_serial:
+            t0 = time.perf_counter()
+            chunks = sum(vectorstore.upsert_document(**d) for d in corpus(args.docs, "s"))
+            secs = time.perf_counter() - t0
+            report["serial"] = {"docs": args.docs, "chunks": chunks, "seconds": round(secs, 2),
+                                "docs_per_sec": round(args.docs / secs, 2)}
+        report["pipeline"] = ingest.ingest(corpus(args.docs, "p"), concurrency=args.concurrency,
+                                           window_docs=args.window_docs)
+        report["points"] = vectorstore.count_points()
+        report["embed_cache"] = cache_stats()
+    finally:
+        stubs.terminate()
+        stubs.wait()
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
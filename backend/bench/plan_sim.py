@@ -0,0 +1,62 @@
+# bench/plan_sim.py
+"""
+Interview plans (core/scheduler.py) replayed at different paces: candidates
+answering faster or slower than INTERVIEW_TURN_SECONDS, and a generator that
+sometimes switches dimension. Reports questions asked and the difficulty
+sequence per run, and exits non-zero if a question in the last third of an
+interview (or of the plan still ahead at any point) is "easy".
+
+  python bench/plan_sim.py --minutes 30,60 --turn-s 120,240,480
+"""
+import argparse, json, os, random, sys
+from typing import Any, Dict, List
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BACKEND = os.path.dirname(HERE)
+sys.path[:0] = [BACKEND, os.path.join(BACKEND, "core")]
+
+def simulate(rubric: str, minutes: int, turn_s: float, switch: float, seed: int) -> Dict[str, Any]:
+    import scheduler
+    rng = random.Random(seed)
+    plan = scheduler.build_plan(rubric, minutes)
+    coverage: Dict[str, int] = {}
+    asked: List[tuple] = []
+    violations: List[str] = []
+    elapsed = 0.0
+    while elapsed < minutes * 60:
+        tgt = scheduler.next_target(plan, coverage)
+        dim = rng.choice(plan["dimensions"]) if rng.random() < switch else tgt["dimension"]
+        coverage[dim] = coverage.get(dim, 0) + 1
+        asked.append((dim, tgt["difficulty"]))
+        elapsed += turn_s * rng.uniform(0.8, 1.2)
+        scheduler.advance(plan, coverage, dim, elapsed)
+        targets = plan["targets"]
+        violations += [f"plan slot {j}/{len(targets)} easy after question {len(asked)}"
+                       for j in range(plan["done"], len(targets))
+                       if targets[j]["difficulty"] == "easy" and scheduler._late(j, len(targets))]
+    violations += [f"question {i + 1}/{len(asked)} easy" for i, (_, d) in enumerate(asked)
+                   if d == "easy" and scheduler._late(i, len(asked))]
+    return {"minutes": minutes, "turn_s": turn_s, "seed": seed, "questions": len(asked),
+            "difficulties": "".join(d[0] for _, d in asked), "violations": violations[:5]}
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--minutes", default="15,30,60")
+    ap.add_argument("--turn-s", default="60,120,240,480", help="seconds per question actually taken")
+    ap.add_argument("--switch", type=float, default=0.2, help="chance the generator picks another dimension")
+    ap.add_argument("--seeds", type=int, default=20)
+    args = ap.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "sk-sim")
+    os.environ.setdefault("VECTOR_BACKEND", "local")
+    from data.content import RUBRICS
+    rubric = next(iter(RUBRICS.values()), None)
+    runs = [simulate(rubric, int(m), float(t), args.switch, seed)
+            for m in args.minutes.split(",") for t in args.turn_s.split(",") for seed in range(args.seeds)]
+    bad = [r for r in runs if r["violations"]]
+    examples = bad[:5] or [r for r in runs if r.get("seed") == 0]
+    print(json.dumps({"runs": len(runs), "violating_runs": len(bad), "examples": examples}, indent=2))
+    sys.exit(1 if bad else 0)
+
+if __name__ == "__main__":
+    main()
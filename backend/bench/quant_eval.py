@@ -0,0 +1,125 @@
+# bench/quant_eval.py
+"""
+Retrieval quality of reduced-dimension and quantized vectors against the
+full-precision baseline. Every configuration indexes the same points in a
+temporary LocalBackend and answers the same queries; the report gives
+overlap@k with the baseline top-k, top-1 agreement, index RAM, per-query
+payload size and search latency.
+
+Shortened text-embedding-3 vectors are the leading components of the full
+vector, renormalized, so dimensions are evaluated by truncating the stored
+vectors (no re-embedding). Quantization is the same scheme the local backend
+uses (Qdrant's int8/binary differ in detail but select candidates the same way).
+
+  # points from the configured vector store, queries = resume/rubric lines embedded live
+  python bench/quant_eval.py --queries-file queries.txt --dims 3072,1024,256 --quant none,int8,binary
+  # offline: clustered synthetic vectors, queries = perturbed points
+  python bench/quant_eval.py --synthetic 20000 --dims 3072,512 --oversampling 1,3
+"""
+import argparse, itertools, json, os, sys, tempfile, time
+from typing import Any, Dict, List
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BACKEND = os.path.dirname(HERE)
+sys.path[:0] = [BACKEND, os.path.join(BACKEND, "core")]
+
+def synthetic(n: int, dim: int, seed: int):
+    """Topic clusters with decaying per-dimension variance (like real embeddings, unlike white noise)."""
+    rng = np.random.default_rng(seed)
+    spread = np.exp(-np.arange(dim) / (dim / 4)).astype(np.float32)
+    centers = rng.standard_normal((max(8, n // 100), dim)).astype(np.float32) * spread
+    x = centers[rng.integers(0, len(centers), n)] + 0.8 * rng.standard_normal((n, dim)).astype(np.float32) * spread
+    return [{"doc_id": f"doc{i // 4}", "chunk_idx": i % 4} for i in range(n)], x
+
+def stored_points(limit: int):
+    from vectorstore import scroll_points
+    pts = scroll_points(limit=limit)[:limit]
+    if not pts:
+        sys.exit("vector store is empty: index content first or use --synthetic")
+    return [p for p, _ in pts], np.asarray([v for _, v in pts], dtype=np.float32)
+
+def make_queries(args, x: np.ndarray) -> np.ndarray:
+    if args.queries_file:
+        from embeddings import embed_texts
+        with open(args.queries_file, encoding="utf-8") as f:
+            texts = [t.strip() for t in f if t.strip()][:args.queries]
+        return np.asarray(embed_texts(texts), dtype=np.float32)
+    rng = np.random.default_rng(args.seed + 1)
+    picked = x[rng.integers(0, len(x), args.queries)]
+    scale = np.linalg.norm(picked, axis=1, keepdims=True) / np.sqrt(x.shape[1])
+    return picked + 0.5 * scale * rng.standard_normal(picked.shape).astype(np.float32)
+
+def truncate(v: np.ndarray, dim: int) -> np.ndarray:
+    v = v[:, :dim]
+    return v / np.maximum(np.linalg.norm(v, axis=1, keepdims=True), 1e-12)
+
+def evaluate(payloads, x, q, *, dim: int, quant: str, oversampling: float, k: int, repeats: int) -> Dict[str, Any]:
+    from local_backend import LocalBackend
+    b = LocalBackend(path=tempfile.mkdtemp(prefix="quant-eval-"), collection="eval", size=dim,
+                     quantization=quant, oversampling=oversampling)
+    xv = truncate(x, dim)
+    for i in range(0, len(xv), 4096):
+        b.upsert([(str(j), xv[j], {**payloads[j], "row": j}) for j in range(i, min(i + 4096, len(xv)))])
+    qv = truncate(q, dim).tolist()
+    b.search(qv[:1], top_k=k)  # warm-up
+    times, hits = [], None
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        hits = b.search(qv, top_k=k)
+        times.append((time.perf_counter() - t0) * 1000 / len(qv))
+    if b._codes is not None:  # codes are allocated to capacity; count the used rows
+        ram = (b._codes.codes.nbytes + b._codes.scale.nbytes) * len(xv) // b._cap
+    else:
+        ram = len(xv) * dim * 4
+    return {"ids": [[p["row"] for p, _ in h] for h in hits],
+            "index_ram_bytes": int(ram),
+            "query_json_bytes": len(json.dumps(qv[0])),
+            "ms_per_query": round(sorted(times)[len(times) // 2], 3)}
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--synthetic", type=int, default=0, help="N synthetic points instead of the vector store")
+    ap.add_argument("--synthetic-dim", type=int, default=3072)
+    ap.add_argument("--limit", type=int, default=50000, help="max points read from the vector store")
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--queries-file", default=None, help="one query text per line (embedded with EMBED_MODEL)")
+    ap.add_argument("--dims", default="", help="comma-separated; default: the full dimension only")
+    ap.add_argument("--quant", default="none,int8,binary")
+    ap.add_argument("--oversampling", default="3", help="comma-separated QUANT_OVERSAMPLING values")
+    ap.add_argument("--top-k", type=int, default=8)
+    ap.add_argument("--repeats", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    if args.synthetic:
+        os.environ.setdefault("VECTOR_BACKEND", "local")
+        payloads, x = synthetic(args.synthetic, args.synthetic_dim, args.seed)
+    else:
+        payloads, x = stored_points(args.limit)
+    q = make_queries(args, x)
+    full = x.shape[1]
+    dims = [int(d) for d in args.dims.split(",")] if args.dims else [full]
+    if any(d > full for d in dims):
+        sys.exit(f"--dims must be <= {full}")
+
+    base = evaluate(payloads, x, q, dim=full, quant="none", oversampling=1.0, k=args.top_k, repeats=args.repeats)
+    rows: List[Dict[str, Any]] = []
+    for dim, quant, over in itertools.product(dims, args.quant.split(","), [float(o) for o in args.oversampling.split(",")]):
+        if quant == "none" and over != float(args.oversampling.split(",")[0]):
+            continue  # oversampling only matters for quantized search
+        r = base if (dim, quant) == (full, "none") else evaluate(payloads, x, q, dim=dim, quant=quant,
+                                                                  oversampling=over, k=args.top_k, repeats=args.repeats)
+        overlap = [len(set(a) & set(b)) / len(a) for a, b in zip(base["ids"], r["ids"]) if a]
+        rows.append({"dims": dim, "quantization": quant, "oversampling": over if quant != "none" else None,
+                     f"overlap@{args.top_k}": round(float(np.mean(overlap)), 4),
+                     "top1_agreement": round(float(np.mean([a[:1] == b[:1] for a, b in zip(base["ids"], r["ids"])])), 4),
+                     "index_ram_bytes": r["index_ram_bytes"],
+                     "ram_vs_baseline": round(r["index_ram_bytes"] / base["index_ram_bytes"], 4),
+                     "query_json_bytes": r["query_json_bytes"],
+                     "ms_per_query": r["ms_per_query"]})
+    print(json.dumps({"points": len(x), "queries": len(q), "full_dims": full, "top_k": args.top_k, "results": rows}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+# bench/run_bench.py
+"""
+Offline throughput/latency benchmark for the full interview loop:
+/startup_interview -> /transcribe x N, driven concurrently through main.app
+(in-process ASGI) against the stub upstreams in bench/stubs.py (run in a
+subprocess). Writes a JSON report to bench/results/ (git-ignored; --out for
+another directory) so hot-path regressions show up between versions.
+
+  python bench/run_bench.py --sessions 50 --concurrency 25 --turns 6
+"""
+import argparse, asyncio, json, os, statistics, subprocess, sys, tempfile, time
+from typing import Any, Dict, List
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BACKEND = os.path.dirname(HERE)
+
+def percentiles(xs: List[float]) -> Dict[str, float]:
+    if not xs:
+        return {}
+    xs = sorted(xs)
+    pick = lambda q: xs[min(len(xs) - 1, int(round(q * (len(xs) - 1))))]
+    return {"p50": round(pick(0.50), 2), "p95": round(pick(0.95), 2), "p99": round(pick(0.99), 2),
+            "mean": round(statistics.fmean(xs), 2), "n": len(xs)}
+
+def _git_rev() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND, text=True).strip()
+    except Exception:
+        return "unknown"
+
+def start_stubs(port: int, latency: str, jitter: float) -> subprocess.Popen:
+    proc = subprocess.Popen([sys.executable, os.path.join(HERE, "stubs.py"), "--port", str(port),
+                             "--latency", latency, "--jitter", str(jitter)])
+    import httpx
+    for _ in range(100):
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/_stats", timeout=0.5)
+            return proc
+        except Exception:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("stub server did not start")
+
+def configure_env(port: int, workdir: str, vector_backend: str) -> None:
+    # Must happen before importing main/config
+    os.environ.update({
+        "OPENAI_API_KEY": "sk-stub",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{port}/v1",
+        "QDRANT_URL": f"http://127.0.0.1:{port}",
+        "QDRANT_API_KEY": "stub",
+        "VECTOR_BACKEND": vector_backend,
+        "LOCAL_VECTOR_PATH": os.path.join(workdir, "vectors"),
+        "INDEX_MANIFEST_PATH": os.path.join(workdir, "index_manifest.json"),
+    })
+    sys.path[:0] = [BACKEND, os.path.join(BACKEND, "core")]
+
+async def drive(app, *, sessions: int, concurrency: int, turns: int, audio_bytes: int, stream: bool) -> Dict[str, Any]:
+    import httpx
+    from data.content import RESUMES
+    pairs = list(RESUMES)
+    audio = os.urandom(audio_bytes)
+    startup_ms: List[float] = []
+    turn_ms: List[float] = []
+    errors: List[str] = []
+    sem = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as c:
+        async def interview(i: int):
+            name, role = pairs[i % len(pairs)]
+            async with sem:
+                t0 = time.perf_counter()
+                r = await c.post("/startup_interview", json={"candidate_name": name, "role": role})
+                startup_ms.append((time.perf_counter() - t0) * 1000)
+                if r.status_code != 200:
+                    errors.append(f"startup:{r.status_code}")
+                    return
+                sid = r.json()["session_id"]
+                path = "/transcribe_stream" if stream else "/transcribe"
+                for _ in range(turns):
+                    t0 = time.perf_counter()
+                    r = await c.post(path, data={"session_id": sid}, files={"file": ("answer.webm", audio, "audio/webm")})
+                    turn_ms.append((time.perf_counter() - t0) * 1000)
+                    if r.status_code != 200 or (stream and "event: final" not in r.text):
+                        errors.append(f"turn:{r.status_code}")
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*[interview(i) for i in range(sessions)])
+        wall = time.perf_counter() - t0
+    return {"wall_s": wall, "startup_ms": startup_ms, "turn_ms": turn_ms, "errors": errors}
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sessions", type=int, default=50)
+    ap.add_argument("--concurrency", type=int, default=25)
+    ap.add_argument("--turns", type=int, default=6, help="/transcribe calls per session (first returns the cached question)")
+    ap.add_argument("--audio-bytes", type=int, default=64_000)
+    ap.add_argument("--stream", action="store_true", help="use /transcribe_stream instead of /transcribe")
+    ap.add_argument("--vector-backend", default="qdrant", choices=["qdrant", "local"])
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency", default="embed=40,chat=300,transcribe=400,qdrant=5")
+    ap.add_argument("--jitter", type=float, default=0.2)
+    ap.add_argument("--out", default=os.path.join(HERE, "results"))
+    args = ap.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="intervuum-bench-")
+    stubs = start_stubs(args.port, args.latency, args.jitter)
+    try:
+        configure_env(args.port, workdir, args.vector_backend)
+        import httpx
+        import main as app_main
+        app_main.brain_prepare_worker()  # index content, build clients before the clock starts
+        stats_url = f"http://127.0.0.1:{args.port}"
+        httpx.post(f"{stats_url}/_reset")
+        run = asyncio.run(drive(app_main.app, sessions=args.sessions, concurrency=args.concurrency,
+                                turns=args.turns, audio_bytes=args.audio_bytes, stream=args.stream))
+        upstream = httpx.get(f"{stats_url}/_stats").json()
+    finally:
+        stubs.terminate()
+        stubs.wait()
+
+    n_turns = max(1, len(run["turn_ms"]))
+    report = {
+        "version": _git_rev(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "config": {k: v for k, v in vars(args).items() if k != "out"},
+        "sessions_per_sec": round(args.sessions / run["wall_s"], 3),
+        "wall_s": round(run["wall_s"], 3),
+        "startup_latency_ms": percentiles(run["startup_ms"]),
+        "turn_latency_ms": percentiles(run["turn_ms"]),
+        "upstream_calls": upstream,
+        "upstream_calls_per_turn": {k: round(v / n_turns, 3) for k, v in upstream.items()},
+        "errors": len(run["errors"]),
+    }
+    os.makedirs(args.out, exist_ok=True)
+    path = os.path.join(args.out, f"bench-{time.strftime('%Y%m%d-%H%M%S')}-{report['version']}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+    print(f"saved {path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# bench/score_bench.py
+"""
+Offline scoring throughput (sessions/sec) of core/scoring.py over a
+synthetic day of interviews in a sqlite session store, per worker-pool
+size, plus a resume check: a run stopped halfway (--limit) and rerun must
+score only the remaining sessions. Chat responses come from the stub server
+in bench/stubs.py.
+
+  python bench/score_bench.py --sessions 500 --concurrency 1,8,32 --latency chat=800
+"""
+import argparse, asyncio, json, os, sys, tempfile, uuid
+from typing import Any, Dict
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+from run_bench import start_stubs, configure_env  # noqa: E402
+from ingest_bench import SKILLS  # noqa: E402
+
+def fill_store(path: str, n: int, answers: int, seed: int = 0) -> None:
+    from data.content import RESUMES
+    from sessions import Session, SqliteSessionStore, Turn
+    rng = np.random.default_rng(seed)
+    pairs = list(RESUMES)
+    store = SqliteSessionStore(path)
+    for i in range(n):
+        name, role = pairs[i % len(pairs)]
+        sess = Session(str(uuid.uuid4()), name, role, turns=[Turn("ai", f"Hi {name}, welcome.")])
+        for _ in range(answers):
+            skill = rng.choice(SKILLS)
+            sess.turns.append(Turn("ai", f"How did you scale the {skill} pipeline, and what broke first?",
+                                   ["resume:x#c0"]))
+            sess.turns.append(Turn("candidate", " ".join(
+                f"We moved {skill} to {rng.choice(SKILLS)} at {rng.integers(1, 900)}K events/sec and cut p95 by "
+                f"{rng.integers(5, 60)}%." for _ in range(rng.integers(3, 15)))))
+        store.put(sess)
+
+async def run_all(db: str, workdir: str, args) -> Dict[str, Any]:
+    import scoring
+    runs: Dict[int, Any] = {}
+    for c in [int(x) for x in args.concurrency.split(",")]:
+        out = os.path.join(workdir, f"scores-{c}.jsonl")
+        runs[c] = await scoring.ascore(scoring.iter_sessions(db, idle_s=0), out_path=out, concurrency=c)
+        runs[c]["output_bytes_per_session"] = os.path.getsize(out) // max(1, args.sessions)
+
+    out = os.path.join(workdir, "scores-resume.jsonl")
+    half = await scoring.ascore(scoring.iter_sessions(db, idle_s=0), out_path=out, concurrency=c, limit=args.sessions // 2)
+    rest = await scoring.ascore(scoring.iter_sessions(db, idle_s=0), out_path=out, concurrency=c)
+    with open(out, encoding="utf-8") as f:
+        lines = sum(1 for _ in f)
+    return {"runs": runs, "resume": {"first_run_scored": half["scored"], "second_run_scored": rest["scored"],
+                                     "second_run_skipped": rest["skipped"], "result_lines": lines,
+                                     "ok": lines == args.sessions and rest["skipped"] == half["scored"]}}
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sessions", type=int, default=500)
+    ap.add_argument("--answers", type=int, default=12, help="candidate answers per session")
+    ap.add_argument("--concurrency", default="1,8,32", help="comma-separated worker-pool sizes")
+    ap.add_argument("--port", type=int, default=8771)
+    ap.add_argument("--latency", default="chat=800")
+    args = ap.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="intervuum-score-")
+    stubs = start_stubs(args.port, args.latency, 0.2)
+    report: Dict[str, Any] = {"config": vars(args)}
+    try:
+        configure_env(args.port, workdir, "local")
+        db = os.path.join(workdir, "sessions.sqlite")
+        fill_store(db, args.sessions, args.answers)
+        # One event loop for every run: the shared async clients' pools belong to it
+        report.update(asyncio.run(run_all(db, workdir, args)))
+    finally:
+        stubs.terminate()
+        stubs.wait()
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# bench/startup_bench.py
+"""
+Time-to-ready for a new worker, each sample in a fresh interpreter against the
+stub upstreams in bench/stubs.py:
+
+  import        `import main` wall time, and which heavy SDKs it pulled in
+  cold boot     uvicorn start -> first 200 from /health and from /ready with an
+                empty vector store (full indexing)
+  warm boot     the same with the index manifest and vectors of a previous
+                boot (a restart / scale-out against an indexed collection)
+
+plus the slowest modules of `import main` per `python -X importtime`.
+
+  python bench/startup_bench.py --repeats 5
+"""
+import argparse, json, os, shutil, subprocess, sys, tempfile, time
+from typing import Any, Dict, List
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+from run_bench import BACKEND, start_stubs, percentiles  # noqa: E402
+
+HEAVY = ("openai", "qdrant_client", "grpc", "google.protobuf", "tiktoken", "numpy")
+
+IMPORT_PROBE = f"""
+import json, sys, time
+t0 = time.perf_counter()
+import main
+ms = (time.perf_counter() - t0) * 1000
+print(json.dumps({{"ms": ms, "loaded": [m for m in {HEAVY!r} if m in sys.modules]}}))
+"""
+
+def worker_env(port: int, workdir: str, backend: str) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.update({
+        "OPENAI_API_KEY": "sk-stub",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{port}/v1",
+        "QDRANT_URL": f"http://127.0.0.1:{port}",
+        "QDRANT_API_KEY": "stub",
+        "VECTOR_BACKEND": backend,
+        "LOCAL_VECTOR_PATH": os.path.join(workdir, "vectors"),
+        "INDEX_MANIFEST_PATH": os.path.join(workdir, "index_manifest.json"),
+        "PYTHONPATH": os.pathsep.join([BACKEND, os.path.join(BACKEND, "core"), env.get("PYTHONPATH", "")]),
+    })
+    return env
+
+def import_sample(env: Dict[str, str]) -> Dict[str, Any]:
+    out = subprocess.run([sys.executable, "-c", IMPORT_PROBE], cwd=BACKEND, env=env,
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def slowest_imports(env: Dict[str, str], n: int) -> List[Dict[str, Any]]:
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd=BACKEND, env=env,
+                         capture_output=True, text=True, check=True)
+    rows = []
+    for line in out.stderr.splitlines():  # "import time: self [us] | cumulative | imported package"
+        parts = line.removeprefix("import time:").split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            rows.append({"module": parts[2].strip(), "cumulative_ms": round(int(parts[1]) / 1000, 1)})
+    return sorted(rows, key=lambda r: -r["cumulative_ms"])[:n]
+
+def boot_sample(env: Dict[str, str], port: int, timeout: float) -> Dict[str, float]:
+    import httpx
+    t0 = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+                            cwd=BACKEND, env=env)
+    got: Dict[str, float] = {}
+    try:
+        while len(got) < 2 and time.perf_counter() - t0 < timeout:
+            for path in ("/health", "/ready"):
+                if path in got:
+                    continue
+                try:
+                    if httpx.get(f"http://127.0.0.1:{port}{path}", timeout=0.5).status_code == 200:
+                        got[path] = round((time.perf_counter() - t0) * 1000, 1)
+                except httpx.HTTPError:
+                    pass
+            time.sleep(0.01)
+    finally:
+        proc.terminate()
+        proc.wait()
+    if len(got) < 2:
+        raise RuntimeError(f"worker not ready within {timeout}s: {got}")
+    return got
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--repeats", type=int, default=5)
+    ap.add_argument("--backend", choices=["local", "qdrant"], default="local")
+    ap.add_argument("--port", type=int, default=8769, help="stub upstreams")
+    ap.add_argument("--app-port", type=int, default=8770)
+    ap.add_argument("--latency", default="embed=40,chat=300,transcribe=100,qdrant=5")
+    ap.add_argument("--top", type=int, default=15, help="slowest modules to list")
+    ap.add_argument("--timeout", type=float, default=60.0)
+    args = ap.parse_args()
+
+    stubs = start_stubs(args.port, args.latency, 0.2)
+    workdir = tempfile.mkdtemp(prefix="intervuum-startup-")
+    try:
+        env = worker_env(args.port, workdir, args.backend)
+        imports = [import_sample(env) for _ in range(args.repeats)]
+        boots: Dict[str, Dict[str, List[float]]] = {"cold": {}, "warm": {}}
+        for _ in range(args.repeats):
+            shutil.rmtree(workdir, ignore_errors=True)
+            os.makedirs(workdir)
+            for kind in ("cold", "warm"):  # warm: same workdir, right after the cold boot indexed it
+                for path, ms in boot_sample(env, args.app_port, args.timeout).items():
+                    boots[kind].setdefault(path, []).append(ms)
+        report = {
+            "config": vars(args),
+            "import_main_ms": percentiles([s["ms"] for s in imports]),
+            "heavy_modules_loaded": imports[0]["loaded"],
+            "boot_ms": {kind: {path: percentiles(v) for path, v in paths.items()} for kind, paths in boots.items()},
+            "slowest_imports": slowest_imports(env, args.top),
+        }
+    finally:
+        stubs.terminate()
+        stubs.wait()
+        shutil.rmtree(workdir, ignore_errors=True)
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
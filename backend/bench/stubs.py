@@ -0,0 +1,374 @@
+# bench/stubs.py
+"""
+Local stand-ins for the upstream APIs the interview brain calls, so the full
+loop can be benchmarked offline:
+
+  - OpenAI:  POST /v1/embeddings, /v1/chat/completions (incl. stream), /v1/audio/transcriptions
+  - Qdrant:  the REST subset used by core/qdrant_backend.py
+
+Each upstream kind gets a base latency plus jitter; GET /_stats returns call
+counters (POST /_reset clears them).
+
+Faults can be injected per kind, at startup (--faults) or at runtime (POST
+/_faults {"spec": ...}, GET /_faults): "kind=mode[:rate[:ms]],...", where mode
+is "error" (503 with probability rate), "slow" (ms extra latency with
+probability rate) or "down" (every call fails with 503).
+
+  python bench/stubs.py --port 8765 --latency embed=40,chat=300,transcribe=400,qdrant=5 --jitter 0.2
+  python bench/stubs.py --faults embed=slow:0.05:2000,qdrant=error:0.1
+"""
+import argparse, asyncio, base64, hashlib, json, random, re, time
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+DEFAULT_LATENCY_MS = {"embed": 40.0, "chat": 300.0, "transcribe": 400.0, "qdrant": 5.0}
+
+def parse_faults(spec: str) -> Dict[str, List[Tuple[str, float, float]]]:
+    """"kind=mode[:rate[:ms]],..." -> {kind: [(mode, rate, ms), ...]}"""
+    out: Dict[str, List[Tuple[str, float, float]]] = {}
+    for part in filter(None, (spec or "").split(",")):
+        kind, _, rule = part.strip().partition("=")
+        mode, *rest = rule.split(":")
+        if mode not in ("error", "slow", "down"):
+            raise ValueError(f"unknown fault mode '{mode}' (expected error, slow or down)")
+        rate = float(rest[0]) if rest else 1.0
+        ms = float(rest[1]) if len(rest) > 1 else 0.0
+        out.setdefault(kind, []).append((mode, 1.0 if mode == "down" else rate, ms))
+    return out
+
+class StubConfig:
+    def __init__(self, latency_ms: Optional[Dict[str, float]] = None, jitter: float = 0.2,
+                 stream_chunks: int = 20, dim: int = 3072, seed: int = 7, faults: str = ""):
+        self.latency_ms = {**DEFAULT_LATENCY_MS, **(latency_ms or {})}
+        self.faults = parse_faults(faults)
+        self.jitter = jitter            # +/- fraction of the base latency (uniform)
+        self.stream_chunks = stream_chunks
+        self.dim = dim
+        self.rng = random.Random(seed)
+
+    async def delay(self, kind: str, fraction: float = 1.0) -> None:
+        base = self.latency_ms.get(kind, 0.0) * fraction
+        if base <= 0:
+            return
+        ms = base * (1 + self.jitter * (2 * self.rng.random() - 1))
+        await asyncio.sleep(ms / 1000)
+
+    async def fault(self, kind: str) -> None:
+        """Apply the kind's injected faults: extra latency, or a 503 raised to the client."""
+        for mode, rate, ms in self.faults.get(kind, ()):
+            if self.rng.random() >= rate:
+                continue
+            if mode == "slow":
+                await asyncio.sleep(ms / 1000)
+            else:
+                raise HTTPException(status_code=503, detail=f"injected {mode} fault ({kind})")
+
+def _vector(text: str, dim: int) -> np.ndarray:
+    seed = int.from_bytes(hashlib.sha1(text.encode("utf-8")).digest()[:8], "little")
+    v = np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+    return v / np.linalg.norm(v)
+
+def _ok(result: Any) -> JSONResponse:
+    return JSONResponse({"result": result, "status": "ok", "time": 0.0})
+
+def create_app(cfg: Optional[StubConfig] = None) -> FastAPI:
+    cfg = cfg or StubConfig()
+    app = FastAPI(title="upstream stubs")
+    stats: Dict[str, int] = {}
+    collections: Dict[str, Dict[str, Any]] = {}   # name -> {id: (vector, payload)}
+    configs: Dict[str, Dict[str, Any]] = {}       # name -> {"vectors": ..., "quantization_config": ...}
+
+    def count(kind: str) -> None:
+        stats[kind] = stats.get(kind, 0) + 1
+
+    @app.get("/_stats")
+    def get_stats():
+        return stats
+
+    @app.get("/_faults")
+    def get_faults():
+        return cfg.faults
+
+    @app.post("/_faults")
+    async def set_faults(req: Request):
+        cfg.faults = parse_faults((await req.json()).get("spec", ""))
+        return cfg.faults
+
+    @app.post("/_reset")
+    def reset():
+        stats.clear()
+        return {"ok": True}
+
+    # ---------------- OpenAI ----------------
+    @app.post("/v1/embeddings")
+    async def embeddings(req: Request):
+        body = await req.json()
+        inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        count("embed")
+        await cfg.fault("embed")
+        await cfg.delay("embed")
+        dim = int(body.get("dimensions") or cfg.dim)
+        data = []
+        for i, t in enumerate(inputs):
+            v = _vector(t, dim)
+            emb = base64.b64encode(v.tobytes()).decode() if body.get("encoding_format") == "base64" else v.tolist()
+            data.append({"object": "embedding", "index": i, "embedding": emb})
+        toks = sum(len(t.split()) for t in inputs)
+        return {"object": "list", "data": data, "model": body["model"],
+                "usage": {"prompt_tokens": toks, "total_tokens": toks}}
+
+    def _answer(messages: List[Dict[str, str]]) -> str:
+        system, user = messages[0]["content"], messages[-1]["content"]
+        if "summarize rubrics" in system:
+            return json.dumps({"bullets": ["System design tradeoffs", "SQL and data modeling",
+                                           "Problem solving under ambiguity", "Ownership and communication"]})
+        if "grade interview transcripts" in system:
+            dims = json.loads(re.search(r"^Dimensions: (\[.*\])$", system, flags=re.M).group(1))
+            answers = [int(n) for n in re.findall(r"^\[(\d+)\] candidate:", user, flags=re.M)]
+            return json.dumps({
+                "scores": [{"dimension": d, "score": 1 + (len(user) + i) % 5 if answers else 0,
+                            "evidence": answers[i % len(answers):][:2] if answers else []} for i, d in enumerate(dims)],
+                "summary": "Clear on system design tradeoffs; thin on measurable impact.",
+            })
+        cits = re.findall(r"^\[(\w+:[^\]]+#c\d+)\]", user, flags=re.M)[:3]  # doc ids contain spaces
+        dim = re.search(r"'dimension': '([^']+)'|\"dimension\": \"([^\"]+)\"", user)
+        dim = next((g for g in dim.groups() if g), "Resume Projects") if dim else "Resume Projects"
+        return json.dumps({
+            "question": f"Walk me through a concrete decision you made that shows your {dim} depth, "
+                        f"including the constraints, the alternatives you rejected and how you measured the outcome.",
+            "followups": ["What would you change today?", "How did you validate it?"],
+            "dimension": dim,
+            "difficulty": "medium",
+            "rationale_citations": cits,
+        })
+
+    @app.post("/v1/chat/completions")
+    async def chat(req: Request):
+        body = await req.json()
+        count("chat")
+        await cfg.fault("chat")
+        content = _answer(body["messages"])
+        prompt_toks = sum(len(m["content"].split()) for m in body["messages"])
+        usage = {"prompt_tokens": prompt_toks, "completion_tokens": len(content.split()),
+                 "total_tokens": prompt_toks + len(content.split())}
+        head = {"id": "chatcmpl-stub", "created": int(time.time()), "model": body["model"]}
+        if not body.get("stream"):
+            await cfg.delay("chat")
+            return {**head, "object": "chat.completion",
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                                 "finish_reason": "stop"}],
+                    "usage": usage}
+
+        async def events():
+            n = max(1, cfg.stream_chunks)
+            await cfg.delay("chat", 0.3)  # time to first token
+            step = max(1, len(content) // n)
+            for i in range(0, len(content), step):
+                chunk = {**head, "object": "chat.completion.chunk",
+                         "choices": [{"index": 0, "delta": {"content": content[i:i + step]}, "finish_reason": None}]}
+                yield f"data: {json.dumps(chunk)}\n\n"
+                await cfg.delay("chat", 0.7 / n)
+            if (body.get("stream_options") or {}).get("include_usage"):
+                yield f"data: {json.dumps({**head, 'object': 'chat.completion.chunk', 'choices': [], 'usage': usage})}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.post("/v1/audio/transcriptions")
+    async def transcriptions(req: Request):
+        form = await req.form()
+        size = len(await form["file"].read())
+        count("transcribe")
+        await cfg.fault("transcribe")
+        await cfg.delay("transcribe")
+        words = max(5, min(200, size // 1000))
+        return {"text": " ".join(["I", "designed", "the", "pipeline", "with", "Kafka", "and", "Flink"] * (words // 8 + 1))[:words * 8]}
+
+    # ---------------- Qdrant (REST subset) ----------------
+    def _cond(payload: Dict[str, Any], c: Dict[str, Any]) -> bool:
+        m = c["match"]
+        return payload.get(c["key"]) in m["any"] if "any" in m else payload.get(c["key"]) == m["value"]
+
+    def _match(payload: Dict[str, Any], pid: str, flt: Optional[Dict[str, Any]]) -> bool:
+        if not flt:
+            return True
+        for c in flt.get("must") or []:
+            if "has_id" in c:
+                if pid not in {str(x) for x in c["has_id"]}:
+                    return False
+            elif not _cond(payload, c):
+                return False
+        for c in flt.get("must_not") or []:
+            if "has_id" in c:
+                if pid in {str(x) for x in c["has_id"]}:
+                    return False
+            elif _cond(payload, c):
+                return False
+        return True
+
+    async def _qdrant() -> None:
+        count("qdrant")
+        await cfg.fault("qdrant")
+        await cfg.delay("qdrant")
+
+    @app.get("/")
+    def root():
+        return {"title": "qdrant - vector search engine (stub)", "version": "1.15.1"}
+
+    @app.get("/collections")
+    async def list_collections():
+        await _qdrant()
+        return _ok({"collections": [{"name": n} for n in collections]})
+
+    @app.get("/collections/{name}/exists")
+    async def exists(name: str):
+        await _qdrant()
+        return _ok({"exists": name in collections})
+
+    @app.put("/collections/{name}")
+    async def create_collection(name: str, req: Request):
+        await _qdrant()
+        body = await req.json()
+        collections[name] = {}
+        configs[name] = {"vectors": body.get("vectors"), "quantization_config": body.get("quantization_config")}
+        return _ok(True)
+
+    @app.get("/collections/{name}")
+    async def collection_info(name: str):
+        await _qdrant()
+        cfg_ = configs.get(name, {})
+        return _ok({"status": "green", "optimizer_status": "ok", "segments_count": 1,
+                    "points_count": len(collections.get(name, {})), "payload_schema": {},
+                    "config": {"params": {"vectors": cfg_.get("vectors")},
+                               "hnsw_config": {"m": 16, "ef_construct": 100, "full_scan_threshold": 10000},
+                               "optimizer_config": {"deleted_threshold": 0.2, "vacuum_min_vector_number": 1000,
+                                                    "default_segment_number": 0, "flush_interval_sec": 5},
+                               "quantization_config": cfg_.get("quantization_config")}})
+
+    @app.patch("/collections/{name}")
+    async def update_collection(name: str, req: Request):
+        await _qdrant()
+        body = await req.json()
+        if "quantization_config" in body:
+            q = body["quantization_config"]
+            configs.setdefault(name, {})["quantization_config"] = None if q == "Disabled" else q
+        return _ok(True)
+
+    @app.delete("/collections/{name}")
+    async def delete_collection(name: str):
+        await _qdrant()
+        collections.pop(name, None)
+        configs.pop(name, None)
+        return _ok(True)
+
+    @app.put("/collections/{name}/points")
+    async def upsert(name: str, req: Request):
+        await _qdrant()
+        body = await req.json()
+        col = collections.setdefault(name, {})
+        if "batch" in body:
+            b = body["batch"]
+            pts = [{"id": i, "vector": v, "payload": p} for i, v, p in zip(b["ids"], b["vectors"], b.get("payloads") or [{}] * len(b["ids"]))]
+        else:
+            pts = body["points"]
+        for p in pts:
+            v = np.asarray(p["vector"], dtype=np.float32)
+            col[str(p["id"])] = (v / (np.linalg.norm(v) or 1), p.get("payload") or {})
+        return _ok({"operation_id": 0, "status": "completed"})
+
+    @app.post("/collections/{name}/points")
+    async def retrieve(name: str, req: Request):
+        await _qdrant()
+        body = await req.json()
+        col = collections.get(name, {})
+        out = [{"id": str(i), "payload": col[str(i)][1] if body.get("with_payload") else None}
+               for i in body["ids"] if str(i) in col]
+        return _ok(out)
+
+    @app.post("/collections/{name}/points/delete")
+    async def delete(name: str, req: Request):
+        await _qdrant()
+        body = await req.json()
+        col = collections.get(name, {})
+        if "points" in body:
+            doomed = [str(i) for i in body["points"]]
+        else:
+            doomed = [pid for pid, (_, p) in col.items() if _match(p, pid, body.get("filter"))]
+        for pid in doomed:
+            col.pop(pid, None)
+        return _ok({"operation_id": 0, "status": "completed"})
+
+    @app.post("/collections/{name}/points/count")
+    async def count_points(name: str, req: Request):
+        await _qdrant()
+        body = await req.json()
+        col = collections.get(name, {})
+        return _ok({"count": sum(1 for pid, (_, p) in col.items() if _match(p, pid, body.get("filter")))})
+
+    def _search(col, req: Dict[str, Any]) -> List[Dict[str, Any]]:
+        rows = [(pid, v, p) for pid, (v, p) in col.items() if _match(p, pid, req.get("filter"))]
+        if not rows:
+            return []
+        q = np.asarray(req["vector"], dtype=np.float32)
+        q = q / (np.linalg.norm(q) or 1)
+        scores = np.stack([v for _, v, _ in rows]) @ q
+        order = np.argsort(-scores)[: int(req.get("limit", 10))]
+        return [{"id": rows[i][0], "version": 0, "score": float(scores[i]),
+                 "payload": rows[i][2] if req.get("with_payload") else None,
+                 "vector": rows[i][1].tolist() if req.get("with_vector") else None} for i in order]
+
+    @app.post("/collections/{name}/points/search/batch")
+    async def search_batch(name: str, req: Request):
+        await _qdrant()
+        body = await req.json()
+        col = collections.get(name, {})
+        return _ok([_search(col, r) for r in body["searches"]])
+
+    @app.post("/collections/{name}/points/search")
+    async def search(name: str, req: Request):
+        await _qdrant()
+        return _ok(_search(collections.get(name, {}), await req.json()))
+
+    @app.post("/collections/{name}/points/scroll")
+    async def scroll(name: str, req: Request):
+        await _qdrant()
+        body = await req.json()
+        col = collections.get(name, {})
+        rows = sorted((pid, v, p) for pid, (v, p) in col.items() if _match(p, pid, body.get("filter")))
+        start = 0
+        if body.get("offset") is not None:
+            start = next((i for i, r in enumerate(rows) if r[0] >= str(body["offset"])), len(rows))
+        limit = int(body.get("limit") or 10)
+        page = rows[start:start + limit]
+        nxt = rows[start + limit][0] if start + limit < len(rows) else None
+        return _ok({"points": [{"id": pid, "payload": p if body.get("with_payload") else None,
+                                "vector": v.tolist() if body.get("with_vector") else None} for pid, v, p in page],
+                    "next_page_offset": nxt})
+
+    return app
+
+def parse_latency(spec: str) -> Dict[str, float]:
+    out = {}
+    for part in filter(None, (spec or "").split(",")):
+        k, v = part.split("=")
+        out[k.strip()] = float(v)
+    return out
+
+def main():
+    ap = argparse.ArgumentParser(description="Stub OpenAI + Qdrant servers for offline benchmarks")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency", default="", help="per-kind base latency in ms, e.g. embed=40,chat=300")
+    ap.add_argument("--jitter", type=float, default=0.2, help="uniform +/- fraction of base latency")
+    ap.add_argument("--stream-chunks", type=int, default=20)
+    ap.add_argument("--faults", default="", help="e.g. embed=slow:0.05:2000,chat=error:0.1,qdrant=down")
+    args = ap.parse_args()
+    import uvicorn
+    cfg = StubConfig(latency_ms=parse_latency(args.latency), jitter=args.jitter, stream_chunks=args.stream_chunks,
+                     faults=args.faults)
+    uvicorn.run(create_app(cfg), host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+# bench/upload_bench.py
+"""
+Per-request cost of getting an audio upload to the transcription API:
+peak Python heap (tracemalloc) and bytes written/read by the process
+(/proc/self/io) while main._transcribe_upload hands an already-parsed
+multipart upload to the OpenAI SDK. Both are sampled inside the handler, so
+Starlette's own spooling and the benchmark client are excluded; the upstream
+is an in-process httpx transport that drains the body without keeping it.
+
+  python bench/upload_bench.py --sizes-kb 512,8192,24576
+  python bench/upload_bench.py --legacy     # old read() + temp file + reopen path, for comparison
+  python bench/upload_bench.py --concurrency 64 --slots 8 --queue-timeout 0.5   # backpressure (503s)
+"""
+import argparse, asyncio, json, os, sys, tempfile, time, tracemalloc
+from typing import Any, Dict, Optional
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BACKEND = os.path.dirname(HERE)
+
+def _proc_io() -> Dict[str, int]:
+    try:
+        with open("/proc/self/io") as f:
+            return {k: int(v) for k, v in (line.split(": ") for line in f)}
+    except OSError:
+        return {}  # not Linux: report heap only
+
+def configure_env(workdir: str, args) -> None:
+    # Must happen before importing main/config
+    os.environ.update({
+        "OPENAI_API_KEY": "sk-bench",
+        "VECTOR_BACKEND": "local",
+        "LOCAL_VECTOR_PATH": os.path.join(workdir, "vectors"),
+        "MAX_CONCURRENT_TRANSCRIBES": str(args.slots),
+        "TRANSCRIBE_QUEUE_TIMEOUT": str(args.queue_timeout),
+    })
+    sys.path[:0] = [BACKEND, os.path.join(BACKEND, "core")]
+
+def make_upstream(delay_ms: float):
+    import httpx
+
+    class DrainTransport(httpx.AsyncBaseTransport):
+        """Reads the multipart body chunk by chunk, like a socket would, and discards it."""
+        def __init__(self):
+            self.bytes = 0
+
+        async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+            async for chunk in request.stream:
+                self.bytes += len(chunk)
+            await asyncio.sleep(delay_ms / 1000)
+            return httpx.Response(200, json={"text": "ok"})
+
+    return DrainTransport()
+
+def install_legacy(app_main, client) -> None:
+    """The pre-streaming implementation: whole body in memory, copied to a temp file, reopened."""
+    async def legacy(file, language_hint: Optional[str]) -> str:
+        suffix = os.path.splitext(file.filename or "")[-1] or ".webm"
+        tmp_path = None
+        try:
+            with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+                content = await file.read()
+                tmp.write(content)
+                tmp_path = tmp.name
+            with open(tmp_path, "rb") as f:
+                result = await client.audio.transcriptions.create(
+                    model=app_main.TRANSCRIBE_MODEL, file=f, language=(language_hint or "en"))
+            return getattr(result, "text", str(result))
+        finally:
+            if tmp_path:
+                os.remove(tmp_path)
+    app_main._transcribe_upload = legacy
+
+def make_app(app_main):
+    from fastapi import FastAPI, File, UploadFile
+    app = FastAPI()
+    app.state.samples = []
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        tracemalloc.start()
+        io0, t0 = _proc_io(), time.perf_counter()
+        try:
+            text = await app_main._transcribe_upload(file, None)
+        except app_main.UploadRejected as e:
+            return e.response(None)
+        finally:
+            ms, io1 = (time.perf_counter() - t0) * 1000, _proc_io()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        app.state.samples.append({"ms": ms, "peak": peak,
+                                  "written": io1.get("wchar", 0) - io0.get("wchar", 0),
+                                  "read": io1.get("rchar", 0) - io0.get("rchar", 0)})
+        return {"text": text}
+
+    return app
+
+async def measure(app, size: int, repeats: int) -> Dict[str, Any]:
+    import httpx
+    audio = os.urandom(size)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as c:
+        await c.post("/upload", files={"file": ("warmup.webm", b"0" * 1024, "audio/webm")})
+        app.state.samples.clear()
+        for _ in range(repeats):
+            r = await c.post("/upload", files={"file": ("answer.webm", audio, "audio/webm")})
+            assert r.status_code == 200, r.text
+    samples = app.state.samples
+    peak = max(x["peak"] for x in samples)
+    return {"size_bytes": size,
+            "peak_heap_bytes": peak,
+            "heap_over_payload": round(peak / size, 3),
+            "io_written_bytes": max(x["written"] for x in samples),
+            "io_read_bytes": max(x["read"] for x in samples),
+            "ms_p50": round(sorted(x["ms"] for x in samples)[len(samples) // 2], 2)}
+
+async def burst(app, n: int, size: int) -> Dict[str, int]:
+    import httpx
+    audio = os.urandom(size)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as c:
+        rs = await asyncio.gather(*[c.post("/upload", files={"file": ("a.webm", audio, "audio/webm")}) for _ in range(n)])
+    counts: Dict[str, int] = {}
+    for r in rs:
+        counts[str(r.status_code)] = counts.get(str(r.status_code), 0) + 1
+    return counts
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes-kb", default="512,8192,24576")
+    ap.add_argument("--repeats", type=int, default=3)
+    ap.add_argument("--legacy", action="store_true", help="measure the old temp-file path instead")
+    ap.add_argument("--upstream-ms", type=float, default=0.0, help="simulated transcription latency")
+    ap.add_argument("--concurrency", type=int, default=0, help="also fire this many uploads at once")
+    ap.add_argument("--slots", type=int, default=32, help="MAX_CONCURRENT_TRANSCRIBES")
+    ap.add_argument("--queue-timeout", type=float, default=10.0, help="TRANSCRIBE_QUEUE_TIMEOUT")
+    args = ap.parse_args()
+
+    configure_env(tempfile.mkdtemp(prefix="intervuum-upload-"), args)
+    from openai import AsyncOpenAI
+    import httpx
+    import main as app_main
+    import transcription
+
+    upstream = make_upstream(args.upstream_ms)
+    client = AsyncOpenAI(api_key="sk-bench", base_url="http://upstream/v1",
+                         http_client=httpx.AsyncClient(transport=upstream), max_retries=0)
+    transcription.backend = transcription.OpenAITranscription(client=client)
+    if args.legacy:
+        install_legacy(app_main, client)
+    app = make_app(app_main)
+
+    report: Dict[str, Any] = {"mode": "legacy" if args.legacy else "streaming", "per_request": []}
+    for kb in (int(x) for x in args.sizes_kb.split(",")):
+        report["per_request"].append(asyncio.run(measure(app, kb * 1024, args.repeats)))
+    if args.concurrency:
+        report["burst"] = {"requests": args.concurrency, "slots": args.slots,
+                           "status": asyncio.run(burst(app, args.concurrency, 256 * 1024))}
+    report["upstream_bytes"] = upstream.bytes
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+# bench/ws_bench.py
+"""
+End-of-answer latency: how long the candidate waits between finishing an
+answer and receiving the next question, for the whole-answer upload
+(/transcribe_stream) versus live streaming over /ws/transcribe.
+
+Answers are synthetic PCM16 (speech-like bursts separated by pauses) paced at
+--speed x real time. Transcription goes through an in-process stub backend
+whose latency grows with audio length, like the real API; chat/embeddings/Qdrant
+use the stub server from bench/stubs.py.
+
+  python bench/ws_bench.py --answers 4 --answer-s 20 --speed 4
+"""
+import argparse, asyncio, io, json, os, statistics, sys, tempfile, time, wave
+from typing import Any, Dict
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+from run_bench import start_stubs, configure_env, percentiles  # noqa: E402
+
+SAMPLE_RATE = 16000
+
+def synth_answer(seconds: float, seed: int) -> bytes:
+    """Bursts of 1.5-4 s "speech" (noisy tones) separated by 0.7-1.2 s of near-silence."""
+    rng = np.random.default_rng(seed)
+    out, t = [], 0.0
+    while t < seconds:
+        talk, pause = rng.uniform(1.5, 4.0), rng.uniform(0.7, 1.2)
+        n = int(talk * SAMPLE_RATE)
+        tone = np.sin(2 * np.pi * rng.uniform(120, 300) * np.arange(n) / SAMPLE_RATE)
+        out.append((3000 * tone + rng.normal(0, 800, n)).astype("<i2"))
+        out.append(rng.normal(0, 40, int(pause * SAMPLE_RATE)).astype("<i2"))
+        t += talk + pause
+    return np.concatenate(out)[: int(seconds * SAMPLE_RATE)].tobytes()
+
+def wav_bytes(pcm: bytes) -> bytes:
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1); w.setsampwidth(2); w.setframerate(SAMPLE_RATE); w.writeframes(pcm)
+    return buf.getvalue()
+
+def make_stub_backend(base_ms: float, ms_per_audio_s: float):
+    import transcription
+
+    class StubTranscription(transcription.TranscriptionBackend):
+        """Latency = base + per-second-of-audio (WAV duration read from the payload size)."""
+        name = "stub"
+
+        def __init__(self):
+            self.calls = 0
+
+        async def transcribe(self, file, *, language: str) -> str:
+            data = file[1] if isinstance(file[1], (bytes, bytearray)) else file[1].read()
+            audio_s = max(0, len(data) - 44) / (2 * SAMPLE_RATE)
+            self.calls += 1
+            await asyncio.sleep((base_ms + ms_per_audio_s * audio_s) / 1000)
+            return " ".join(["I", "scaled", "the", "Kafka", "pipeline"] * max(1, int(audio_s)))
+
+    return StubTranscription()
+
+def run_upload(client, sid: str, pcm: bytes) -> float:
+    t0 = time.perf_counter()
+    with client.stream("POST", "/transcribe_stream", data={"session_id": sid},
+                       files={"file": ("answer.wav", wav_bytes(pcm), "audio/wav")}) as r:
+        for line in r.iter_lines():
+            if line == "event: final":
+                return (time.perf_counter() - t0) * 1000
+    raise RuntimeError("no final event")
+
+def run_ws(client, sid: str, pcm: bytes, speed: float, frame_ms: int = 100) -> Dict[str, Any]:
+    step = SAMPLE_RATE * 2 * frame_ms // 1000
+    segments = 0
+    with client.websocket_connect("/ws/transcribe") as ws:
+        ws.send_json({"type": "start", "session_id": sid, "format": "pcm16", "sample_rate": SAMPLE_RATE})
+        for i in range(0, len(pcm), step):
+            ws.send_bytes(pcm[i:i + step])
+            time.sleep(frame_ms / 1000 / speed)
+        t0 = time.perf_counter()
+        ws.send_json({"type": "end"})
+        while True:
+            msg = ws.receive_json()
+            if msg["type"] == "segment":
+                segments += 1
+            elif msg["type"] == "final":
+                return {"ms": (time.perf_counter() - t0) * 1000, "segments": segments,
+                        "tail_ms": msg.get("timings", {}).get("transcribe_ms")}
+            elif msg["type"] == "error":
+                raise RuntimeError(msg)
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--answers", type=int, default=4, help="answers per mode")
+    ap.add_argument("--answer-s", type=float, default=20.0, help="seconds of audio per answer")
+    ap.add_argument("--speed", type=float, default=4.0, help="how much faster than real time audio is sent")
+    ap.add_argument("--transcribe-base-ms", type=float, default=150.0)
+    ap.add_argument("--transcribe-ms-per-s", type=float, default=60.0, help="stub latency per second of audio")
+    ap.add_argument("--port", type=int, default=8766)
+    ap.add_argument("--latency", default="embed=20,chat=200,qdrant=3")
+    args = ap.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="intervuum-ws-")
+    stubs = start_stubs(args.port, args.latency, 0.0)
+    try:
+        configure_env(args.port, workdir, "qdrant")
+        from fastapi.testclient import TestClient
+        import main as app_main
+        import transcription
+        transcription.backend = stub = make_stub_backend(args.transcribe_base_ms, args.transcribe_ms_per_s)
+
+        from data.content import RESUMES
+        name, role = next(iter(RESUMES))
+        report: Dict[str, Any] = {"config": vars(args)}
+        with TestClient(app_main.app) as client:
+            for mode in ("upload", "ws"):
+                sid = client.post("/startup_interview", json={"candidate_name": name, "role": role}).json()["session_id"]
+                run_upload(client, sid, synth_answer(1.0, 0))  # "I'm ready" -> first question
+                calls0, rows = stub.calls, []
+                for i in range(args.answers):
+                    pcm = synth_answer(args.answer_s, i + 1)
+                    rows.append({"ms": run_upload(client, sid, pcm)} if mode == "upload" else run_ws(client, sid, pcm, args.speed))
+                report[mode] = {"end_of_answer_to_question_ms": percentiles([r["ms"] for r in rows]),
+                                "transcribe_calls_per_answer": (stub.calls - calls0) / args.answers}
+                if mode == "ws":
+                    report[mode]["segments_per_answer"] = statistics.fmean(r["segments"] for r in rows)
+                    report[mode]["tail_transcribe_ms"] = percentiles([r["tail_ms"] for r in rows if r["tail_ms"] is not None])
+    finally:
+        stubs.terminate()
+        stubs.wait()
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
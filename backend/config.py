@@ -8,9 +8,129 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 TRANSCRIBE_MODEL = os.getenv("TRANSCRIBE_MODEL", "gpt-4o-transcribe")
 ALLOWED_ORIGINS = os.getenv("ALLOWED_ORIGINS", "*")
 
+# Vector store backend: "qdrant" (remote cluster) or "local" (in-process, memory-mapped)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "qdrant").lower()
+LOCAL_VECTOR_PATH = os.getenv("LOCAL_VECTOR_PATH", "runtime/vectors")
+
 QDRANT_URL = os.getenv("QDRANT_URL")
 QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
 QDRANT_COLLECTION = os.getenv("QDRANT_COLLECTION", "interview_docs")
 
+# Embeddings: model and optional shortened output (text-embedding-3 `dimensions`; 0 = model default).
+# Changing either needs a fresh collection (QDRANT_COLLECTION / LOCAL_VECTOR_PATH).
+EMBED_MODEL = os.getenv("EMBED_MODEL", "text-embedding-3-large")
+EMBED_DIMENSIONS = int(os.getenv("EMBED_DIMENSIONS", "0"))
+
+# Stored-vector quantization: "none", "int8" (scalar) or "binary". Candidates are picked on the
+# quantized vectors (top_k * oversampling) and rescored with the full-precision ones.
+VECTOR_QUANTIZATION = os.getenv("VECTOR_QUANTIZATION", "none").lower()
+QUANT_OVERSAMPLING = float(os.getenv("QUANT_OVERSAMPLING", "3.0"))
+
+# Document chunking (tokens per chunk, tokens shared between neighbours)
+CHUNK_TOKENS = int(os.getenv("CHUNK_TOKENS", "400"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "50"))
+
+# Bulk ingestion (core/ingest.py): embedding request packing (API caps: 2048 inputs,
+# 300k tokens per request), concurrent embedding requests, upsert batch size, documents per window
+EMBED_BATCH_INPUTS = int(os.getenv("EMBED_BATCH_INPUTS", "2048"))
+EMBED_BATCH_TOKENS = int(os.getenv("EMBED_BATCH_TOKENS", "200000"))
+INGEST_CONCURRENCY = int(os.getenv("INGEST_CONCURRENCY", "4"))
+INGEST_UPSERT_BATCH = int(os.getenv("INGEST_UPSERT_BATCH", "512"))
+INGEST_WINDOW_DOCS = int(os.getenv("INGEST_WINDOW_DOCS", "256"))
+
+# Embedding cache: in-memory LRU entries, optional sqlite file for a persistent tier
+EMBED_CACHE_SIZE = int(os.getenv("EMBED_CACHE_SIZE", "4096"))
+EMBED_CACHE_PATH = os.getenv("EMBED_CACHE_PATH", "")
+
+# Speech-to-text backend (core/transcription.py)
+TRANSCRIBE_BACKEND = os.getenv("TRANSCRIBE_BACKEND", "openai").lower()
+
+# Live answers over /ws/transcribe: PCM16 segmentation (cut on silence, or at the max window)
+SEGMENT_SILENCE_MS = int(os.getenv("SEGMENT_SILENCE_MS", "600"))
+SEGMENT_MIN_MS = int(os.getenv("SEGMENT_MIN_MS", "2000"))
+SEGMENT_MAX_MS = int(os.getenv("SEGMENT_MAX_MS", "15000"))
+SEGMENT_SILENCE_RMS = float(os.getenv("SEGMENT_SILENCE_RMS", "300"))
+
+# Audio uploads: size cap (the transcription API rejects files over 25 MB) and
+# backpressure (concurrent upstream transcriptions, seconds to wait for a slot before 503)
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(25 * 1024 * 1024)))
+MAX_CONCURRENT_TRANSCRIBES = int(os.getenv("MAX_CONCURRENT_TRANSCRIBES", "32"))
+TRANSCRIBE_QUEUE_TIMEOUT = float(os.getenv("TRANSCRIBE_QUEUE_TIMEOUT", "10"))
+# Upload requests admitted at once (receiving, queued or transcribing); more get 503 before their body is read
+MAX_PENDING_UPLOADS = int(os.getenv("MAX_PENDING_UPLOADS", str(2 * MAX_CONCURRENT_TRANSCRIBES)))
+
+# Pipelined turns: retrieve for the predicted next target while audio is transcribed
+PIPELINE_TURNS = os.getenv("PIPELINE_TURNS", "1").lower() in ("1", "true", "yes")
+
+# Interview plan (core/scheduler.py): planned seconds per question (incl. the answer), how many
+# upcoming targets get their retrieval prepared in the background, and how many of those are kept
+INTERVIEW_TURN_SECONDS = float(os.getenv("INTERVIEW_TURN_SECONDS", "240"))
+PLAN_LOOKAHEAD = int(os.getenv("PLAN_LOOKAHEAD", "2"))
+PREPARED_TARGETS_MAX = int(os.getenv("PREPARED_TARGETS_MAX", "128"))
+PREPARED_TARGETS_TTL = float(os.getenv("PREPARED_TARGETS_TTL", "900"))
+
+# Per-session retrieval context: rank a session's rubric and resume chunks locally instead of querying
+# Qdrant every turn; reloaded after SESSION_CONTEXT_TTL seconds to see documents indexed elsewhere
+SESSION_CONTEXT_MAX_POINTS = int(os.getenv("SESSION_CONTEXT_MAX_POINTS", "5000"))
+SESSION_CONTEXT_CACHE_SIZE = int(os.getenv("SESSION_CONTEXT_CACHE_SIZE", "64"))
+SESSION_CONTEXT_TTL = float(os.getenv("SESSION_CONTEXT_TTL", "300"))
+
+# Shared rubric intro / first-question cache (entries, seconds) and optional warm-up at boot
+ARTIFACT_CACHE_SIZE = int(os.getenv("ARTIFACT_CACHE_SIZE", "512"))
+ARTIFACT_CACHE_TTL = float(os.getenv("ARTIFACT_CACHE_TTL", "86400"))
+PREWARM_ARTIFACTS = os.getenv("PREWARM_ARTIFACTS", "0").lower() in ("1", "true", "yes")
+
+# Retrieval: candidates fetched per query, snippets kept after MMR reranking
+# (lambda: relevance vs. diversity) and minimum snippets per dtype ("dtype:n,...")
+RETRIEVAL_CANDIDATES = int(os.getenv("RETRIEVAL_CANDIDATES", "8"))
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "5"))
+RETRIEVAL_MMR = os.getenv("RETRIEVAL_MMR", "1").lower() in ("1", "true", "yes")
+MMR_LAMBDA = float(os.getenv("MMR_LAMBDA", "0.7"))
+RETRIEVAL_QUOTAS = os.getenv("RETRIEVAL_QUOTAS", "resume:1,rubric:1")
+
+# Upstream calls (core/upstream.py). Shared HTTP pools for OpenAI and Qdrant; per-attempt timeout
+# caps per call kind ("kind=seconds,..."), all bounded by the turn budget (seconds per interview turn).
+UPSTREAM_MAX_CONNECTIONS = int(os.getenv("UPSTREAM_MAX_CONNECTIONS", "100"))
+UPSTREAM_MAX_KEEPALIVE = int(os.getenv("UPSTREAM_MAX_KEEPALIVE", "20"))
+UPSTREAM_KEEPALIVE_S = float(os.getenv("UPSTREAM_KEEPALIVE_S", "30"))
+UPSTREAM_HTTP2 = os.getenv("UPSTREAM_HTTP2", "1").lower() in ("1", "true", "yes")
+UPSTREAM_CONNECT_TIMEOUT = float(os.getenv("UPSTREAM_CONNECT_TIMEOUT", "2"))
+UPSTREAM_TIMEOUTS = os.getenv("UPSTREAM_TIMEOUTS", "embed=3,embed_bulk=60,chat=15,transcribe=60,qdrant=2,qdrant_write=30,score=60")
+TURN_BUDGET_S = float(os.getenv("TURN_BUDGET_S", "10"))
+# Retries of transient failures (per call, and at most this fraction of all calls), hedged
+# second requests for idempotent calls slower than their observed p95 (at most this fraction)
+UPSTREAM_RETRIES = int(os.getenv("UPSTREAM_RETRIES", "2"))
+UPSTREAM_RETRY_RATIO = float(os.getenv("UPSTREAM_RETRY_RATIO", "0.2"))
+UPSTREAM_HEDGE = os.getenv("UPSTREAM_HEDGE", "1").lower() in ("1", "true", "yes")
+UPSTREAM_HEDGE_RATIO = float(os.getenv("UPSTREAM_HEDGE_RATIO", "0.1"))
+UPSTREAM_HEDGE_MIN_MS = float(os.getenv("UPSTREAM_HEDGE_MIN_MS", "20"))
+# Circuit breaker: consecutive failures that open it, seconds before a probe call is let through
+UPSTREAM_BREAKER_FAILURES = int(os.getenv("UPSTREAM_BREAKER_FAILURES", "5"))
+UPSTREAM_BREAKER_COOLDOWN = float(os.getenv("UPSTREAM_BREAKER_COOLDOWN", "10"))
+
+# Input-token cap for question generation (system + context + snippets)
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "4000"))
+
+# Session state: "memory" (per process, LRU/TTL bounded) or "sqlite" (shared by the workers of a node)
+SESSION_STORE = os.getenv("SESSION_STORE", "memory").lower()
+SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", "runtime/sessions.sqlite")
+SESSION_TTL = float(os.getenv("SESSION_TTL", "14400"))
+SESSION_MAX = int(os.getenv("SESSION_MAX", "10000"))
+
+# Offline scoring of finished interviews (core/scoring.py): sessions scored concurrently, idle
+# seconds after which a stored session counts as finished, transcript token caps (per prompt, per turn)
+SCORE_CONCURRENCY = int(os.getenv("SCORE_CONCURRENCY", "8"))
+SCORE_IDLE_S = float(os.getenv("SCORE_IDLE_S", "900"))
+SCORE_PROMPT_TOKENS = int(os.getenv("SCORE_PROMPT_TOKENS", "12000"))
+SCORE_TURN_TOKENS = int(os.getenv("SCORE_TURN_TOKENS", "600"))
+
+# Worker boot: index content and build the upstream clients in a background task ("background",
+# /ready answers 503 until done) or before the app accepts requests ("blocking")
+STARTUP_MODE = os.getenv("STARTUP_MODE", "background").lower()
+
+# Hashes of documents already indexed, so restarts skip unchanged content
+INDEX_MANIFEST_PATH = os.getenv("INDEX_MANIFEST_PATH", "runtime/index_manifest.json")
+
 assert OPENAI_API_KEY, "Missing OPENAI_API_KEY"
-assert QDRANT_URL and QDRANT_API_KEY, "Missing Qdrant credentials"
+if VECTOR_BACKEND == "qdrant":
+    assert QDRANT_URL and QDRANT_API_KEY, "Missing Qdrant credentials"
@@ -0,0 +1,60 @@
+# app/artifacts.py
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+from config import ARTIFACT_CACHE_SIZE, ARTIFACT_CACHE_TTL
+from cache import LRUCache
+import metrics
+
+# Per-role rubric intro bullets and per-(candidate, role) first questions.
+# Keys embed a hash of the underlying content, so edits invalidate naturally.
+INTROS = LRUCache(maxsize=ARTIFACT_CACHE_SIZE, ttl=ARTIFACT_CACHE_TTL, name="intro")
+FIRST_QUESTIONS = LRUCache(maxsize=ARTIFACT_CACHE_SIZE, ttl=ARTIFACT_CACHE_TTL, name="first_question")
+
+_MISSING = object()
+_inflight: Dict[Tuple[int, Hashable], asyncio.Future] = {}
+
+def get_or_build(cache: LRUCache, key: Hashable, build: Callable[[], Any],
+                 cache_if: Optional[Callable[[Any], bool]] = None) -> Tuple[Any, bool]:
+    """Returns (value, was_cached)."""
+    v = cache.get(key, _MISSING)
+    metrics.inc("cache_total", cache=cache.name, outcome="hit" if v is not _MISSING else "miss")
+    if v is not _MISSING:
+        return v, True
+    v = build()
+    if cache_if is None or cache_if(v):
+        cache.put(key, v)
+    return v, False
+
+async def aget_or_build(cache: LRUCache, key: Hashable, build: Callable[[], Awaitable[Any]],
+                        cache_if: Optional[Callable[[Any], bool]] = None) -> Tuple[Any, bool]:
+    """
+    Async `get_or_build` with single-flight: concurrent misses for the same key
+    (e.g. a morning batch of interviews for one role) share one build.
+    """
+    v = cache.get(key, _MISSING)
+    if v is not _MISSING:
+        metrics.inc("cache_total", cache=cache.name, outcome="hit")
+        return v, True
+    slot = (id(cache), key)
+    fut = _inflight.get(slot)
+    if fut is not None:
+        metrics.inc("cache_total", cache=cache.name, outcome="shared")
+        return await asyncio.shield(fut), True
+    metrics.inc("cache_total", cache=cache.name, outcome="miss")
+    fut = asyncio.get_running_loop().create_future()
+    _inflight[slot] = fut
+    try:
+        v = await build()
+    except BaseException as e:
+        fut.set_exception(e)
+        fut.exception()  # mark retrieved when nobody else is waiting
+        raise
+    finally:
+        _inflight.pop(slot, None)
+    if cache_if is None or cache_if(v):
+        cache.put(key, v)
+    fut.set_result(v)
+    return v, False
+
+def stats() -> Dict[str, Any]:
+    return {"intros": INTROS.stats(), "first_questions": FIRST_QUESTIONS.stats()}
@@ -1,11 +1,114 @@
 # app/embeddings.py
-from typing import List
-from openai import OpenAI
-from config import OPENAI_API_KEY
+import hashlib, sqlite3, threading
+from typing import List, Dict
+import numpy as np
+from config import EMBED_MODEL, EMBED_DIMENSIONS, EMBED_CACHE_SIZE, EMBED_CACHE_PATH
+from cache import LRUCache
+import metrics, upstream
 
-_client = OpenAI(api_key=OPENAI_API_KEY)
-EMBED_MODEL = "text-embedding-3-large"  # 3072 dims
+MODEL_DIMS = {"text-embedding-3-large": 3072, "text-embedding-3-small": 1536, "text-embedding-ada-002": 1536}
+EMBED_DIM = EMBED_DIMENSIONS or MODEL_DIMS.get(EMBED_MODEL, 3072)
+_params = {"dimensions": EMBED_DIMENSIONS} if EMBED_DIMENSIONS else {}
+# Shortened vectors are different vectors: keep them apart in the cache (default keys unchanged)
+_KEY_MODEL = f"{EMBED_MODEL}/{EMBED_DIMENSIONS}" if EMBED_DIMENSIONS else EMBED_MODEL
 
-def embed_texts(texts: List[str]) -> List[List[float]]:
-    resp = _client.embeddings.create(model=EMBED_MODEL, input=texts)
-    return [d.embedding for d in resp.data]
+# Content-addressed query/chunk embedding cache: in-memory LRU + optional sqlite tier
+_mem = LRUCache(maxsize=EMBED_CACHE_SIZE)
+_disk_lock = threading.Lock()
+_disk = None
+_stats = {"api_calls": 0, "api_texts": 0, "disk_hits": 0}
+
+if EMBED_CACHE_PATH:
+    _disk = sqlite3.connect(EMBED_CACHE_PATH, check_same_thread=False)
+    _disk.execute("PRAGMA journal_mode=WAL")
+    _disk.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vec BLOB NOT NULL)")
+    _disk.commit()
+
+def _normalize(text: str) -> str:
+    return " ".join(text.split())
+
+def _key(text: str) -> str:
+    return hashlib.sha1(f"{_KEY_MODEL}\x00{_normalize(text)}".encode("utf-8")).hexdigest()
+
+def _disk_get(keys: List[str]) -> Dict[str, np.ndarray]:
+    if _disk is None or not keys:
+        return {}
+    marks = ",".join("?" * len(keys))
+    with _disk_lock:
+        rows = _disk.execute(f"SELECT key, vec FROM embeddings WHERE key IN ({marks})", keys).fetchall()
+    return {k: np.frombuffer(v, dtype=np.float32) for k, v in rows}
+
+def _disk_put(items: Dict[str, np.ndarray]) -> None:
+    if _disk is None or not items:
+        return
+    with _disk_lock:
+        _disk.executemany("INSERT OR REPLACE INTO embeddings (key, vec) VALUES (?, ?)",
+                          [(k, v.tobytes()) for k, v in items.items()])
+        _disk.commit()
+
+def _lookup(texts: List[str]):
+    """Resolve what we can from cache; returns (keys, found, misses) where misses maps key -> text."""
+    keys = [_key(t) for t in texts]
+    found: Dict[str, np.ndarray] = {}
+    for k in keys:
+        v = _mem.get(k)
+        if v is not None:
+            found[k] = v
+    mem_hits = len(found)
+    cold = [k for k in dict.fromkeys(keys) if k not in found]
+    for k, v in _disk_get(cold).items():
+        _mem.put(k, v)
+        found[k] = v
+        _stats["disk_hits"] += 1
+    misses = {}
+    for k, t in zip(keys, texts):
+        if k not in found and k not in misses:
+            misses[k] = t
+    metrics.inc("cache_total", mem_hits, cache="embed", outcome="hit")
+    metrics.inc("cache_total", len(found) - mem_hits, cache="embed", outcome="disk_hit")
+    metrics.inc("cache_total", len(misses), cache="embed", outcome="miss")
+    return keys, found, misses
+
+def _store(misses: Dict[str, str], vecs: List[List[float]], found: Dict[str, np.ndarray]) -> None:
+    fresh = {k: np.asarray(v, dtype=np.float32) for k, v in zip(misses, vecs)}
+    for k, v in fresh.items():
+        _mem.put(k, v)
+    _disk_put(fresh)
+    found.update(fresh)
+    _stats["api_calls"] += 1
+    _stats["api_texts"] += len(misses)
+
+def embed_texts(texts: List[str], *, stats: Dict[str, int] | None = None, bulk: bool = False) -> List[List[float]]:
+    """`bulk`: indexing-sized request (upstream kind "embed_bulk": longer timeout, own breaker)."""
+    keys, found, misses = _lookup(texts)
+    if misses:
+        # Only cache misses go to the API, in a single batch
+        with metrics.stage("embed"):
+            inputs = list(misses.values())
+            resp = upstream.call("embed_bulk" if bulk else "embed", lambda t: upstream.openai_client().embeddings.create(
+                model=EMBED_MODEL, input=inputs, timeout=t, **_params))
+        metrics.record_usage(EMBED_MODEL, getattr(resp, "usage", None))
+        _store(misses, [d.embedding for d in resp.data], found)
+        if stats is not None:
+            stats["embed"] = stats.get("embed", 0) + 1
+    return [found[k].tolist() for k in keys]
+
+async def aembed_texts(texts: List[str], *, stats: Dict[str, int] | None = None,
+                       bulk: bool = False) -> List[List[float]]:
+    keys, found, misses = _lookup(texts)
+    if misses:
+        with metrics.stage("embed"):
+            inputs = list(misses.values())
+            # Idempotent: a slow query embedding gets a hedged twin (not worth it for bulk requests)
+            resp = await upstream.acall("embed_bulk" if bulk else "embed", lambda t: upstream.aopenai_client().embeddings.create(
+                model=EMBED_MODEL, input=inputs, timeout=t, **_params), hedge=not bulk)
+        metrics.record_usage(EMBED_MODEL, getattr(resp, "usage", None))
+        _store(misses, [d.embedding for d in resp.data], found)
+        if stats is not None:
+            stats["embed"] = stats.get("embed", 0) + 1
+    return [found[k].tolist() for k in keys]
+
+def cache_stats() -> Dict[str, int]:
+    s = _mem.stats()
+    s.update(_stats)
+    return s
@@ -0,0 +1,252 @@
+# app/ingest.py
+"""
+Bulk ingestion of rubric/resume corpora into the vector store.
+
+  PYTHONPATH=.:core python -m ingest corpus.jsonl --checkpoint runtime/ingest.ckpt
+  PYTHONPATH=.:core python -m ingest corpus_dir/ --concurrency 8
+
+Sources: JSONL lines {"doc_id"?, "text", "dtype", "role", "candidate_name"?}
+(or with the metadata under "meta"), or a directory of *.jsonl files plus
+rubrics/<role>.txt and resumes/<role>/<candidate>.txt. Doc ids are prefixed
+with "ingest::" (default: the rubric/resume id of the role and candidate), so
+ingested documents never replace the built-in data/content.py ones; sessions
+of that role and candidate retrieve from both. Documents are streamed,
+chunked by tokens, packed into embedding requests up to the API limits,
+embedded with a bounded number of requests in flight and upserted in large
+batches. Finished documents are appended to the checkpoint file, so a rerun
+skips them (a changed document is re-ingested).
+"""
+import argparse, asyncio, json, os, sys, time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from config import (
+    EMBED_BATCH_INPUTS, EMBED_BATCH_TOKENS, INGEST_CONCURRENCY, INGEST_UPSERT_BATCH, INGEST_WINDOW_DOCS,
+)
+from embeddings import aembed_texts
+from tokens import count_tokens
+from vectorstore import (
+    ensure_collection, chunk, content_hash, doc_hash, point_id, INGESTED, rubric_doc_id, resume_doc_id,
+)
+import metrics, session_context, vectorstore
+
+# ---------- sources ----------
+def _doc(rec: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    text = rec.get("text")
+    meta = dict(rec.get("meta") or {k: rec[k] for k in ("dtype", "role", "candidate_name") if rec.get(k)})
+    if not text or meta.get("dtype") not in ("rubric", "resume") or not meta.get("role"):
+        return None
+    doc_id = rec.get("doc_id") or (rubric_doc_id(meta["role"]) if meta["dtype"] == "rubric"
+                                    else resume_doc_id(meta.get("candidate_name", ""), meta["role"]))
+    return {"doc_id": doc_id, "text": text, "meta": meta}
+
+def _read_jsonl(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def _read_dir(root: str) -> Iterator[Dict[str, Any]]:
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        rel = os.path.relpath(dirpath, root).split(os.sep)
+        for name in sorted(filenames):
+            path = os.path.join(dirpath, name)
+            stem, ext = os.path.splitext(name)
+            if ext == ".jsonl":
+                yield from _read_jsonl(path)
+            elif ext in (".txt", ".md"):
+                with open(path, encoding="utf-8") as f:
+                    text = f.read()
+                if rel == ["rubrics"]:
+                    yield {"text": text, "dtype": "rubric", "role": stem}
+                elif len(rel) == 2 and rel[0] == "resumes":
+                    yield {"text": text, "dtype": "resume", "role": rel[1], "candidate_name": stem}
+
+def iter_documents(source: str) -> Iterator[Dict[str, Any]]:
+    """Stream {"doc_id", "text", "meta"} documents from a JSONL file or a directory; bad records are skipped."""
+    records = _read_dir(source) if os.path.isdir(source) else _read_jsonl(source)
+    for rec in records:
+        doc = _doc(rec)
+        if doc is not None:
+            yield doc
+        else:
+            metrics.inc("ingest_skipped_total", reason="invalid")
+
+# ---------- checkpoint ----------
+class Checkpoint:
+    """Append-only log of finished documents: one {"doc_id", "hash"} line each."""
+    def __init__(self, path: Optional[str]):
+        self.path, self.done = path, {}
+        torn = False
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    torn = not line.endswith("\n")
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line after a crash
+                    self.done[rec["doc_id"]] = rec["hash"]
+        self._f = open(path, "a", encoding="utf-8") if path else None
+        if torn:
+            self._f.write("\n")
+
+    def finished(self, doc_id: str, fp_hash: str) -> bool:
+        return self.done.get(doc_id) == fp_hash
+
+    def mark(self, docs: List[Tuple[str, str]]) -> None:
+        for doc_id, fp_hash in docs:
+            self.done[doc_id] = fp_hash
+        if self._f:
+            self._f.write("".join(json.dumps({"doc_id": d, "hash": h}) + "\n" for d, h in docs))
+            self._f.flush()
+            os.fsync(self._f.fileno())
+
+    def close(self) -> None:
+        if self._f:
+            self._f.close()
+
+# ---------- pipeline ----------
+def pack_requests(items: List[Tuple[Any, str, int]], *, max_inputs: int = EMBED_BATCH_INPUTS,
+                  max_tokens: int = EMBED_BATCH_TOKENS) -> List[List[Tuple[Any, str, int]]]:
+    """Group (ref, text, tokens) items into embedding requests within the per-request limits."""
+    out, cur, size = [], [], 0
+    for it in items:
+        if cur and (len(cur) >= max_inputs or size + it[2] > max_tokens):
+            out.append(cur)
+            cur, size = [], 0
+        cur.append(it)
+        size += it[2]
+    if cur:
+        out.append(cur)
+    return out
+
+def _windows(docs: Iterable[Dict[str, Any]], n: int) -> Iterator[List[Dict[str, Any]]]:
+    win = []
+    for d in docs:
+        win.append(d)
+        if len(win) >= n:
+            yield win
+            win = []
+    if win:
+        yield win
+
+class _Run:
+    def __init__(self, concurrency: int, upsert_batch: int, checkpoint: Checkpoint, prune: bool):
+        self.sem = asyncio.Semaphore(concurrency)   # embedding requests in flight
+        self.writes = asyncio.Lock()                # one window writes at a time; the next keeps embedding
+        self.upsert_batch, self.checkpoint, self.prune = upsert_batch, checkpoint, prune
+        self.stats = {"docs": 0, "skipped": 0, "chunks": 0, "embedded": 0, "embed_requests": 0, "upserts": 0}
+
+    async def _embed(self, req: List[Tuple[Any, str, int]]) -> List[List[float]]:
+        async with self.sem:
+            self.stats["embed_requests"] += 1
+            return await aembed_texts([t for _, t, _ in req], bulk=True)
+
+    @staticmethod
+    def _prune(prepared) -> None:
+        for d, _, ids in prepared:
+            vectorstore.backend.delete({"doc_id": d["doc_id"]}, keep_ids=ids)
+
+    async def window(self, docs: List[Dict[str, Any]]) -> None:
+        prepared = []
+        for d in docs:  # chunked once here; the hash was computed when the checkpoint was checked
+            meta_sig = repr(sorted(d["meta"].items()))
+            chunks = chunk(d["text"])
+            ids = [point_id(d["doc_id"], i, content_hash(ch, meta_sig)) for i, ch in enumerate(chunks)]
+            prepared.append((d, chunks, ids))
+        all_ids = [pid for _, _, ids in prepared for pid in ids]
+        present = await asyncio.to_thread(vectorstore.backend.existing_ids, all_ids)
+
+        todo = [((d, i, pid), ch, count_tokens(ch))
+                for d, chunks, ids in prepared for i, (ch, pid) in enumerate(zip(chunks, ids)) if pid not in present]
+        requests = pack_requests(todo)
+        vecs = await asyncio.gather(*[self._embed(r) for r in requests])
+        points = [(pid, v, {"doc_id": d["doc_id"], "chunk_idx": i, "text": ch, **d["meta"]})
+                  for req, rv in zip(requests, vecs) for ((d, i, pid), ch, _), v in zip(req, rv)]
+        async with self.writes:
+            with metrics.stage("ingest_upsert"):
+                for k in range(0, len(points), self.upsert_batch):
+                    await asyncio.to_thread(vectorstore.backend.upsert, points[k:k + self.upsert_batch])
+                    self.stats["upserts"] += 1
+            if self.prune:  # drop chunks left over from older versions of these documents
+                await asyncio.to_thread(self._prune, prepared)
+        self.checkpoint.mark([(d["doc_id"], d["hash"]) for d in docs])
+        self.stats["docs"] += len(docs)
+        self.stats["chunks"] += len(all_ids)
+        self.stats["embedded"] += len(todo)
+        metrics.inc("ingest_docs_total", len(docs))
+
+async def aingest(docs: Iterable[Dict[str, Any]], *, checkpoint_path: Optional[str] = None,
+                  concurrency: int = INGEST_CONCURRENCY, upsert_batch: int = INGEST_UPSERT_BATCH,
+                  window_docs: int = INGEST_WINDOW_DOCS, prune: bool = True,
+                  progress=None) -> Dict[str, Any]:
+    """
+    Ingest a stream of {"doc_id", "text", "meta"} documents (stored under
+    "ingest::" + doc_id). Windows of `window_docs` documents are prepared
+    while the previous one is still embedding; `progress(stats)` is called
+    after each window. Returns the run stats incl. docs/sec.
+    """
+    await asyncio.to_thread(ensure_collection)
+    ckpt = Checkpoint(checkpoint_path)
+    run = _Run(concurrency, upsert_batch, ckpt, prune)
+    t0 = time.perf_counter()
+
+    def fresh() -> Iterator[Dict[str, Any]]:
+        for d in docs:
+            doc_id = d["doc_id"] if d["doc_id"].startswith(INGESTED) else INGESTED + d["doc_id"]
+            h = doc_hash(d["text"], d["meta"])
+            if ckpt.finished(doc_id, h):
+                run.stats["skipped"] += 1
+                continue
+            yield {**d, "doc_id": doc_id, "hash": h}
+
+    inflight: set = set()
+    try:
+        for win in _windows(fresh(), window_docs):
+            inflight.add(asyncio.create_task(run.window(win)))
+            if len(inflight) >= 2:
+                finished, inflight = await asyncio.wait(inflight, return_when=asyncio.FIRST_COMPLETED)
+                for t in finished:
+                    t.result()
+                if progress:
+                    progress(_report(run.stats, t0))
+        if inflight:
+            for t in await asyncio.gather(*inflight, return_exceptions=True):
+                if isinstance(t, BaseException):
+                    raise t
+            inflight = set()
+    finally:
+        for t in inflight:
+            t.cancel()
+        ckpt.close()
+    if run.stats["embedded"] or run.stats["docs"]:
+        session_context.invalidate()
+    return _report(run.stats, t0)
+
+def ingest(docs: Iterable[Dict[str, Any]], **kwargs) -> Dict[str, Any]:
+    return asyncio.run(aingest(docs, **kwargs))
+
+def _report(stats: Dict[str, int], t0: float) -> Dict[str, Any]:
+    secs = time.perf_counter() - t0
+    return {**stats, "seconds": round(secs, 2), "docs_per_sec": round(stats["docs"] / secs, 2) if secs else 0.0}
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("source", help="JSONL file or directory")
+    ap.add_argument("--checkpoint", default=None, help="resume file (default: <source>.ckpt)")
+    ap.add_argument("--concurrency", type=int, default=INGEST_CONCURRENCY)
+    ap.add_argument("--upsert-batch", type=int, default=INGEST_UPSERT_BATCH)
+    ap.add_argument("--window-docs", type=int, default=INGEST_WINDOW_DOCS)
+    ap.add_argument("--no-prune", action="store_true", help="skip deleting stale chunks (first load into an empty collection)")
+    args = ap.parse_args(argv)
+
+    progress = lambda s: print(f"\r{s['docs']} docs ({s['skipped']} skipped), {s['embedded']} chunks embedded, "
+                               f"{s['docs_per_sec']} docs/sec", end="", file=sys.stderr, flush=True)
+    report = ingest(iter_documents(args.source), checkpoint_path=args.checkpoint or args.source.rstrip("/") + ".ckpt",
+                    concurrency=args.concurrency, upsert_batch=args.upsert_batch, window_docs=args.window_docs,
+                    prune=not args.no_prune, progress=progress)
+    print(file=sys.stderr)
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,12 @@
 # app/llm.py
-import json
-from typing import Dict, Any, List
-from openai import OpenAI
-from config import OPENAI_API_KEY
+import json, time
+from typing import Dict, Any, AsyncIterator, Iterator, List
+import jiter
+import metrics, upstream
+from prompt import build_question_prompt
+from tokens import count_tokens, static_tokens, truncate_tokens, tokenizer
 
-client = OpenAI(api_key=OPENAI_API_KEY)
+CHAT_MODEL = "gpt-4o-mini"
 
 SYSTEM_QG = """You are an Interview Question Generator. STRICT RULES:
 - Use only the provided snippets (resume & rubric) to ground the question; include citations.
@@ -20,54 +22,178 @@ SYSTEM_QG = """You are an Interview Question Generator. STRICT RULES:
 - When the target dimension relates to resume/projects, include at least one resume citation.
 """
 
-def _fmt_snippets(snips: List[Dict[str, Any]]) -> str:
-    lines = []
-    for s in snips:
-        dtype = s["meta"].get("dtype","doc")
-        tag = f"{dtype}:{s['doc_id']}#c{s['chunk_idx']}"
-        lines.append(f"[{tag}] {s['text']}")
-    return "\n".join(lines)
-
-def generate_question(*, snippets, candidate_name: str, role: str, target: Dict[str, Any], recent_turns: List[Dict[str, Any]]):
-    ctx = f"""Role: {role}
-Candidate: {candidate_name}
-Target: {target}
-Recent:
-{ [t['actor']+': '+t['text'] for t in recent_turns[-2:]] }
-Snippets:
-{_fmt_snippets(snippets)}
-Return JSON only."""
-    resp = client.chat.completions.create(
-        model="gpt-4o-mini",
+def _chat(request: Dict[str, Any], **extra):
+    return upstream.call("chat", lambda t: upstream.openai_client().chat.completions.create(
+        timeout=t, **extra, **request))
+
+async def _achat(request: Dict[str, Any], *, kind: str = "chat", **extra):
+    # Streams: the deadline bounds the request up to its first bytes, the read timeout the rest
+    return await upstream.acall(kind, lambda t: upstream.aopenai_client().chat.completions.create(
+        timeout=t, **extra, **request))
+
+def _report_prompt(call: str, info: Dict[str, int], stats: Dict[str, Any] | None) -> None:
+    metrics.inc("prompt_tokens_total", info["prompt_tokens"], call=call, tokenizer=tokenizer())
+    if info.get("snippets_dropped"):
+        metrics.inc("prompt_snippets_dropped_total", info["snippets_dropped"])
+    if stats is not None:
+        stats["prompt_tokens"] = info["prompt_tokens"]
+
+def _qg_request(*, snippets, candidate_name: str, role: str, target: Dict[str, Any], recent_turns: List[Dict[str, Any]],
+                stats: Dict[str, Any] | None = None) -> Dict[str, Any]:
+    messages, info = build_question_prompt(SYSTEM_QG, snippets=snippets, candidate_name=candidate_name, role=role,
+                                           target=target, recent_turns=recent_turns)
+    _report_prompt("question", info, stats)
+    return dict(
+        model=CHAT_MODEL,
         response_format={"type":"json_object"},
-        messages=[
-            {"role":"system","content":SYSTEM_QG},
-            {"role":"user","content":ctx}
-        ],
+        messages=messages,
         temperature=0.2,
         max_tokens=500
     )
+
+def generate_question(*, snippets, candidate_name: str, role: str, target: Dict[str, Any], recent_turns: List[Dict[str, Any]],
+                      stats: Dict[str, Any] | None = None):
+    with metrics.stage("generate_question"):
+        resp = _chat(_qg_request(
+            snippets=snippets, candidate_name=candidate_name, role=role, target=target, recent_turns=recent_turns, stats=stats))
+    metrics.record_usage(CHAT_MODEL, getattr(resp, "usage", None))
+    return json.loads(resp.choices[0].message.content)
+
+def stream_question(*, snippets, candidate_name: str, role: str, target: Dict[str, Any], recent_turns: List[Dict[str, Any]],
+                    stats: Dict[str, Any] | None = None) -> Iterator[Dict[str, Any]]:
+    """
+    Streamed variant of `generate_question`. Yields {"type":"delta","text":...}
+    as the `question` field grows (parsed incrementally from the partial JSON),
+    then a single {"type":"done","question":{...full object...}}.
+    """
+    stream = _chat(_qg_request(
+        snippets=snippets, candidate_name=candidate_name, role=role, target=target, recent_turns=recent_turns, stats=stats),
+        stream=True, stream_options={"include_usage": True})
+    parser = _QuestionStream()
+    for chunk in stream:
+        delta = parser.feed(chunk)
+        if delta:
+            yield {"type": "delta", "text": delta}
+    yield {"type": "done", "question": parser.result()}
+
+class _QuestionStream:
+    """Accumulates streamed JSON and reports newly produced `question` text."""
+    def __init__(self):
+        self.buf, self.sent = bytearray(), ""
+        self.t0 = time.perf_counter()
+
+    def feed(self, chunk) -> str:
+        if getattr(chunk, "usage", None):
+            metrics.record_usage(CHAT_MODEL, chunk.usage)
+        if not chunk.choices:
+            return ""
+        piece = chunk.choices[0].delta.content
+        if not piece:
+            return ""
+        self.buf += piece.encode("utf-8")
+        try:
+            partial = jiter.from_json(bytes(self.buf), partial_mode="trailing-strings")
+        except ValueError:
+            return ""
+        q = partial.get("question") if isinstance(partial, dict) else None
+        if isinstance(q, str) and len(q) > len(self.sent) and q.startswith(self.sent):
+            if not self.sent:
+                metrics.observe("question_first_token", time.perf_counter() - self.t0)
+            delta, self.sent = q[len(self.sent):], q
+            return delta
+        return ""
+
+    def result(self) -> Dict[str, Any]:
+        metrics.observe("generate_question", time.perf_counter() - self.t0)
+        return json.loads(bytes(self.buf))
+
+async def agenerate_question(*, snippets, candidate_name: str, role: str, target: Dict[str, Any], recent_turns: List[Dict[str, Any]],
+                             stats: Dict[str, Any] | None = None):
+    with metrics.stage("generate_question"):
+        resp = await _achat(_qg_request(
+            snippets=snippets, candidate_name=candidate_name, role=role, target=target, recent_turns=recent_turns, stats=stats))
+    metrics.record_usage(CHAT_MODEL, getattr(resp, "usage", None))
     return json.loads(resp.choices[0].message.content)
 
+async def astream_question(*, snippets, candidate_name: str, role: str, target: Dict[str, Any], recent_turns: List[Dict[str, Any]],
+                           stats: Dict[str, Any] | None = None) -> AsyncIterator[Dict[str, Any]]:
+    stream = await _achat(_qg_request(
+        snippets=snippets, candidate_name=candidate_name, role=role, target=target, recent_turns=recent_turns, stats=stats),
+        stream=True, stream_options={"include_usage": True})
+    parser = _QuestionStream()
+    async for chunk in stream:
+        delta = parser.feed(chunk)
+        if delta:
+            yield {"type": "delta", "text": delta}
+    yield {"type": "done", "question": parser.result()}
+
 SYSTEM_RUBRIC_SUM = """You summarize rubrics. Output JSON only:
 { "bullets": ["short, plain-language bullet 1", "..."] }
 Return 4-7 bullets. No extra prose.
 """
 
-def summarize_rubric_for_intro(rubric_text: str) -> List[str]:
-    resp = client.chat.completions.create(
-        model="gpt-4o-mini",
+RUBRIC_SUMMARY_TOKENS = 1500
+
+def _sum_request(rubric_text: str) -> Dict[str, Any]:
+    text = truncate_tokens(rubric_text, RUBRIC_SUMMARY_TOKENS)
+    _report_prompt("rubric_summary", {"prompt_tokens": static_tokens(SYSTEM_RUBRIC_SUM) + count_tokens(text)}, None)
+    return dict(
+        model=CHAT_MODEL,
         response_format={"type": "json_object"},
         messages=[
             {"role":"system","content":SYSTEM_RUBRIC_SUM},
-            {"role":"user","content":rubric_text[:6000]}
+            {"role":"user","content":text}
         ],
         temperature=0.2,
         max_tokens=400
     )
+
+def summarize_rubric_for_intro(rubric_text: str) -> List[str]:
+    with metrics.stage("summarize_rubric"):
+        resp = _chat(_sum_request(rubric_text))
+    metrics.record_usage(CHAT_MODEL, getattr(resp, "usage", None))
+    data = json.loads(resp.choices[0].message.content)
+    return data.get("bullets", [])[:7]
+
+async def asummarize_rubric_for_intro(rubric_text: str) -> List[str]:
+    with metrics.stage("summarize_rubric"):
+        resp = await _achat(_sum_request(rubric_text))
+    metrics.record_usage(CHAT_MODEL, getattr(resp, "usage", None))
     data = json.loads(resp.choices[0].message.content)
     return data.get("bullets", [])[:7]
 
+SYSTEM_SCORE = """You grade interview transcripts against a rubric. STRICT RULES:
+- Judge only what the candidate said in the numbered transcript; interviewer turns are context.
+- Score every listed dimension 1-5 (1 = weak, 3 = meets the bar, 5 = exceptional), or 0 if it was not assessed.
+- Output JSON ONLY:
+{
+ "scores": [{"dimension": "string", "score": 0, "evidence": [3, 7]}, ...],  // evidence: candidate turn numbers
+ "summary": "string"   // 2-3 sentences: strengths, gaps
+}
+"""
+
+def score_system_prompt(role: str, rubric: str, dimensions: List[str]) -> str:
+    """Per-role prefix, identical for every session of the role (built once per role by the caller)."""
+    return (f"{SYSTEM_SCORE}\nRole: {role}\nDimensions: {json.dumps(dimensions)}\n"
+            f"Rubric:\n{truncate_tokens(rubric, RUBRIC_SUMMARY_TOKENS)}")
+
+async def ascore_transcript(*, system: str, transcript: str, stats: Dict[str, Any] | None = None) -> Dict[str, Any]:
+    request = dict(
+        model=CHAT_MODEL,
+        response_format={"type": "json_object"},
+        messages=[
+            {"role": "system", "content": system},
+            {"role": "user", "content": transcript + "\nReturn JSON only."}
+        ],
+        temperature=0.0,
+        max_tokens=700
+    )
+    _report_prompt("score", {"prompt_tokens": static_tokens(system) + count_tokens(transcript)}, stats)
+    with metrics.stage("score_session"):
+        resp = await _achat(request, kind="score")
+    metrics.record_usage(CHAT_MODEL, getattr(resp, "usage", None))
+    return json.loads(resp.choices[0].message.content)
+
 def make_intro(candidate_name: str, role: str, bullets: List[str]) -> str:
     return (
         f"Hi {candidate_name}, I’m your AI interviewer for the {role} role. "
@@ -0,0 +1,300 @@
+# app/local_backend.py
+import contextlib, json, os, threading
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+from vector_backend import VectorBackend, Point, ScoredPayload
+try:
+    import fcntl
+except ImportError:  # Windows: no inter-process lock, keep to one writing process per directory
+    fcntl = None
+
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+def _hamming(qbits: np.ndarray, codes: np.ndarray) -> np.ndarray:
+    """(queries x rows) Hamming distances between packed bit rows."""
+    if hasattr(np, "bitwise_count") and codes.shape[1] % 8 == 0:  # numpy >= 2: 64 bits per op
+        qbits, codes = qbits.view(np.uint64), codes.view(np.uint64)
+        return np.bitwise_count(qbits[:, None, :] ^ codes[None, :, :]).sum(axis=2, dtype=np.int32)
+    return _POPCOUNT[qbits[:, None, :] ^ codes[None, :, :]].sum(axis=2, dtype=np.int32)
+_BLOCK = 4096  # rows scored per step, bounds the temporaries
+
+class _Codes:
+    """
+    Quantized copy of the (row-normalized) vectors, kept in RAM for candidate
+    selection. int8: per-row symmetric scale, 4x smaller than float32;
+    binary: sign bits, 32x smaller, ranked by Hamming distance. Not
+    persisted: rebuilt from the vector file on open.
+    """
+    def __init__(self, mode: str, size: int):
+        if mode not in ("int8", "binary"):
+            raise ValueError(f"Unknown VECTOR_QUANTIZATION '{mode}' (expected 'none', 'int8' or 'binary')")
+        self.mode, self.size = mode, size
+        width = size if mode == "int8" else (size + 7) // 8
+        self.codes = np.zeros((0, width), dtype=np.int8 if mode == "int8" else np.uint8)
+        self.scale = np.zeros(0, dtype=np.float32)
+
+    def resize(self, cap: int) -> None:
+        codes = np.zeros((cap, self.codes.shape[1]), dtype=self.codes.dtype)
+        scale = np.zeros(cap, dtype=np.float32)
+        n = min(cap, len(self.scale))
+        codes[:n], scale[:n] = self.codes[:n], self.scale[:n]
+        self.codes, self.scale = codes, scale
+
+    def set(self, rows, vectors: np.ndarray) -> None:
+        v = np.asarray(vectors, dtype=np.float32).reshape(-1, self.size)
+        if self.mode == "int8":
+            s = np.maximum(np.abs(v).max(axis=1), 1e-12) / 127
+            self.codes[rows] = np.rint(v / s[:, None]).astype(np.int8)
+            self.scale[rows] = s
+        else:
+            self.codes[rows] = np.packbits(v > 0, axis=1)
+
+    def take(self, keep: List[int]) -> None:
+        self.codes[:len(keep)] = self.codes[keep]
+        self.scale[:len(keep)] = self.scale[keep]
+
+    def scores(self, q: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """Approximate (queries x rows) similarity; only the ranking is meaningful for binary."""
+        out = np.empty((len(q), rows.size), dtype=np.float32)
+        qbits = np.packbits(q > 0, axis=1) if self.mode == "binary" else None
+        for i in range(0, rows.size, _BLOCK):
+            r = rows[i:i + _BLOCK]
+            if self.mode == "int8":
+                out[:, i:i + _BLOCK] = (q @ self.codes[r].astype(np.float32).T) * self.scale[r]
+            else:
+                out[:, i:i + _BLOCK] = -_hamming(qbits, self.codes[r])
+        return out
+
+class LocalBackend(VectorBackend):
+    """
+    In-process vector store: row-normalized float32 vectors in a memory-mapped
+    file plus a JSON sidecar with ids, payloads and tombstones. Filters are
+    pushed down as boolean masks over payload columns before a brute-force
+    matmul, which beats a network hop for corpora of this size.
+    With `quantization` ("int8"/"binary") candidates are picked on in-RAM
+    quantized codes (top_k * oversampling) and rescored against the
+    full-precision rows, so only those rows are read from the file.
+    Every worker process opens the same directory: writes (and compaction)
+    hold an flock on its lock file and first reload the sidecar if another
+    process replaced it; reads pick up other processes' writes on their next
+    call.
+    """
+    name = "local"
+
+    def __init__(self, *, path: str, collection: str, size: int, quantization: str = "none",
+                 oversampling: float = 3.0):
+        self.dir = os.path.join(path, collection)
+        self.size = size
+        self.oversampling = oversampling
+        self._codes = _Codes(quantization, size) if quantization != "none" else None
+        self._lock = threading.RLock()
+        self._vec_path = os.path.join(self.dir, "vectors.f32")
+        self._meta_path = os.path.join(self.dir, "meta.json")
+        self._lock_path = os.path.join(self.dir, ".lock")
+        self._seen: Optional[Tuple[int, int]] = None  # sidecar (inode, mtime) last loaded or written here
+        self.ids: List[str] = []
+        self.payloads: List[Dict[str, Any]] = []
+        self.alive: List[bool] = []
+        self._row: Dict[str, int] = {}
+        self._cols: Dict[str, np.ndarray] = {}
+        self._mm: Optional[np.memmap] = None
+        self._cap = 0
+
+    # ---- storage ----
+    def ensure_collection(self) -> None:
+        with self._lock:
+            if self._mm is not None:
+                return
+            os.makedirs(self.dir, exist_ok=True)
+            if not os.path.exists(self._vec_path):
+                open(self._vec_path, "wb").close()
+            self._load()
+
+    def _stamp(self) -> Optional[Tuple[int, int]]:
+        # The sidecar is replaced (new inode) on every write, so this changes with each one
+        try:
+            st = os.stat(self._meta_path)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns
+
+    def _load(self) -> None:
+        stamp = self._stamp()
+        if stamp is not None:
+            with open(self._meta_path) as f:
+                m = json.load(f)
+            if m["size"] != self.size:
+                raise ValueError(f"{self.dir} holds {m['size']}-d vectors, expected {self.size}")
+            self.ids, self.payloads, self.alive = m["ids"], m["payloads"], m["alive"]
+            self._row = {pid: i for i, pid in enumerate(self.ids) if self.alive[i]}
+        self._seen = stamp
+        self._cols.clear()
+        self._open(max(64, len(self.ids)))
+        if self._codes is not None:
+            for i in range(0, len(self.ids), _BLOCK):
+                n = min(_BLOCK, len(self.ids) - i)
+                self._codes.set(slice(i, i + n), self._mm[i:i + n])
+
+    def _refresh(self) -> None:
+        # Another process wrote since we last looked: its rows are in the shared file, reload the sidecar
+        if self._stamp() != self._seen:
+            self._load()
+
+    @contextlib.contextmanager
+    def _writing(self):
+        self.ensure_collection()
+        with self._lock, open(self._lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)  # released when the file is closed
+            self._refresh()
+            try:
+                yield
+            except BaseException:
+                self._seen = None  # memory may be ahead of the files now: reload on the next call
+                raise
+
+    def _open(self, cap: int) -> None:
+        if self._mm is not None:
+            self._mm.flush()
+            self._mm = None
+        need = cap * self.size * 4
+        if os.path.getsize(self._vec_path) < need:
+            with open(self._vec_path, "r+b") as f:
+                f.truncate(need)
+        self._cap = os.path.getsize(self._vec_path) // (self.size * 4)
+        self._mm = np.memmap(self._vec_path, dtype=np.float32, mode="r+", shape=(self._cap, self.size))
+        if self._codes is not None:
+            self._codes.resize(self._cap)
+
+    def _flush(self) -> None:
+        self._mm.flush()
+        tmp = f"{self._meta_path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"size": self.size, "ids": self.ids, "payloads": self.payloads, "alive": self.alive}, f)
+        os.replace(tmp, self._meta_path)
+        self._seen = self._stamp()
+        self._cols.clear()
+
+    def _compact(self) -> None:
+        keep = [i for i, a in enumerate(self.alive) if a]
+        self._mm[:len(keep)] = self._mm[keep]
+        if self._codes is not None:
+            self._codes.take(keep)
+        self.ids = [self.ids[i] for i in keep]
+        self.payloads = [self.payloads[i] for i in keep]
+        self.alive = [True] * len(keep)
+        self._row = {pid: i for i, pid in enumerate(self.ids)}
+
+    # ---- filter pushdown ----
+    def _column(self, key: str) -> np.ndarray:
+        col = self._cols.get(key)
+        if col is None:
+            col = np.empty(len(self.payloads), dtype=object)
+            col[:] = [p.get(key) for p in self.payloads]
+            self._cols[key] = col
+        return col
+
+    def _mask(self, filters: Optional[Dict[str, Any]]) -> np.ndarray:
+        mask = np.asarray(self.alive, dtype=bool)
+        for k, v in (filters or {}).items():
+            col = self._column(k)
+            mask &= np.isin(col, list(v)) if isinstance(v, tuple) else (col == v)
+        return mask
+
+    # ---- VectorBackend ----
+    def upsert(self, points: List[Point]) -> None:
+        with self._writing():
+            for pid, vec, payload in points:
+                v = np.asarray(vec, dtype=np.float32)
+                n = np.linalg.norm(v)
+                row = self._row.get(pid)
+                if row is None:
+                    row = len(self.ids)
+                    if row >= self._cap:
+                        self._open(self._cap * 2)
+                    self.ids.append(pid)
+                    self.payloads.append(payload)
+                    self.alive.append(True)
+                    self._row[pid] = row
+                else:
+                    self.payloads[row] = payload
+                self._mm[row] = v / n if n else v
+                if self._codes is not None:
+                    self._codes.set([row], self._mm[row])
+            self._flush()
+
+    def existing_ids(self, ids: Iterable[str]) -> Set[str]:
+        self.ensure_collection()
+        with self._lock:
+            self._refresh()
+            return {pid for pid in ids if pid in self._row}
+
+    def delete(self, filters: Dict[str, Any], keep_ids: Optional[Iterable[str]] = None) -> None:
+        with self._writing():
+            keep = set(keep_ids or ())
+            rows = [int(i) for i in np.flatnonzero(self._mask(filters)) if self.ids[i] not in keep]
+            if not rows:
+                return
+            for i in rows:
+                self.alive[i] = False
+                self._row.pop(self.ids[i], None)
+            dead = len(self.alive) - len(self._row)
+            if dead > 64 and dead * 2 > len(self.alive):
+                self._compact()
+            self._flush()
+
+    def count(self) -> int:
+        self.ensure_collection()
+        with self._lock:
+            self._refresh()
+            return len(self._row)
+
+    def search(self, vectors, *, top_k, filters=None, with_vectors=False) -> List[List[ScoredPayload]]:
+        self.ensure_collection()
+        if not vectors:
+            return []
+        with self._lock:
+            self._refresh()
+            rows = np.flatnonzero(self._mask(filters))
+            if rows.size == 0:
+                return [[] for _ in vectors]
+            q = np.asarray(vectors, dtype=np.float32)
+            q /= np.maximum(np.linalg.norm(q, axis=1, keepdims=True), 1e-12)
+            if self._codes is not None:
+                rows, scores = self._rescored(q, rows, top_k)
+            else:
+                scores = q @ self._mm[rows].T
+            k = min(top_k, rows.size)
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            out = []
+            for s, cand in zip(scores, top):
+                order = cand[np.argsort(-s[cand], kind="stable")]
+                if with_vectors:  # rows are stored normalized; copy out of the memmap
+                    out.append([(self.payloads[rows[j]], float(s[j]), np.array(self._mm[rows[j]])) for j in order])
+                else:
+                    out.append([(self.payloads[rows[j]], float(s[j])) for j in order])
+            return out
+
+    def _rescored(self, q: np.ndarray, rows: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Candidate rows from the quantized codes (union over the queries) and
+        their exact cosine scores; a query's non-candidates score -inf.
+        """
+        n = min(rows.size, max(top_k, int(np.ceil(top_k * self.oversampling))))
+        approx = self._codes.scores(q, rows)
+        cand = np.argpartition(-approx, n - 1, axis=1)[:, :n]
+        union = np.unique(cand)
+        exact = np.full((len(q), union.size), -np.inf, dtype=np.float32)
+        full = q @ self._mm[rows[union]].T
+        pos = np.searchsorted(union, cand)
+        np.put_along_axis(exact, pos, np.take_along_axis(full, pos, axis=1), axis=1)
+        return rows[union], exact
+
+    def scroll(self, filters=None, *, limit=None) -> List[Tuple[Dict[str, Any], List[float]]]:
+        self.ensure_collection()
+        with self._lock:
+            self._refresh()
+            rows = np.flatnonzero(self._mask(filters))
+            if limit is not None:
+                rows = rows[:limit + 1]
+            return [(self.payloads[i], self._mm[i].tolist()) for i in rows]
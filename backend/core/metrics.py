@@ -0,0 +1,138 @@
+# app/metrics.py
+import bisect, threading, time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Latency buckets (seconds), tuned for stages between ~1ms and ~30s
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUANTILES = (0.5, 0.95, 0.99)
+
+_lock = threading.Lock()
+_hist: Dict[str, List[float]] = {}                     # stage -> [bucket counts..., +Inf count]
+_sums: Dict[str, float] = {}
+_counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+
+# Per-request stage durations (ms) for the Server-Timing header
+_request_timings: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("request_timings", default=None)
+
+def observe(stage: str, seconds: float) -> None:
+    with _lock:
+        counts = _hist.get(stage)
+        if counts is None:
+            counts = _hist[stage] = [0] * (len(BUCKETS) + 1)
+            _sums[stage] = 0.0
+        counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        _sums[stage] += seconds
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append((stage, seconds * 1000))
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a pipeline stage (works inside sync and async code)."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - t0)
+
+def inc(name: str, value: float = 1, **labels: str) -> None:
+    key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+def record_usage(model: str, usage) -> None:
+    """Token counts from an OpenAI response `usage` block (chat or embeddings)."""
+    if usage is None:
+        return
+    for kind in ("prompt_tokens", "completion_tokens"):
+        n = getattr(usage, kind, None)
+        if n:
+            inc("tokens_total", n, model=model, kind=kind.replace("_tokens", ""))
+
+def quantile(stage_name: str, q: float) -> Optional[float]:
+    """Estimate a quantile from histogram buckets (linear within a bucket)."""
+    with _lock:
+        counts = list(_hist.get(stage_name, ()))
+    total = sum(counts)
+    if not total:
+        return None
+    rank, seen, lo = q * total, 0, 0.0
+    for i, c in enumerate(counts):
+        hi = BUCKETS[i] if i < len(BUCKETS) else BUCKETS[-1]
+        if seen + c >= rank and c:
+            return lo + (hi - lo) * (rank - seen) / c
+        seen += c
+        lo = hi
+    return BUCKETS[-1]
+
+def _labels(pairs) -> str:
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}" if pairs else ""
+
+def render() -> str:
+    """Prometheus text exposition format."""
+    lines = ["# TYPE intervuum_stage_seconds histogram"]
+    with _lock:
+        hist = {k: list(v) for k, v in _hist.items()}
+        sums = dict(_sums)
+        counters = dict(_counters)
+    for name in sorted(hist):
+        cum = 0
+        for le, c in zip(BUCKETS + ("+Inf",), hist[name]):
+            cum += c
+            lines.append(f'intervuum_stage_seconds_bucket{{stage="{name}",le="{le}"}} {cum}')
+        lines.append(f'intervuum_stage_seconds_sum{{stage="{name}"}} {sums[name]:.6f}')
+        lines.append(f'intervuum_stage_seconds_count{{stage="{name}"}} {cum}')
+    lines.append("# TYPE intervuum_stage_quantile_seconds gauge")
+    for name in sorted(hist):
+        for q in QUANTILES:
+            lines.append(f'intervuum_stage_quantile_seconds{{stage="{name}",quantile="{q}"}} {quantile(name, q):.6f}')
+    seen = set()
+    for (name, labels), v in sorted(counters.items()):
+        if name not in seen:
+            lines.append(f"# TYPE intervuum_{name} counter")
+            seen.add(name)
+        lines.append(f"intervuum_{name}{_labels(labels)} {v:g}")
+    return "\n".join(lines) + "\n"
+
+def _server_timing(timings: List[Tuple[str, float]]) -> str:
+    merged: Dict[str, float] = {}
+    for name, ms in timings:
+        merged[name] = merged.get(name, 0.0) + ms
+    return ", ".join(f"{name};dur={ms:.1f}" for name, ms in merged.items())
+
+class ServerTimingMiddleware:
+    """
+    ASGI middleware: collects the stages timed during a request and returns
+    them as a `Server-Timing` header; also records whole-request latency.
+    Streaming responses only report stages finished before the first byte.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        timings: List[Tuple[str, float]] = []
+        token = _request_timings.set(timings)
+        t0 = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                if timings:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", _server_timing(timings).encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_timings.reset(token)
+            # Route template, not the raw path, to keep label cardinality bounded
+            path = getattr(scope.get("route"), "path", "unmatched")
+            observe(f"request:{path}", time.perf_counter() - t0)
+            inc("requests_total", path=path, status=status["code"])
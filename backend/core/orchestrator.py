@@ -1,84 +1,173 @@
 # app/orchestrator.py
-from typing import Dict, Any, List
-import time, uuid
+from typing import Dict, Any, AsyncIterator, Iterator, List
+import asyncio, json, os, threading, time, uuid
+from config import (
+    INDEX_MANIFEST_PATH, QDRANT_COLLECTION, VECTOR_BACKEND, PIPELINE_TURNS,
+    PLAN_LOOKAHEAD, PREPARED_TARGETS_MAX, PREPARED_TARGETS_TTL,
+)
 from data.content import RUBRICS, RESUMES
-from vectorstore import upsert_document
-from retrieval import bundle_queries, retrieve, is_grounded
-from llm import generate_question, summarize_rubric_for_intro, make_intro
+from vectorstore import (
+    upsert_document, delete_document, count_points, doc_fingerprint, content_hash,
+    INGESTED, rubric_doc_id, resume_doc_id,
+)
+from retrieval import bundle_queries, retrieve, aretrieve, asearch_bundle, merge_hits, is_grounded
+import artifacts, metrics, scheduler, session_context, upstream
+from cache import LRUCache
+from tokens import tokenizer
+from sessions import Session, Turn, make_store
+from llm import (
+    generate_question, stream_question, summarize_rubric_for_intro, make_intro,
+    agenerate_question, astream_question, asummarize_rubric_for_intro,
+)
 
-# Short-term, in-memory runtime
-SESSIONS: Dict[str, Dict[str, Any]] = {}
+# Session state lives in a bounded, optionally shared store (see SESSION_STORE)
+STORE = make_store()
 INDEXED: bool = False
+READY: bool = False
+_index_lock = threading.Lock()
+
+# Answer-independent retrieval for upcoming plan targets, prepared in the background.
+# Keyed by (role, candidate, dimension): the same for every session of that candidate.
+_PREPARED = LRUCache(maxsize=PREPARED_TARGETS_MAX, ttl=PREPARED_TARGETS_TTL, name="prepared_targets")
 
 def uid() -> str: return str(uuid.uuid4())
 
+def session_filters(candidate_name: str, role: str) -> Dict[str, Any]:
+    # A session retrieves from its own rubric and resume only (plus bulk-ingested ones for the same
+    # role/candidate), never another candidate's resume
+    ids = (rubric_doc_id(role), resume_doc_id(candidate_name, role))
+    return {"doc_id": ids + tuple(INGESTED + i for i in ids)}
+
+def _all_documents() -> List[Dict[str, Any]]:
+    docs = []
+    for role, text in RUBRICS.items():
+        docs.append({"doc_id": rubric_doc_id(role), "text": text, "meta": {"dtype":"rubric","role":role}})
+    for (candidate_name, role), text in RESUMES.items():
+        docs.append({"doc_id": resume_doc_id(candidate_name, role), "text": text,
+                     "meta": {"dtype":"resume","role":role,"candidate_name":candidate_name}})
+    return docs
+
+_MANIFEST_ID = f"{VECTOR_BACKEND}:{QDRANT_COLLECTION}"
+
+def _load_manifest() -> Dict[str, Any]:
+    try:
+        with open(INDEX_MANIFEST_PATH) as f:
+            m = json.load(f)
+        return m if m.get("collection") == _MANIFEST_ID else {}
+    except (OSError, ValueError):
+        return {}
+
+def _save_manifest(docs: Dict[str, Any]):
+    os.makedirs(os.path.dirname(INDEX_MANIFEST_PATH) or ".", exist_ok=True)
+    tmp = f"{INDEX_MANIFEST_PATH}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump({"collection": _MANIFEST_ID, "docs": docs}, f, indent=1, sort_keys=True)
+    os.replace(tmp, INDEX_MANIFEST_PATH)
+
 def index_all_content():
+    """
+    Incremental indexing: unchanged documents (per the manifest) are skipped,
+    changed ones only embed their new chunks, removed ones are deleted.
+    """
     global INDEXED
     if INDEXED:  # idempotent
         return
-    # Upsert rubrics
-    for role, text in RUBRICS.items():
-        upsert_document(doc_id=f"rubric::{role}", text=text, meta={"dtype":"rubric","role":role})
-    # Upsert resumes
-    for (candidate_name, role), text in RESUMES.items():
-        upsert_document(doc_id=f"resume::{candidate_name}::{role}", text=text,
-                        meta={"dtype":"resume","role":role,"candidate_name":candidate_name})
-    INDEXED = True
+    with _index_lock:  # one run per process; concurrent callers wait for it
+        if INDEXED:
+            return
+        docs = _all_documents()
+        want = {d["doc_id"]: doc_fingerprint(d["text"], d["meta"]) for d in docs}
+        prev = _load_manifest().get("docs", {})
+        # Trust the manifest only while the collection still holds what it describes
+        # (more points is fine: bulk ingestion adds documents of its own)
+        have = prev
+        if have and count_points() < sum(v["chunks"] for v in have.values()):
+            have = {}
+        for d in docs:
+            if have.get(d["doc_id"], {}).get("hash") != want[d["doc_id"]]["hash"]:
+                upsert_document(doc_id=d["doc_id"], text=d["text"], meta=d["meta"])
+        for doc_id in set(prev) - set(want):
+            delete_document(doc_id)
+        if have != want:
+            _save_manifest(want)
+            session_context.invalidate()
+        INDEXED = True
 
-def _recent(session_id: str, k=8) -> List[Dict[str, Any]]:
-    turns = SESSIONS[session_id]["turns"]
-    return turns[-k:]
+def prepare_worker() -> None:
+    """
+    Everything a worker builds before it is ready (the boot task in main.py):
+    the content index, the vector store backend and the shared OpenAI clients
+    (heavy SDK imports) and the tokenizer. Safe to call more than once.
+    """
+    global READY
+    index_all_content()
+    upstream.openai_client()
+    upstream.aopenai_client()
+    tokenizer()
+    READY = True
 
-def _inc_coverage(sess: Dict[str,Any], dim: str):
-    cov = sess["coverage"]
+def worker_ready() -> bool:
+    return READY
+
+def _degraded(stage: str, e: Exception) -> Dict[str, Any]:
+    # Upstream gave up (breaker open / turn budget spent): continue without grounding, the
+    # question becomes the target's fallback instead of the turn failing
+    metrics.inc("degraded_total", stage=stage, reason=type(e).__name__)
+    return {"snippets": [], "citations": [], "round_trips": {"embed": 0, "search": 0}, "degraded": True}
+
+def _grounded_retrieve(bundle: List[str], filters: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        return retrieve(bundle, filters=filters)
+    except upstream.UpstreamError as e:
+        return _degraded("retrieve", e)
+
+async def _agrounded_retrieve(bundle: List[str], filters: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        return await aretrieve(bundle, filters=filters)
+    except upstream.UpstreamError as e:
+        return _degraded("retrieve", e)
+
+async def _asession(session_id: str) -> Session:
+    sess = await STORE.aget(session_id)
+    assert sess, "invalid session_id"
+    return sess
+
+def _recent(sess: Session, k=8) -> List[Dict[str, Any]]:
+    return [t.to_dict() for t in sess.turns[-k:]]
+
+def _inc_coverage(sess: Session, dim: str):
+    cov = sess.coverage
     cov[dim] = cov.get(dim, 0) + 1
 
-def start_session(*, candidate_name: str, role: str, minutes: int=60):
-    index_all_content()  # ensure Qdrant ready
+def _plan(sess: Session) -> Dict[str, Any]:
+    if sess.plan is None:  # sessions stored before plans existed
+        sess.plan = scheduler.build_plan(RUBRICS.get(sess.role), sess.minutes)
+    return sess.plan
 
+def _asked(sess: Session, dim: str):
+    _inc_coverage(sess, dim)
+    scheduler.advance(_plan(sess), sess.coverage, dim, time.time() - sess.started_at)
+
+def _open_session(candidate_name: str, role: str, minutes: int) -> Session:
     # Validate existence
     if role not in RUBRICS:
         raise ValueError(f"No rubric found for role '{role}' in data/content.py")
     if (candidate_name, role) not in RESUMES:
         raise ValueError(f"No resume found for ({candidate_name}, {role}) in data/content.py")
 
-    sid = uid()
-    SESSIONS[sid] = {
-        "candidate_name": candidate_name,
-        "role": role,
-        "minutes": minutes,
-        "turns": [],
-        "coverage": {},
-        "started_at": time.time()
-    }
-
-    # Intro with rubric bullets
-    bullets = summarize_rubric_for_intro(RUBRICS[role])
-    intro = make_intro(candidate_name, role, bullets)
-    SESSIONS[sid]["turns"].append({"actor":"ai","text":intro})
-
-    # First grounded question (resume/projects)
-    tgt = {"dimension":"Resume Projects","difficulty":"easy"}
-    bundle = bundle_queries(candidate_name, role, None, tgt)
-    grounded = retrieve(bundle, filters={"role": role})
-    try:
-        q = generate_question(
-            snippets=grounded["snippets"],
-            candidate_name=candidate_name,
-            role=role,
-            target=tgt,
-            recent_turns=_recent(sid)
-        )
-        if not is_grounded(q):
-            # Ensure at least one resume hit if possible: if empty, fall back to clarifier
-            q = {
-                "question": "Could you briefly walk me through your most relevant project in your resume and your specific responsibilities?",
-                "followups": ["What were the key constraints and success metrics?"],
-                "dimension": "Resume Projects",
-                "difficulty": "easy",
-                "rationale_citations": grounded.get("citations", [])
-            }
-    except Exception:
+    return Session(uid(), candidate_name, role, minutes, plan=scheduler.build_plan(RUBRICS[role], minutes))
+
+def _add_intro(sess: Session, bullets: List[str]) -> str:
+    intro = make_intro(sess.candidate_name, sess.role, bullets)
+    sess.turns.append(Turn("ai", intro))
+    return intro
+
+FIRST_TARGET = scheduler.OPENING
+
+def _finish_first(sess: Session, grounded: Dict[str, Any], q: Dict[str, Any] | None) -> Dict[str, Any]:
+    tgt = FIRST_TARGET
+    if q is None or not is_grounded(q):
+        # Ensure at least one resume hit if possible: if empty, fall back to clarifier
         q = {
             "question": "Could you briefly walk me through your most relevant project in your resume and your specific responsibilities?",
             "followups": ["What were the key constraints and success metrics?"],
@@ -87,47 +176,231 @@ def start_session(*, candidate_name: str, role: str, minutes: int=60):
             "rationale_citations": grounded.get("citations", [])
         }
 
-    SESSIONS[sid]["turns"].append({"actor":"ai","text":q["question"], "citations": q.get("rationale_citations", grounded["citations"])})
-    _inc_coverage(SESSIONS[sid], q.get("dimension", tgt["dimension"]))
-    return {"session_id": sid, "intro": intro, "question": q}
+    sess.turns.append(Turn("ai", q["question"], q.get("rationale_citations", grounded["citations"]),
+                           grounded["round_trips"]))
+    _asked(sess, q.get("dimension", tgt["dimension"]))
+    sess.pending_question = q  # served by the first /transcribe call; the caller stores the session
+    return q
 
-def next_turn(*, session_id: str, candidate_text: str):
-    sess = SESSIONS.get(session_id)
-    assert sess, "invalid session_id"
-    role = sess["role"]
-    name = sess["candidate_name"]
+def _intro_key(role: str) -> str:
+    return content_hash("intro", RUBRICS[role])
+
+def _first_key(candidate_name: str, role: str) -> str:
+    # Content version: rubric + resume text (the intro is derived from the rubric)
+    return content_hash("first_question", candidate_name, role, RUBRICS[role], RESUMES[(candidate_name, role)])
+
+def _first_ok(built) -> bool:
+    # Only cache real grounded questions, never a fallback after a failure
+    return built[0] is not None and is_grounded(built[0])
 
-    # append candidate turn
-    sess["turns"].append({"actor":"candidate","text":candidate_text})
+def _first_args(candidate_name: str, role: str, intro: str, grounded: Dict[str, Any]) -> Dict[str, Any]:
+    # The first question only sees the intro turn, so it is identical across sessions
+    return dict(
+        snippets=grounded["snippets"],
+        candidate_name=candidate_name,
+        role=role,
+        target=FIRST_TARGET,
+        recent_turns=[{"actor":"ai","text":intro}]
+    )
 
-    # choose next dimension with lowest coverage (simple heuristic)
-    dims = ["System Design","Problem Solving","Data/SQL","Resume Projects","Architecture Decisions","Ownership","Communication","Leadership"]
-    counts = {d: sess["coverage"].get(d, 0) for d in dims}
-    target_dim = min(counts, key=counts.get)
-    diff = "easy" if counts[target_dim] < 2 else ("medium" if counts[target_dim] < 4 else "hard")
-    tgt = {"dimension": target_dim, "difficulty": diff}
+def _light(grounded: Dict[str, Any]) -> Dict[str, Any]:
+    return {"citations": grounded["citations"], "round_trips": grounded["round_trips"]}
 
-    # retrieve grounded context (resume + rubric + last answer)
-    bundle = bundle_queries(name, role, candidate_text, tgt)
-    grounded = retrieve(bundle, filters={"role": role})
+def _from_cache(built, cached: bool):
+    q, grounded = built
+    if cached:
+        grounded = {**grounded, "round_trips": {"embed": 0, "search": 0}}
+    return (dict(q) if q else q), grounded
 
+def _plain_bullets(role: str, e: Exception) -> List[str]:
+    # Chat upstream unavailable: the rubric's dimension names (not cached, so the summary is retried)
+    metrics.inc("degraded_total", stage="summarize_rubric", reason=type(e).__name__)
+    return scheduler.rubric_dimensions(RUBRICS[role])[:7]
+
+def _bullets(role: str) -> List[str]:
     try:
-        q = generate_question(
-            snippets=grounded["snippets"],
-            candidate_name=name,
-            role=role,
-            target=tgt,
-            recent_turns=_recent(session_id)
-        )
-        if not is_grounded(q):
-            q = {
-                "question": f"Staying on {tgt['dimension']}, could you share a concrete example from your resume that best demonstrates your skills here?",
-                "followups": ["What tradeoffs did you consider?", "How did you validate success?"],
-                "dimension": tgt["dimension"],
-                "difficulty": tgt["difficulty"],
-                "rationale_citations": grounded.get("citations", [])
-            }
-    except Exception:
+        return artifacts.get_or_build(artifacts.INTROS, _intro_key(role),
+                                      lambda: summarize_rubric_for_intro(RUBRICS[role]), cache_if=bool)[0]
+    except upstream.UpstreamError as e:
+        return _plain_bullets(role, e)
+
+async def _abullets(role: str) -> List[str]:
+    try:
+        return (await artifacts.aget_or_build(artifacts.INTROS, _intro_key(role),
+                                              lambda: asummarize_rubric_for_intro(RUBRICS[role]), cache_if=bool))[0]
+    except upstream.UpstreamError as e:
+        return _plain_bullets(role, e)
+
+def _first_question(candidate_name: str, role: str, intro: str):
+    def build():
+        bundle = bundle_queries(candidate_name, role, None, FIRST_TARGET)
+        grounded = _grounded_retrieve(bundle, session_filters(candidate_name, role))
+        try:
+            q = generate_question(**_first_args(candidate_name, role, intro, grounded)) if grounded["snippets"] else None
+        except Exception:
+            q = None
+        return q, _light(grounded)
+    return _from_cache(*artifacts.get_or_build(artifacts.FIRST_QUESTIONS, _first_key(candidate_name, role),
+                                               build, cache_if=_first_ok))
+
+async def _afirst_question(candidate_name: str, role: str, intro: str):
+    async def build():
+        bundle = bundle_queries(candidate_name, role, None, FIRST_TARGET)
+        grounded = await _agrounded_retrieve(bundle, session_filters(candidate_name, role))
+        try:
+            q = (await agenerate_question(**_first_args(candidate_name, role, intro, grounded))
+                 if grounded["snippets"] else None)
+        except Exception:
+            q = None
+        return q, _light(grounded)
+    return _from_cache(*(await artifacts.aget_or_build(artifacts.FIRST_QUESTIONS, _first_key(candidate_name, role),
+                                                       build, cache_if=_first_ok)))
+
+def start_session(*, candidate_name: str, role: str, minutes: int=60):
+    index_all_content()  # ensure Qdrant ready
+    sess = _open_session(candidate_name, role, minutes)
+    with upstream.budget():
+        session_context.load(session_filters(candidate_name, role))  # rank this session's corpus locally from now on
+
+        # Intro with rubric bullets (shared per role)
+        intro = _add_intro(sess, _bullets(role))
+
+        # First grounded question (resume/projects), shared per (candidate, role, content version)
+        q, grounded = _first_question(candidate_name, role, intro)
+    q = _finish_first(sess, grounded, q)
+    STORE.put(sess)
+    return {"session_id": sess.session_id, "intro": intro, "question": q}
+
+async def astart_session(*, candidate_name: str, role: str, minutes: int=60):
+    """Async `start_session`: non-blocking OpenAI/Qdrant calls, same session state."""
+    if not INDEXED:
+        await asyncio.to_thread(index_all_content)
+    sess = _open_session(candidate_name, role, minutes)
+    with upstream.budget():
+        await session_context.aload(session_filters(candidate_name, role))
+        intro = _add_intro(sess, await _abullets(role))
+        q, grounded = await _afirst_question(candidate_name, role, intro)
+    q = _finish_first(sess, grounded, q)
+    await STORE.aput(sess)
+    prepare_upcoming(sess)
+    return {"session_id": sess.session_id, "intro": intro, "question": q}
+
+async def aprewarm(pairs: List[tuple] | None = None, *, concurrency: int = 4) -> int:
+    """
+    Build intro bullets and first questions ahead of time for known
+    (candidate_name, role) pairs (default: every resume in data/content.py).
+    Returns how many pairs ended up warm.
+    """
+    if not INDEXED:
+        await asyncio.to_thread(index_all_content)
+    sem = asyncio.Semaphore(concurrency)
+
+    async def warm(candidate_name: str, role: str) -> bool:
+        async with sem:
+            try:
+                await session_context.aload(session_filters(candidate_name, role))
+                intro = make_intro(candidate_name, role, await _abullets(role))
+                q, _ = await _afirst_question(candidate_name, role, intro)
+                return q is not None
+            except Exception:
+                return False
+
+    todo = [p for p in (pairs or list(RESUMES)) if p[1] in RUBRICS and p in RESUMES]
+    return sum(await asyncio.gather(*[warm(c, r) for c, r in todo]))
+
+# Session reads/writes used by main.py. Each has an async twin for the event loop, which goes
+# through the store's async methods (a shared store's I/O runs off the loop).
+def _pending(sess: Session | None) -> bool:
+    return bool(sess and sess.pending_question is not None)
+
+def first_question_pending(session_id: str) -> bool:
+    return _pending(STORE.get(session_id))
+
+async def afirst_question_pending(session_id: str) -> bool:
+    return _pending(await STORE.aget(session_id))
+
+def _pop_first(taken: List[Dict[str, Any]]):
+    def pop(sess: Session):
+        if sess.pending_question is not None:  # served once, even with concurrent callers
+            taken.append(sess.pending_question)
+            sess.pending_question = None
+    return pop
+
+def take_first_question(session_id: str) -> Dict[str, Any] | None:
+    """Pop the first question prepared by `start_session`; None once it has been served."""
+    if not first_question_pending(session_id):
+        return None
+    taken: List[Dict[str, Any]] = []
+    STORE.update(session_id, _pop_first(taken))
+    return taken[0] if taken else None
+
+async def atake_first_question(session_id: str) -> Dict[str, Any] | None:
+    if not await afirst_question_pending(session_id):
+        return None
+    taken: List[Dict[str, Any]] = []
+    await STORE.aupdate(session_id, _pop_first(taken))
+    return taken[0] if taken else None
+
+def _add_transcript(item: Dict[str, Any]):
+    def add(sess: Session):
+        sess.transcripts.append(item)
+        sess.partial = []
+    return add
+
+def record_transcript(session_id: str, item: Dict[str, Any]) -> None:
+    # Unknown/expired session: nothing to record, the turn itself will fail with a clear error
+    STORE.update(session_id, _add_transcript(item))
+
+async def arecord_transcript(session_id: str, item: Dict[str, Any]) -> None:
+    await STORE.aupdate(session_id, _add_transcript(item))
+
+def _put_segment(index: int, text: str):
+    def put_segment(sess: Session):
+        if len(sess.partial) <= index:
+            sess.partial.extend([""] * (index + 1 - len(sess.partial)))
+        sess.partial[index] = text
+    return put_segment
+
+def record_partial(session_id: str, index: int, text: str) -> None:
+    """Rolling transcript of a live answer: segment `index` was transcribed as `text`."""
+    STORE.update(session_id, _put_segment(index, text))
+
+async def arecord_partial(session_id: str, index: int, text: str) -> None:
+    await STORE.aupdate(session_id, _put_segment(index, text))
+
+def _next_target(sess: Session) -> Dict[str, Any]:
+    return scheduler.next_target(_plan(sess), sess.coverage)
+
+def _upcoming(sess: Session | None, n: int) -> List[Dict[str, Any]]:
+    return scheduler.upcoming(_plan(sess), sess.coverage, n) if sess else []
+
+def upcoming_targets(session_id: str, n: int = PLAN_LOOKAHEAD) -> List[Dict[str, Any]]:
+    return _upcoming(STORE.get(session_id), n)
+
+async def aupcoming_targets(session_id: str, n: int = PLAN_LOOKAHEAD) -> List[Dict[str, Any]]:
+    return _upcoming(await STORE.aget(session_id), n)
+
+def _answered(candidate_text: str):
+    return lambda s: s.turns.append(Turn("candidate", candidate_text))
+
+def _turn_inputs(sess: Session | None, candidate_text: str):
+    assert sess, "invalid session_id"
+    tgt = _next_target(sess)
+
+    # retrieval bundle for grounded context (resume + rubric + last answer)
+    bundle = bundle_queries(sess.candidate_name, sess.role, candidate_text, tgt)
+    return sess, tgt, bundle
+
+def _begin_turn(session_id: str, candidate_text: str):
+    # append candidate turn; `sess` is a snapshot for retrieval/generation, writes go through STORE.update
+    return _turn_inputs(STORE.update(session_id, _answered(candidate_text)), candidate_text)
+
+async def _abegin_turn(session_id: str, candidate_text: str):
+    return _turn_inputs(await STORE.aupdate(session_id, _answered(candidate_text)), candidate_text)
+
+def _answer(tgt: Dict[str, Any], grounded: Dict[str, Any], q: Dict[str, Any] | None):
+    # q is None when generation failed; ungrounded output is replaced as well
+    if q is None or not is_grounded(q):
         q = {
             "question": f"Staying on {tgt['dimension']}, could you share a concrete example from your resume that best demonstrates your skills here?",
             "followups": ["What tradeoffs did you consider?", "How did you validate success?"],
@@ -136,6 +409,172 @@ def next_turn(*, session_id: str, candidate_text: str):
             "rationale_citations": grounded.get("citations", [])
         }
 
-    sess["turns"].append({"actor":"ai","text":q["question"], "citations": q.get("rationale_citations", grounded["citations"])})
-    _inc_coverage(sess, q.get("dimension", tgt["dimension"]))
-    return {"question": q, "coverage": sess["coverage"]}
+    def ask(s: Session):
+        # Applied to the stored session, not the snapshot: keeps writes made while this turn ran
+        s.turns.append(Turn("ai", q["question"], q.get("rationale_citations", grounded["citations"]),
+                            grounded["round_trips"]))
+        _asked(s, q.get("dimension", tgt["dimension"]))
+
+    return q, ask
+
+def _turn_result(sess: Session | None, q: Dict[str, Any], grounded: Dict[str, Any]) -> Dict[str, Any]:
+    assert sess, "invalid session_id"
+    return {"question": q, "coverage": sess.coverage, "round_trips": grounded["round_trips"],
+            "upcoming": scheduler.upcoming(sess.plan, sess.coverage, PLAN_LOOKAHEAD)}
+
+def _finish_turn(sess: Session, tgt: Dict[str, Any], grounded: Dict[str, Any], q: Dict[str, Any] | None):
+    q, ask = _answer(tgt, grounded, q)
+    return _turn_result(STORE.update(sess.session_id, ask), q, grounded)
+
+async def _afinish_turn(sess: Session, tgt: Dict[str, Any], grounded: Dict[str, Any], q: Dict[str, Any] | None):
+    q, ask = _answer(tgt, grounded, q)
+    sess = await STORE.aupdate(sess.session_id, ask)
+    out = _turn_result(sess, q, grounded)
+    prepare_upcoming(sess)
+    return out
+
+def _qg_args(sess: Session, tgt: Dict[str, Any], grounded: Dict[str, Any]) -> Dict[str, Any]:
+    return dict(
+        snippets=grounded["snippets"],
+        candidate_name=sess.candidate_name,
+        role=sess.role,
+        target=tgt,
+        recent_turns=_recent(sess)
+    )
+
+def next_turn(*, session_id: str, candidate_text: str):
+    sess, tgt, bundle = _begin_turn(session_id, candidate_text)
+    with upstream.budget():
+        grounded = _grounded_retrieve(bundle, session_filters(sess.candidate_name, sess.role))
+        try:
+            q = generate_question(**_qg_args(sess, tgt, grounded)) if grounded["snippets"] else None
+        except Exception:
+            q = None
+    return _finish_turn(sess, tgt, grounded, q)
+
+async def _aprefetch(sess: Session, tgt: Dict[str, Any]) -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    bundle = bundle_queries(sess.candidate_name, sess.role, None, tgt)
+    round_trips = {"embed": 0, "search": 0}
+    per_query = await asearch_bundle(bundle, session_filters(sess.candidate_name, sess.role), round_trips)
+    return {"target": tgt, "bundle": bundle, "per_query": per_query, "round_trips": round_trips,
+            "ms": (time.perf_counter() - t0) * 1000}
+
+def _prepared_key(sess: Session, tgt: Dict[str, Any]) -> tuple:
+    return (sess.role, sess.candidate_name, tgt["dimension"])
+
+def _drop_failed(key: tuple, task: asyncio.Task) -> None:
+    if task.cancelled() or task.exception() is not None:
+        _PREPARED.pop(key)
+
+def prepare_upcoming(sess: Session) -> int:
+    """
+    Start background retrieval for the session's next PLAN_LOOKAHEAD targets
+    (must run inside the event loop). Returns how many were started.
+    """
+    if not PIPELINE_TURNS:
+        return 0
+    started = 0
+    for tgt in scheduler.upcoming(_plan(sess), sess.coverage, PLAN_LOOKAHEAD):
+        key = _prepared_key(sess, tgt)
+        if _PREPARED.get(key) is None:
+            task = upstream.spawn(_aprefetch(sess, tgt))  # not bound by the current turn's budget
+            task.add_done_callback(lambda t, key=key: _drop_failed(key, t))
+            _PREPARED.put(key, task)
+            started += 1
+    return started
+
+async def aprefetch_turn(session_id: str) -> Dict[str, Any]:
+    """
+    Pipelined mode: the next target comes from the plan, and every query but
+    "follow-up on:" is independent of the answer, so their retrieval can run
+    while the answer audio is still being transcribed. Usually it already
+    has: `prepare_upcoming` started it when the previous question was asked.
+    """
+    sess = await _asession(session_id)
+    tgt = _next_target(sess)
+    task = _PREPARED.get(_prepared_key(sess, tgt))
+    if task is not None and task.get_loop() is asyncio.get_running_loop():
+        try:
+            return {**(await asyncio.shield(task)), "target": tgt}
+        except Exception:
+            pass  # retrieve afresh below
+    return await _aprefetch(sess, tgt)
+
+async def _aretrieve_turn(sess: Session, tgt: Dict[str, Any], bundle: List[str],
+                          prefetched: Dict[str, Any] | None, timings: Dict[str, float]) -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    filters = session_filters(sess.candidate_name, sess.role)
+    pre = prefetched["bundle"] if prefetched else []
+    if prefetched and prefetched["target"] == tgt and bundle[:len(pre)] == pre:
+        # Only the answer-dependent tail is left to fetch
+        round_trips = dict(prefetched["round_trips"])
+        try:
+            tail = await asearch_bundle(bundle[len(pre):], filters, round_trips)
+        except upstream.UpstreamError as e:
+            _degraded("retrieve_tail", e)
+            tail = []  # the prepared snippets still ground the question
+        grounded = merge_hits(prefetched["per_query"] + tail, round_trips)
+        timings["prefetch_ms"] = prefetched["ms"]
+    else:
+        grounded = await _agrounded_retrieve(bundle, filters)
+    timings["retrieve_ms"] = (time.perf_counter() - t0) * 1000
+    return grounded
+
+async def anext_turn(*, session_id: str, candidate_text: str, prefetched: Dict[str, Any] | None = None):
+    """Async `next_turn`; pass the result of `aprefetch_turn` to reuse its retrieval."""
+    timings: Dict[str, float] = {}
+    sess, tgt, bundle = await _abegin_turn(session_id, candidate_text)
+    with upstream.budget():
+        grounded = await _aretrieve_turn(sess, tgt, bundle, prefetched, timings)
+        t0 = time.perf_counter()
+        try:
+            q = await agenerate_question(**_qg_args(sess, tgt, grounded), stats=timings) if grounded["snippets"] else None
+        except Exception:
+            q = None
+        timings["generate_ms"] = (time.perf_counter() - t0) * 1000
+    out = await _afinish_turn(sess, tgt, grounded, q)
+    return {**out, "timings": timings}
+
+def stream_next_turn(*, session_id: str, candidate_text: str) -> Iterator[Dict[str, Any]]:
+    """
+    Same as `next_turn`, but yields {"type":"delta","text":...} events while the
+    question is generated and ends with {"type":"final", "question", "coverage", ...}.
+    The final question is authoritative: it may be a fallback if the streamed
+    output failed or was not grounded.
+    """
+    sess, tgt, bundle = _begin_turn(session_id, candidate_text)
+    q = None
+    with upstream.budget():
+        grounded = _grounded_retrieve(bundle, session_filters(sess.candidate_name, sess.role))
+        try:
+            for ev in (stream_question(**_qg_args(sess, tgt, grounded)) if grounded["snippets"] else ()):
+                if ev["type"] == "delta":
+                    yield ev
+                else:
+                    q = ev["question"]
+        except Exception:
+            q = None
+    yield {"type": "final", **_finish_turn(sess, tgt, grounded, q)}
+
+async def astream_next_turn(*, session_id: str, candidate_text: str,
+                            prefetched: Dict[str, Any] | None = None) -> AsyncIterator[Dict[str, Any]]:
+    """Async `stream_next_turn`."""
+    timings: Dict[str, float] = {}
+    sess, tgt, bundle = await _abegin_turn(session_id, candidate_text)
+    q = None
+    with upstream.budget():
+        grounded = await _aretrieve_turn(sess, tgt, bundle, prefetched, timings)
+        t0 = time.perf_counter()
+        try:
+            if grounded["snippets"]:
+                async for ev in astream_question(**_qg_args(sess, tgt, grounded), stats=timings):
+                    if ev["type"] == "delta":
+                        yield ev
+                    else:
+                        q = ev["question"]
+        except Exception:
+            q = None
+        timings["generate_ms"] = (time.perf_counter() - t0) * 1000
+    out = await _afinish_turn(sess, tgt, grounded, q)
+    yield {"type": "final", **out, "timings": timings}
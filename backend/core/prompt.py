@@ -0,0 +1,68 @@
+# app/prompt.py
+import json, re
+from typing import Any, Dict, List, Optional, Tuple
+from config import PROMPT_TOKEN_BUDGET
+from tokens import count_tokens, static_tokens, truncate_tokens
+
+MESSAGE_OVERHEAD = 4           # role/separator tokens per chat message
+REPLY_PRIMING = 3
+MIN_SNIPPET_TOKENS = 64        # below this a truncated snippet is not worth sending
+RECENT_TURN_TOKENS = 300       # cap per recent turn (live answers can run for minutes)
+DUPLICATE_JACCARD = 0.8
+
+_WORD = re.compile(r"\w+")
+
+def _near_duplicate(a: set, b: set) -> bool:
+    return bool(a and b) and len(a & b) / len(a | b) >= DUPLICATE_JACCARD
+
+def dedupe_snippets(snippets: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+    """Best-scored first; a snippet whose words mostly repeat a better one is dropped."""
+    kept, shingles, dropped = [], [], 0
+    for s in sorted(snippets, key=lambda x: x.get("score", 0.0), reverse=True):
+        words = set(_WORD.findall(s["text"].lower()))
+        if any(_near_duplicate(words, w) for w in shingles):
+            dropped += 1
+            continue
+        kept.append(s)
+        shingles.append(words)
+    return kept, dropped
+
+def snippet_line(s: Dict[str, Any], text: Optional[str] = None) -> str:
+    tag = f"{s['meta'].get('dtype','doc')}:{s['doc_id']}#c{s['chunk_idx']}"
+    return f"[{tag}] {s['text'] if text is None else text}"
+
+def build_question_prompt(system: str, *, snippets: List[Dict[str, Any]], candidate_name: str, role: str,
+                          target: Dict[str, Any], recent_turns: List[Dict[str, Any]],
+                          budget: int = PROMPT_TOKEN_BUDGET) -> Tuple[List[Dict[str, str]], Dict[str, int]]:
+    """
+    Question-generation messages within `budget` input tokens. The system
+    prompt, header and (capped) recent turns always go in; snippets fill
+    what is left, best-scored first: near-duplicates are dropped, then the
+    lowest-scored snippets, and the last one that fits may be truncated.
+    Returns (messages, {"prompt_tokens", "snippets", "snippets_dropped"}).
+    """
+    recent = "\n".join(f"{t['actor']}: {truncate_tokens(t['text'], RECENT_TURN_TOKENS)}" for t in recent_turns[-2:])
+    head = f"Role: {role}\nCandidate: {candidate_name}\nTarget: {json.dumps(target)}\nRecent:\n{recent}\nSnippets:\n"
+    tail = "\nReturn JSON only."
+    used = (static_tokens(system) + count_tokens(head) + static_tokens(tail)
+            + 2 * MESSAGE_OVERHEAD + REPLY_PRIMING)
+
+    ranked, dropped = dedupe_snippets(snippets)
+    lines: List[str] = []
+    for i, s in enumerate(ranked):
+        line = snippet_line(s)
+        n = count_tokens(line) + (1 if lines else 0)  # newline separator
+        if used + n > budget:
+            room = budget - used - count_tokens(snippet_line(s, "")) - 1
+            if room >= MIN_SNIPPET_TOKENS:
+                line = snippet_line(s, truncate_tokens(s["text"], room))
+                n = count_tokens(line) + (1 if lines else 0)
+            if used + n > budget:
+                dropped += len(ranked) - i
+                break
+        lines.append(line)
+        used += n
+
+    messages = [{"role": "system", "content": system},
+                {"role": "user", "content": head + "\n".join(lines) + tail}]
+    return messages, {"prompt_tokens": used, "snippets": len(lines), "snippets_dropped": dropped}
@@ -0,0 +1,178 @@
+# app/qdrant_backend.py
+import math
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from qdrant_client import QdrantClient, AsyncQdrantClient
+from qdrant_client.http.models import (
+    Distance, VectorParams, PointStruct, Filter, FieldCondition, MatchValue, MatchAny, SearchRequest,
+    HasIdCondition, FilterSelector, ScalarQuantization, ScalarQuantizationConfig, ScalarType,
+    BinaryQuantization, BinaryQuantizationConfig, Disabled, SearchParams, QuantizationSearchParams,
+)
+from vector_backend import VectorBackend, Point, ScoredPayload
+import upstream
+
+def _secs(t: float) -> int:
+    # qdrant-client takes whole seconds (Qdrant's server-side operation timeout)
+    return max(1, int(math.ceil(t)))
+
+def _filter(filters: Dict[str, Any] | None, keep_ids: Optional[Iterable[str]] = None):
+    if not filters and keep_ids is None:
+        return None
+    conds = [FieldCondition(key=k, match=MatchAny(any=list(v)) if isinstance(v, tuple) else MatchValue(value=v))
+             for k, v in (filters or {}).items()]
+    must_not = [HasIdCondition(has_id=list(keep_ids))] if keep_ids is not None else None
+    return Filter(must=conds, must_not=must_not)
+
+def _quantization_config(mode: str):
+    # Quantized vectors stay in RAM; the originals (on disk) are only read to rescore candidates
+    if mode == "int8":
+        return ScalarQuantization(scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True))
+    if mode == "binary":
+        return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True))
+    if mode == "none":
+        return None
+    raise ValueError(f"Unknown VECTOR_QUANTIZATION '{mode}' (expected 'none', 'int8' or 'binary')")
+
+def _value(v):
+    return getattr(v, "value", v)  # enum member or the plain string the server sent
+
+def _quantization_key(q) -> Optional[tuple]:
+    # The settings that shape the quantized index. The server echoes configs back with its
+    # defaults filled in (e.g. binary "encoding"), so whole-model equality differs on every boot
+    if q is None or _value(q) == _value(Disabled.DISABLED):
+        return None
+    if isinstance(q, ScalarQuantization):
+        return ("scalar", _value(q.scalar.type), q.scalar.quantile, bool(q.scalar.always_ram))
+    if isinstance(q, BinaryQuantization):
+        return ("binary", _value(q.binary.encoding) or "one_bit", bool(q.binary.always_ram))
+    return (type(q).__name__,)  # product quantization: never what we configure
+
+class QdrantBackend(VectorBackend):
+    """
+    Remote Qdrant collection (sync client for indexing, async client for the
+    request path). Reads go through upstream kind "qdrant" (async searches
+    hedged), writes through "qdrant_write" (longer timeout, own breaker).
+    """
+    name = "qdrant"
+
+    def __init__(self, *, url: str | None = None, api_key: str | None = None, collection: str, size: int,
+                 quantization: str = "none", oversampling: float = 3.0,
+                 client: QdrantClient | None = None, aclient: AsyncQdrantClient | None = None):
+        self.collection = collection
+        self.size = size
+        self.quantization = _quantization_config(quantization)
+        self._search_params = (SearchParams(quantization=QuantizationSearchParams(rescore=True, oversampling=oversampling))
+                               if self.quantization else None)
+        # Pooled keep-alive connections (the client's default opens one per request)
+        self.client = client or QdrantClient(url=url, api_key=api_key, **upstream.qdrant_options())
+        self.aclient = aclient or AsyncQdrantClient(url=url, api_key=api_key, **upstream.qdrant_options())
+        self._ensured = False
+
+    def _params(self) -> VectorParams:
+        return VectorParams(size=self.size, distance=Distance.COSINE, on_disk=bool(self.quantization))
+
+    def _quantization_diff(self, info):
+        """Validate an existing collection; returns the quantization update it needs, if any."""
+        size = info.config.params.vectors.size
+        if size != self.size:
+            raise ValueError(f"Qdrant collection '{self.collection}' holds {size}-d vectors, expected {self.size} "
+                             "(EMBED_MODEL/EMBED_DIMENSIONS changed: use a new QDRANT_COLLECTION)")
+        if _quantization_key(info.config.quantization_config) != _quantization_key(self.quantization):
+            return self.quantization or Disabled.DISABLED
+        return None
+
+    def ensure_collection(self) -> None:
+        if self._ensured:
+            return
+        cols = upstream.call("qdrant", lambda t: self.client.get_collections()).collections
+        if self.collection not in [c.name for c in cols]:
+            upstream.call("qdrant_write", lambda t: self.client.recreate_collection(
+                collection_name=self.collection, vectors_config=self._params(), quantization_config=self.quantization,
+                timeout=_secs(t)))
+        else:
+            diff = self._quantization_diff(upstream.call("qdrant", lambda t: self.client.get_collection(self.collection)))
+            if diff is not None:
+                upstream.call("qdrant_write", lambda t: self.client.update_collection(
+                    collection_name=self.collection, quantization_config=diff, timeout=_secs(t)))
+        self._ensured = True
+
+    async def aensure_collection(self) -> None:
+        if self._ensured:
+            return
+        cols = (await upstream.acall("qdrant", lambda t: self.aclient.get_collections())).collections
+        if self.collection not in [c.name for c in cols]:
+            await upstream.acall("qdrant_write", lambda t: self.aclient.recreate_collection(
+                collection_name=self.collection, vectors_config=self._params(), quantization_config=self.quantization,
+                timeout=_secs(t)))
+        else:
+            info = await upstream.acall("qdrant", lambda t: self.aclient.get_collection(self.collection))
+            diff = self._quantization_diff(info)
+            if diff is not None:
+                await upstream.acall("qdrant_write", lambda t: self.aclient.update_collection(
+                    collection_name=self.collection, quantization_config=diff, timeout=_secs(t)))
+        self._ensured = True
+
+    def upsert(self, points: List[Point]) -> None:
+        structs = [PointStruct(id=pid, vector=v, payload=p) for pid, v, p in points]
+        # Same ids, same content: safe to retry. upsert/delete take no timeout here: the
+        # client-wide one from upstream.qdrant_options() is the qdrant_write cap
+        upstream.call("qdrant_write", lambda t: self.client.upsert(collection_name=self.collection, points=structs))
+
+    def existing_ids(self, ids: Iterable[str]) -> Set[str]:
+        ids = list(ids)
+        found = upstream.call("qdrant", lambda t: self.client.retrieve(
+            collection_name=self.collection, ids=ids, with_payload=False, with_vectors=False, timeout=_secs(t)))
+        return {str(p.id) for p in found}
+
+    def delete(self, filters: Dict[str, Any], keep_ids: Optional[Iterable[str]] = None) -> None:
+        selector = FilterSelector(filter=_filter(filters, keep_ids))
+        upstream.call("qdrant_write", lambda t: self.client.delete(collection_name=self.collection,
+                                                                   points_selector=selector))
+
+    def count(self) -> int:
+        return upstream.call("qdrant", lambda t: self.client.count(
+            collection_name=self.collection, exact=True, timeout=_secs(t))).count
+
+    def _requests(self, vectors, top_k, filters, with_vectors):
+        qf = _filter(filters)
+        return [SearchRequest(vector=v, filter=qf, limit=top_k, with_payload=True, with_vector=with_vectors,
+                              params=self._search_params) for v in vectors]
+
+    @staticmethod
+    def _scored(batches, with_vectors) -> List[List[ScoredPayload]]:
+        if with_vectors:
+            return [[(h.payload or {}, h.score, h.vector) for h in hits] for hits in batches]
+        return [[(h.payload or {}, h.score) for h in hits] for hits in batches]
+
+    def search(self, vectors, *, top_k, filters=None, with_vectors=False) -> List[List[ScoredPayload]]:
+        if not vectors:
+            return []
+        requests = self._requests(vectors, top_k, filters, with_vectors)
+        return self._scored(upstream.call("qdrant", lambda t: self.client.search_batch(
+            collection_name=self.collection, requests=requests, timeout=_secs(t))), with_vectors)
+
+    async def asearch(self, vectors, *, top_k, filters=None, with_vectors=False) -> List[List[ScoredPayload]]:
+        if not vectors:
+            return []
+        requests = self._requests(vectors, top_k, filters, with_vectors)
+        return self._scored(await upstream.acall("qdrant", lambda t: self.aclient.search_batch(
+            collection_name=self.collection, requests=requests, timeout=_secs(t)), hedge=True), with_vectors)
+
+    def scroll(self, filters=None, *, limit=None) -> List[Tuple[Dict[str, Any], List[float]]]:
+        out, offset = [], None
+        while True:
+            pts, offset = upstream.call("qdrant", lambda t, offset=offset: self.client.scroll(
+                collection_name=self.collection, scroll_filter=_filter(filters), limit=256,
+                offset=offset, with_payload=True, with_vectors=True, timeout=_secs(t)))
+            out.extend((p.payload or {}, p.vector) for p in pts)
+            if offset is None or (limit is not None and len(out) > limit):
+                return out
+
+    async def ascroll(self, filters=None, *, limit=None) -> List[Tuple[Dict[str, Any], List[float]]]:
+        out, offset = [], None
+        while True:
+            pts, offset = await upstream.acall("qdrant", lambda t, offset=offset: self.aclient.scroll(
+                collection_name=self.collection, scroll_filter=_filter(filters), limit=256,
+                offset=offset, with_payload=True, with_vectors=True, timeout=_secs(t)))
+            out.extend((p.payload or {}, p.vector) for p in pts)
+            if offset is None or (limit is not None and len(out) > limit):
+                return out
@@ -0,0 +1,58 @@
+# app/rerank.py
+from typing import Any, Dict, List
+import numpy as np
+from config import MMR_LAMBDA, RETRIEVAL_QUOTAS
+
+DUPLICATE_SIM = 0.97  # cosine above which a candidate only restates a selected chunk
+
+def parse_quotas(spec: str) -> Dict[str, int]:
+    out = {}
+    for part in spec.split(","):
+        dtype, _, n = part.strip().partition(":")
+        if dtype and n.strip().isdigit():
+            out[dtype] = int(n)
+    return out
+
+QUOTAS = parse_quotas(RETRIEVAL_QUOTAS)
+
+def _dtype(hit: Dict[str, Any]) -> str:
+    return hit["meta"].get("dtype", "doc")
+
+def mmr(hits: List[Dict[str, Any]], k: int, *, lam: float = MMR_LAMBDA,
+        quotas: Dict[str, int] | None = None) -> List[Dict[str, Any]]:
+    """
+    Maximal marginal relevance over hits carrying a "vector": each pick
+    maximizes lam * score - (1 - lam) * max cosine to what is already picked,
+    so overlapping chunks and near-identical query results don't crowd the
+    context. Per-dtype `quotas` are honoured when candidates exist (the
+    remaining slots are reserved once they are all that is left).
+    """
+    if len(hits) <= 1 or k <= 0:
+        return hits[:k]
+    quotas = QUOTAS if quotas is None else quotas
+    v = np.asarray([np.asarray(h["vector"], dtype=np.float32) for h in hits])
+    v /= np.maximum(np.linalg.norm(v, axis=1, keepdims=True), 1e-12)
+    sim = v @ v.T
+    rel = np.asarray([h["score"] for h in hits], dtype=np.float32)
+    dtypes = np.asarray([_dtype(h) for h in hits])
+
+    open_ = np.ones(len(hits), dtype=bool)
+    closest = np.full(len(hits), -1.0, dtype=np.float32)   # max sim to the selection so far
+    need = {d: n for d, n in quotas.items() if n > 0 and (dtypes == d).any()}
+    picked: List[int] = []
+    while len(picked) < k and open_.any():
+        allowed = open_
+        owed = sum(need.values())
+        if owed and k - len(picked) <= owed:
+            allowed = open_ & np.isin(dtypes, [d for d, n in need.items() if n > 0])
+            if not allowed.any():
+                allowed = open_
+        gain = lam * rel - (1 - lam) * np.maximum(closest, 0) if picked else rel.copy()
+        i = int(np.argmax(np.where(allowed, gain, -np.inf)))
+        picked.append(i)
+        open_[i] = False
+        open_ &= sim[i] < DUPLICATE_SIM
+        closest = np.maximum(closest, sim[i])
+        if need.get(dtypes[i]):
+            need[dtypes[i]] -= 1
+    return [hits[i] for i in picked]
@@ -1,6 +1,10 @@
 # app/retrieval.py
 from typing import Dict, Any, List
-from vectorstore import search
+from config import RETRIEVAL_CANDIDATES, RETRIEVAL_TOP_K, RETRIEVAL_MMR
+from vectorstore import search_many, asearch_many
+from embeddings import embed_texts, aembed_texts
+from rerank import mmr
+import metrics, session_context
 
 def bundle_queries(candidate_name: str, role: str, last_answer: str | None, target: Dict[str, Any]) -> List[str]:
     qs = [
@@ -14,18 +18,60 @@ def bundle_queries(candidate_name: str, role: str, last_answer: str | None, targ
         qs.append(f"follow-up on: {last_answer[:300]}")
     return qs
 
+def search_bundle(bundle: List[str], filters: Dict[str, Any], stats: Dict[str, int]) -> List[List[Dict[str, Any]]]:
+    # Rank against the preloaded session corpus when we have it; Qdrant otherwise
+    with metrics.stage("retrieve"):
+        ctx = session_context.get(filters)
+        metrics.inc("cache_total", cache="session_context", outcome="hit" if ctx is not None else "miss")
+        if ctx is None:
+            ctx = session_context.load(filters)  # expired or invalidated: rebuild from the current index
+        if ctx is not None:
+            qvs = embed_texts(bundle, stats=stats)
+            with metrics.stage("local_rank"):
+                return ctx.search(qvs, top_k=RETRIEVAL_CANDIDATES, with_vectors=RETRIEVAL_MMR)
+        return search_many(bundle, top_k=RETRIEVAL_CANDIDATES, filters=filters, stats=stats, with_vectors=RETRIEVAL_MMR)
+
+async def asearch_bundle(bundle: List[str], filters: Dict[str, Any], stats: Dict[str, int]) -> List[List[Dict[str, Any]]]:
+    with metrics.stage("retrieve"):
+        ctx = session_context.get(filters)
+        metrics.inc("cache_total", cache="session_context", outcome="hit" if ctx is not None else "miss")
+        if ctx is None:
+            ctx = await session_context.aload(filters)
+        if ctx is not None:
+            qvs = await aembed_texts(bundle, stats=stats)
+            with metrics.stage("local_rank"):
+                return ctx.search(qvs, top_k=RETRIEVAL_CANDIDATES, with_vectors=RETRIEVAL_MMR)
+        return await asearch_many(bundle, top_k=RETRIEVAL_CANDIDATES, filters=filters, stats=stats,
+                                  with_vectors=RETRIEVAL_MMR)
+
 def retrieve(bundle: List[str], filters: Dict[str, Any]) -> Dict[str, Any]:
-    pool, seen = [], set()
-    for q in bundle:
-        for h in search(q, top_k=6, filters=filters):
+    # One embedding call + at most one Qdrant batch search for the whole bundle
+    round_trips = {"embed": 0, "search": 0}
+    per_query = search_bundle(bundle, filters, round_trips)
+    return merge_hits(per_query, round_trips)
+
+async def aretrieve(bundle: List[str], filters: Dict[str, Any]) -> Dict[str, Any]:
+    round_trips = {"embed": 0, "search": 0}
+    per_query = await asearch_bundle(bundle, filters, round_trips)
+    return merge_hits(per_query, round_trips)
+
+def merge_hits(per_query: List[List[Dict[str, Any]]], round_trips: Dict[str, int]) -> Dict[str, Any]:
+    # Same chunk from several queries: keep its best score
+    best: Dict[tuple, Dict[str, Any]] = {}
+    for hits in per_query:
+        for h in hits:
             key = (h["doc_id"], h["chunk_idx"])
-            if key in seen: continue
-            seen.add(key)
-            pool.append(h)
-    pool.sort(key=lambda x: x["score"], reverse=True)
-    top = pool[:6]
+            if key not in best or h["score"] > best[key]["score"]:
+                best[key] = h
+    pool = sorted(best.values(), key=lambda x: x["score"], reverse=True)
+    if pool and all("vector" in h for h in pool):
+        with metrics.stage("rerank"):
+            top = mmr(pool, RETRIEVAL_TOP_K)
+    else:
+        top = pool[:RETRIEVAL_TOP_K]
+    top = [{k: v for k, v in h.items() if k != "vector"} for h in top]
     citations = [f"{d['meta'].get('dtype','doc')}:{d['doc_id']}#c{d['chunk_idx']}" for d in top]
-    return {"snippets": top, "citations": citations}
+    return {"snippets": top, "citations": citations, "round_trips": round_trips}
 
 def is_grounded(model_out: Dict[str, Any]) -> bool:
     cits = model_out.get("rationale_citations") or []
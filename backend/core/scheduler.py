@@ -0,0 +1,115 @@
+# app/scheduler.py
+"""
+Interview plan: the sequence of {"dimension", "difficulty"} targets for a
+session, built once from the role's rubric and the `minutes` budget and
+advanced after every question. Because the plan does not depend on the
+candidate's answers, the next targets are known ahead of time and their
+retrieval can be prepared in the background.
+
+A plan is a plain dict (it lives in the session store):
+  {"targets": [...], "done": n, "minutes": m, "turn_seconds": s, "dimensions": [...]}
+targets[:done] were asked, targets[done:] are still ahead.
+"""
+import math, re
+from typing import Any, Dict, List
+from config import INTERVIEW_TURN_SECONDS
+
+OPENING = {"dimension": "Resume Projects", "difficulty": "easy"}
+DEFAULT_DIMENSIONS = ["System Design", "Problem Solving", "Data/SQL", "Resume Projects",
+                      "Architecture Decisions", "Ownership", "Communication", "Leadership"]
+DIFFICULTIES = ["easy", "medium", "hard"]
+
+_RUBRIC_DIMENSION = re.compile(r"^\s*\d+[.)]\s*([^:\n]{2,60}?)\s*:", re.M)
+
+def rubric_dimensions(rubric: str | None) -> List[str]:
+    """Numbered "1) Name: signals" lines of the rubric, plus Resume Projects; the defaults if there are none."""
+    dims = list(dict.fromkeys(m.strip() for m in _RUBRIC_DIMENSION.findall(rubric or "")))
+    if not dims:
+        return list(DEFAULT_DIMENSIONS)
+    return dims + ([OPENING["dimension"]] if OPENING["dimension"] not in dims else [])
+
+def _late(position: int, total: int) -> bool:
+    # Last third of the interview: nothing easy there
+    return total >= 3 and position >= math.ceil(total * 2 / 3)
+
+def _difficulty(visit: int, position: int, total: int) -> str:
+    # Deeper on each return to a dimension
+    level = min(visit, len(DIFFICULTIES) - 1)
+    if _late(position, total):
+        level = max(level, 1)
+    return DIFFICULTIES[level]
+
+def build_plan(rubric: str | None, minutes: int, *, turn_seconds: float = INTERVIEW_TURN_SECONDS) -> Dict[str, Any]:
+    """
+    One target per `turn_seconds` of the budget: the opening resume question,
+    then the rubric's dimensions round-robin (in rubric order, so a short
+    interview covers the first ones).
+    """
+    dims = rubric_dimensions(rubric)
+    total = max(2, round(minutes * 60 / turn_seconds))
+    targets, visits = [dict(OPENING)], {OPENING["dimension"]: 1}
+    rest = [d for d in dims if d != OPENING["dimension"]] + [OPENING["dimension"]]
+    while len(targets) < total:
+        dim = rest[(len(targets) - 1) % len(rest)]
+        targets.append({"dimension": dim, "difficulty": _difficulty(visits.get(dim, 0), len(targets), total)})
+        visits[dim] = visits.get(dim, 0) + 1
+    return {"targets": targets, "done": 0, "minutes": minutes, "turn_seconds": turn_seconds,
+            "dimensions": dims}
+
+def _extra(plan: Dict[str, Any], coverage: Dict[str, int], position: int, total: int) -> Dict[str, Any]:
+    # Added slot at `position` of `total`: least-covered dimension, difficulty from how often it was asked
+    dim = min(plan["dimensions"], key=lambda d: coverage.get(d, 0))
+    n = coverage.get(dim, 0)
+    level = 0 if n < 2 else (1 if n < 4 else 2)
+    if _late(position, total):
+        level = max(level, 1)
+    return {"dimension": dim, "difficulty": DIFFICULTIES[level]}
+
+def next_target(plan: Dict[str, Any], coverage: Dict[str, int]) -> Dict[str, Any]:
+    targets, done = plan["targets"], plan["done"]
+    return dict(targets[done]) if done < len(targets) else _extra(plan, coverage, done, done + 1)
+
+def upcoming(plan: Dict[str, Any], coverage: Dict[str, int], n: int = 2) -> List[Dict[str, Any]]:
+    """The next `n` targets, in order (the first one is `next_target`)."""
+    out = [dict(t) for t in plan["targets"][plan["done"]:plan["done"] + n]]
+    return out or [next_target(plan, coverage)]
+
+def advance(plan: Dict[str, Any], coverage: Dict[str, int], asked: str, elapsed_s: float) -> None:
+    """
+    Record that a question on `asked` was just put to the candidate (coverage
+    already counts it) and refit what is left of the plan to the time left.
+    """
+    targets, i = plan["targets"], plan["done"]
+    if i >= len(targets):
+        targets.append(_extra(plan, coverage, i, i + 1))
+    planned = targets[i]
+    if asked != planned["dimension"]:
+        # The generator switched dimension: swap with that dimension's next slot, so the planned one still comes
+        later = next((j for j in range(i + 1, len(targets)) if targets[j]["dimension"] == asked), None)
+        if later is not None:
+            targets[i], targets[later] = targets[later], planned
+        else:
+            targets[i] = {"dimension": asked, "difficulty": planned["difficulty"]}
+            targets.insert(i + 1, planned)
+    plan["done"] = i + 1
+    _refit(plan, coverage, elapsed_s)
+
+def _refit(plan: Dict[str, Any], coverage: Dict[str, int], elapsed_s: float) -> None:
+    done, per_turn = plan["done"], plan["turn_seconds"]
+    if done >= 2:  # observed pace, kept within 2x of the planned one
+        per_turn = min(per_turn * 2, max(per_turn / 2, elapsed_s / done))
+    fit = max(1, math.floor((plan["minutes"] * 60 - elapsed_s) / per_turn))
+    targets = plan["targets"]
+    while len(targets) - done > fit:
+        # Running late: drop the last slot of an already covered dimension, else the last one
+        ahead = range(len(targets) - 1, done - 1, -1)
+        j = next((j for j in ahead if coverage.get(targets[j]["dimension"], 0) > 0), len(targets) - 1)
+        del targets[j]
+    while len(targets) - done < fit:
+        projected = dict(coverage)
+        for t in targets[done:]:
+            projected[t["dimension"]] = projected.get(t["dimension"], 0) + 1
+        targets.append(_extra(plan, projected, len(targets), done + fit))
+    for j in range(done, len(targets)):  # a shorter plan moves earlier slots into its last third
+        if targets[j]["difficulty"] == "easy" and _late(j, len(targets)):
+            targets[j]["difficulty"] = DIFFICULTIES[1]
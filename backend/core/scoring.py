@@ -0,0 +1,257 @@
+# app/scoring.py
+"""
+Offline scoring of finished interviews against their role's rubric
+dimensions (data/content.py), off the live path.
+
+  PYTHONPATH=.:core python -m scoring results.jsonl                       # SESSION_DB_PATH
+  PYTHONPATH=.:core python -m scoring results.jsonl --sessions export.jsonl --concurrency 16
+
+Sessions come from the sqlite session store (SESSION_STORE=sqlite; those idle
+for SCORE_IDLE_S, so run it more often than SESSION_TTL purges them) or from a
+JSONL file of Session.to_dict() records. A bounded pool of workers scores them,
+one chat request per session; the rubric part of the prompt is built once per
+role and is the same prefix for every session of that role. Each result is
+appended to the output as one compact JSON line:
+
+  {"session_id", "hash", "role", "candidate_name", "answers", "scores": {dim: 0-5},
+   "evidence": {dim: [turn numbers]}, "overall", "summary", "model", "scored_at"}
+
+A rerun skips sessions whose line is already there with the same hash (the
+turn log and rubric it was scored on), so an interrupted run resumes and a
+session that continued is scored again (the last line for an id wins).
+Failed sessions get an {"session_id", "hash", "error"} line and are retried
+by the next run.
+"""
+import argparse, asyncio, functools, hashlib, json, os, sys, time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from config import (
+    SESSION_DB_PATH, SCORE_CONCURRENCY, SCORE_IDLE_S, SCORE_PROMPT_TOKENS, SCORE_TURN_TOKENS,
+)
+from data.content import RUBRICS
+from llm import CHAT_MODEL, ascore_transcript, score_system_prompt
+from scheduler import rubric_dimensions
+from sessions import Session, SqliteSessionStore
+from tokens import count_tokens, truncate_tokens
+import metrics, upstream
+
+# ---------- sources ----------
+def iter_sessions(source: Optional[str] = None, *, idle_s: float = SCORE_IDLE_S) -> Iterator[Session]:
+    """Stream sessions from a JSONL export or the sqlite store at `source` (default SESSION_DB_PATH)."""
+    path = source or SESSION_DB_PATH
+    if not os.path.exists(path):
+        raise FileNotFoundError(path)
+    if path.endswith(".jsonl"):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield Session.from_dict(json.loads(line))
+    else:
+        yield from SqliteSessionStore(path).scan(idle_s=idle_s)
+
+# ---------- per-role context ----------
+@functools.lru_cache(maxsize=256)
+def role_context(role: str) -> Dict[str, Any]:
+    """System prompt, dimensions and rubric hash of a role, shared by all its sessions."""
+    rubric = RUBRICS.get(role, "")
+    dims = rubric_dimensions(rubric)
+    return {"system": score_system_prompt(role, rubric, dims), "dimensions": dims,
+            "rubric_hash": hashlib.sha1(rubric.encode("utf-8")).hexdigest()[:12]}
+
+def session_hash(sess: Session) -> str:
+    h = hashlib.sha1(f"{CHAT_MODEL}|{role_context(sess.role)['rubric_hash']}".encode("utf-8"))
+    for t in sess.turns:
+        h.update(f"\x00{t.actor}\x00{t.text}".encode("utf-8"))
+    return h.hexdigest()[:16]
+
+def format_transcript(sess: Session, *, budget: int = SCORE_PROMPT_TOKENS,
+                      turn_tokens: int = SCORE_TURN_TOKENS) -> Tuple[str, int, int]:
+    """
+    Numbered transcript of the questions and answers (the intro is skipped),
+    each turn capped at `turn_tokens`; past `budget` the earliest turns are
+    dropped. Returns (text, candidate turns, turns dropped).
+    """
+    turns = [t for t in sess.turns if t.actor == "candidate" or t.citations is not None]
+    lines = [f"[{i}] {'candidate' if t.actor == 'candidate' else 'interviewer'}: {truncate_tokens(t.text, turn_tokens)}"
+             for i, t in enumerate(turns, 1)]
+    head = f"Candidate: {sess.candidate_name}\nTranscript:\n"
+    used, keep = count_tokens(head), len(lines)
+    for i in range(len(lines) - 1, -1, -1):
+        used += count_tokens(lines[i]) + 1
+        if used > budget:
+            break
+        keep = i
+    answers = sum(t.actor == "candidate" for t in turns)
+    return head + "\n".join(lines[keep:]), answers, keep
+
+def to_record(sess: Session, fp: str, dims: List[str], answers: int, out: Dict[str, Any]) -> Dict[str, Any]:
+    """Model output -> result line: known dimensions only, scores clamped to 0-5, 0 = not assessed."""
+    scores: Dict[str, int] = {d: 0 for d in dims}
+    evidence: Dict[str, List[int]] = {}
+    for s in out.get("scores") or []:
+        if not isinstance(s, dict) or s.get("dimension") not in scores:
+            continue
+        try:
+            scores[s["dimension"]] = max(0, min(5, int(s.get("score") or 0)))
+        except (TypeError, ValueError):
+            continue
+        ev = [int(n) for n in (s.get("evidence") or []) if isinstance(n, int)]
+        if ev:
+            evidence[s["dimension"]] = ev
+    assessed = [v for v in scores.values() if v]
+    return {"session_id": sess.session_id, "hash": fp, "role": sess.role, "candidate_name": sess.candidate_name,
+            "answers": answers, "scores": scores, "evidence": evidence,
+            "overall": round(sum(assessed) / len(assessed), 2) if assessed else None,
+            "summary": str(out.get("summary") or ""), "model": CHAT_MODEL, "scored_at": int(time.time())}
+
+# ---------- results ----------
+class Results:
+    """Append-only JSONL of result lines; doubles as the resume checkpoint."""
+    FSYNC_EVERY = 64
+
+    def __init__(self, path: str):
+        self.path, self.done = path, {}
+        torn = False
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    torn = not line.endswith("\n")
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line after a crash
+                    if "error" in rec:
+                        self.done.pop(rec["session_id"], None)
+                    else:
+                        self.done[rec["session_id"]] = rec["hash"]
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._f = open(path, "a", encoding="utf-8")
+        self._unsynced = 0
+        if torn:
+            self._f.write("\n")
+
+    def finished(self, session_id: str, fp: str) -> bool:
+        return self.done.get(session_id) == fp
+
+    def write(self, rec: Dict[str, Any]) -> None:
+        self._f.write(json.dumps(rec, separators=(",", ":"), ensure_ascii=False) + "\n")
+        self._f.flush()
+        self._unsynced += 1
+        if self._unsynced >= self.FSYNC_EVERY:
+            os.fsync(self._f.fileno())
+            self._unsynced = 0
+
+    def close(self) -> None:
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self._f.close()
+
+# ---------- pipeline ----------
+class _Run:
+    MIN_WAIT_S = 0.5
+
+    def __init__(self, results: Results):
+        self.results = results
+        self.stats = {"sessions": 0, "scored": 0, "skipped": 0, "empty": 0, "errors": 0,
+                      "prompt_tokens": 0, "turns_dropped": 0}
+
+    async def score(self, sess: Session, fp: str) -> None:
+        ctx = role_context(sess.role)
+        transcript, answers, dropped = format_transcript(sess)
+        stats: Dict[str, Any] = {}
+        while True:
+            try:
+                out = await ascore_transcript(system=ctx["system"], transcript=transcript, stats=stats)
+                rec = to_record(sess, fp, ctx["dimensions"], answers, out)
+                break
+            except upstream.CircuitOpen as e:
+                # the breaker probes again: wait rather than fail every session (never 0, or workers spin)
+                await asyncio.sleep(max(e.retry_after, self.MIN_WAIT_S))
+            except Exception as e:  # upstream gave up, or unusable output
+                rec = {"session_id": sess.session_id, "hash": fp, "error": f"{type(e).__name__}: {e}"}
+                break
+        self.results.write(rec)
+        if "error" in rec:
+            self.stats["errors"] += 1
+            metrics.inc("score_errors_total")
+        else:
+            self.stats["scored"] += 1
+            self.stats["prompt_tokens"] += stats.get("prompt_tokens", 0)
+            self.stats["turns_dropped"] += dropped
+            metrics.inc("score_sessions_total")
+
+async def ascore(sessions: Iterable[Session], *, out_path: str, concurrency: int = SCORE_CONCURRENCY,
+                 limit: Optional[int] = None, progress=None) -> Dict[str, Any]:
+    """
+    Score a stream of sessions with `concurrency` workers, appending results
+    to `out_path`. Sessions without an answer and those already scored (same
+    hash) are skipped; at most `limit` are scored. `progress(stats)` is called
+    after every 50 results. Returns the run stats incl. sessions/sec.
+    """
+    results = Results(out_path)
+    run = _Run(results)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=2 * concurrency)
+    t0 = time.perf_counter()
+
+    async def worker():
+        while (item := await queue.get()) is not None:
+            await run.score(*item)
+            if progress and (run.stats["scored"] + run.stats["errors"]) % 50 == 0:
+                progress(_report(run.stats, t0))
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    it = iter(sessions)
+    try:
+        queued = 0
+        while limit is None or queued < limit:
+            sess = await asyncio.to_thread(next, it, None)  # sqlite pages are read off the loop
+            if sess is None:
+                break
+            run.stats["sessions"] += 1
+            if not any(t.actor == "candidate" for t in sess.turns):
+                run.stats["empty"] += 1
+                continue
+            fp = session_hash(sess)
+            if results.finished(sess.session_id, fp):
+                run.stats["skipped"] += 1
+                continue
+            await queue.put((sess, fp))
+            queued += 1
+            if any(w.done() for w in workers):
+                break  # a worker died: stop feeding, surface its error below
+        for _ in workers:
+            await queue.put(None)
+        for w in await asyncio.gather(*workers, return_exceptions=True):
+            if isinstance(w, BaseException):
+                raise w
+    finally:
+        for w in workers:
+            w.cancel()
+        results.close()
+    return _report(run.stats, t0)
+
+def score(sessions: Iterable[Session], **kwargs) -> Dict[str, Any]:
+    return asyncio.run(ascore(sessions, **kwargs))
+
+def _report(stats: Dict[str, int], t0: float) -> Dict[str, Any]:
+    secs = time.perf_counter() - t0
+    return {**stats, "seconds": round(secs, 2),
+            "sessions_per_sec": round(stats["scored"] / secs, 2) if secs else 0.0}
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("out", help="results JSONL (appended to; existing results are skipped)")
+    ap.add_argument("--sessions", default=None, help="session store sqlite file or JSONL export (default: SESSION_DB_PATH)")
+    ap.add_argument("--idle", type=float, default=SCORE_IDLE_S, help="seconds since a stored session's last update")
+    ap.add_argument("--concurrency", type=int, default=SCORE_CONCURRENCY)
+    ap.add_argument("--limit", type=int, default=None, help="score at most this many sessions")
+    args = ap.parse_args(argv)
+
+    progress = lambda s: print(f"\r{s['scored']} scored ({s['skipped']} skipped, {s['errors']} errors), "
+                               f"{s['sessions_per_sec']} sessions/sec", end="", file=sys.stderr, flush=True)
+    report = score(iter_sessions(args.sessions, idle_s=args.idle), out_path=args.out,
+                   concurrency=args.concurrency, limit=args.limit, progress=progress)
+    print(file=sys.stderr)
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
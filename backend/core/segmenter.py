@@ -0,0 +1,77 @@
+# app/segmenter.py
+import io, wave
+from typing import List, Optional
+import numpy as np
+from config import SEGMENT_SILENCE_MS, SEGMENT_MIN_MS, SEGMENT_MAX_MS, SEGMENT_SILENCE_RMS
+
+FRAME_MS = 20
+MIN_SAMPLE_RATE, MAX_SAMPLE_RATE = 8000, 48000  # telephone .. studio; anything else is a client bug
+
+class PCMSegmenter:
+    """
+    Cuts a live mono PCM16 stream into utterance-sized segments so each can be
+    transcribed while the candidate keeps talking. A segment ends at the first
+    run of `silence_ms` quiet frames (RMS below `silence_rms`) once it is at
+    least `min_ms` long, or unconditionally at `max_ms` (fixed window).
+    """
+    def __init__(self, sample_rate: int = 16000, *, silence_ms: int = SEGMENT_SILENCE_MS,
+                 min_ms: int = SEGMENT_MIN_MS, max_ms: int = SEGMENT_MAX_MS,
+                 silence_rms: float = SEGMENT_SILENCE_RMS):
+        if not MIN_SAMPLE_RATE <= sample_rate <= MAX_SAMPLE_RATE:
+            raise ValueError(f"sample_rate {sample_rate} outside {MIN_SAMPLE_RATE}-{MAX_SAMPLE_RATE} Hz")
+        self.sample_rate = sample_rate
+        self.frame_bytes = sample_rate * FRAME_MS // 1000 * 2
+        self.silence_frames = max(1, silence_ms // FRAME_MS)
+        self.min_frames = max(1, min_ms // FRAME_MS)
+        self.max_frames = max(self.min_frames, max_ms // FRAME_MS)
+        self.silence_rms = silence_rms
+        self._pending = b""          # bytes not yet forming a whole frame
+        self._frames: List[bytes] = []
+        self._quiet = 0              # trailing quiet frames in the current segment
+        self._voiced = False         # anything above the threshold in the current segment
+
+    def feed(self, data: bytes) -> List[bytes]:
+        """Add PCM16 bytes; returns the segments (raw PCM) completed by them."""
+        buf = self._pending + data
+        whole = len(buf) - len(buf) % self.frame_bytes
+        self._pending = buf[whole:]
+        if not whole:
+            return []
+        samples = np.frombuffer(buf[:whole], dtype="<i2").astype(np.float32).reshape(-1, self.frame_bytes // 2)
+        rms = np.sqrt((samples * samples).mean(axis=1))
+        out = []
+        for i, level in enumerate(rms):
+            self._frames.append(buf[i * self.frame_bytes:(i + 1) * self.frame_bytes])
+            if level < self.silence_rms:
+                self._quiet += 1
+            else:
+                self._quiet, self._voiced = 0, True
+            n = len(self._frames)
+            if n >= self.max_frames or (n >= self.min_frames and self._quiet >= self.silence_frames):
+                seg = self._cut()
+                if seg is not None:
+                    out.append(seg)
+        return out
+
+    def flush(self) -> Optional[bytes]:
+        """End of the answer: whatever is buffered becomes the tail segment."""
+        if self._pending:
+            self._frames.append(self._pending + b"\0" * (self.frame_bytes - len(self._pending)))
+            self._pending = b""
+        return self._cut()
+
+    def _cut(self) -> Optional[bytes]:
+        frames, voiced = self._frames, self._voiced
+        self._frames, self._quiet, self._voiced = [], 0, False
+        # Pure silence is dropped rather than sent to be transcribed as nothing
+        return b"".join(frames) if frames and voiced else None
+
+def to_wav(pcm: bytes, sample_rate: int) -> bytes:
+    """Wrap raw mono PCM16 in a WAV container the transcription API accepts."""
+    out = io.BytesIO()
+    with wave.open(out, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        w.writeframes(pcm)
+    return out.getvalue()
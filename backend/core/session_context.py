@@ -0,0 +1,85 @@
+# app/session_context.py
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from config import SESSION_CONTEXT_MAX_POINTS, SESSION_CONTEXT_CACHE_SIZE, SESSION_CONTEXT_TTL
+from cache import LRUCache
+from vectorstore import scroll_points, ascroll_points, to_hit
+import metrics
+
+class SessionContext:
+    """
+    A session's whole corpus (every chunk matching its filters: its rubric and
+    resume, see orchestrator.session_filters) as a
+    row-normalized float32 matrix, ranked locally with one matmul per bundle.
+    Scores match Qdrant's cosine distance.
+    """
+    __slots__ = ("payloads", "matrix")
+
+    def __init__(self, points: List[Tuple[Dict[str, Any], List[float]]]):
+        self.payloads = [p for p, _ in points]
+        m = np.asarray([v for _, v in points], dtype=np.float32).reshape(len(points), -1)
+        norms = np.linalg.norm(m, axis=1, keepdims=True)
+        self.matrix = m / np.where(norms == 0, 1, norms)
+
+    def search(self, query_vectors: List[List[float]], top_k: int = 6,
+               with_vectors: bool = False) -> List[List[Dict[str, Any]]]:
+        if not query_vectors:
+            return []
+        if not self.payloads:
+            return [[] for _ in query_vectors]
+        q = np.asarray(query_vectors, dtype=np.float32)
+        q /= np.maximum(np.linalg.norm(q, axis=1, keepdims=True), 1e-12)
+        scores = q @ self.matrix.T
+        k = min(top_k, scores.shape[1])
+        idx = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        out = []
+        for row, cand in zip(scores, idx):
+            order = cand[np.argsort(-row[cand], kind="stable")]
+            out.append([to_hit(self.payloads[i], float(row[i]), self.matrix[i] if with_vectors else None) for i in order])
+        return out
+
+# Entries expire after SESSION_CONTEXT_TTL, so documents indexed by another process (ingest CLI,
+# another worker) are picked up; this process's own indexing invalidates them right away
+_CONTEXTS = LRUCache(maxsize=SESSION_CONTEXT_CACHE_SIZE, ttl=SESSION_CONTEXT_TTL, name="session_context")
+_TOO_LARGE = object()  # remembered for a TTL too, so an oversized corpus is not scrolled every turn
+
+def _key(filters: Dict[str, Any] | None):
+    return tuple(sorted((filters or {}).items()))
+
+def _build(key, points) -> Optional[SessionContext]:
+    if len(points) > SESSION_CONTEXT_MAX_POINTS:
+        # too large to hold per process; keep using remote search
+        metrics.inc("session_context_skipped_total", reason="too_large")
+        _CONTEXTS.put(key, _TOO_LARGE)
+        return None
+    ctx = SessionContext(points)
+    _CONTEXTS.put(key, ctx)
+    return ctx
+
+def get(filters: Dict[str, Any] | None) -> Optional[SessionContext]:
+    """Cached context for `filters`, or None (caller loads it or falls back to the vector store)."""
+    ctx = _CONTEXTS.get(_key(filters))
+    return None if ctx is _TOO_LARGE else ctx
+
+def load(filters: Dict[str, Any] | None) -> Optional[SessionContext]:
+    key = _key(filters)
+    ctx = _CONTEXTS.get(key)
+    if ctx is None:
+        try:
+            return _build(key, scroll_points(filters, limit=SESSION_CONTEXT_MAX_POINTS))
+        except Exception:
+            return None
+    return None if ctx is _TOO_LARGE else ctx
+
+async def aload(filters: Dict[str, Any] | None) -> Optional[SessionContext]:
+    key = _key(filters)
+    ctx = _CONTEXTS.get(key)
+    if ctx is None:
+        try:
+            return _build(key, await ascroll_points(filters, limit=SESSION_CONTEXT_MAX_POINTS))
+        except Exception:
+            return None
+    return None if ctx is _TOO_LARGE else ctx
+
+def invalidate() -> None:
+    _CONTEXTS.clear()
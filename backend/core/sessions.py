@@ -0,0 +1,243 @@
+# app/sessions.py
+import asyncio, copy, json, os, sqlite3, threading, time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from config import SESSION_STORE, SESSION_DB_PATH, SESSION_TTL, SESSION_MAX
+from cache import LRUCache
+
+class Turn:
+    """One interview turn; __slots__ keeps long turn logs compact."""
+    __slots__ = ("actor", "text", "citations", "round_trips")
+
+    def __init__(self, actor: str, text: str, citations: Optional[List[str]] = None,
+                 round_trips: Optional[Dict[str, int]] = None):
+        self.actor = actor
+        self.text = text
+        self.citations = citations
+        self.round_trips = round_trips
+
+    def to_dict(self) -> Dict[str, Any]:
+        d = {"actor": self.actor, "text": self.text}
+        if self.citations is not None:
+            d["citations"] = self.citations
+        if self.round_trips is not None:
+            d["round_trips"] = self.round_trips
+        return d
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "Turn":
+        return cls(d["actor"], d["text"], d.get("citations"), d.get("round_trips"))
+
+class Session:
+    """
+    All per-interview state: brain turn log and coverage, the raw transcript
+    items, the first question waiting to be served by /transcribe, the
+    rolling transcript (one text per segment) of a live answer in progress,
+    and the interview plan (see core/scheduler.py).
+    """
+    __slots__ = ("session_id", "candidate_name", "role", "minutes", "turns", "coverage",
+                 "started_at", "transcripts", "pending_question", "partial", "plan")
+
+    def __init__(self, session_id: str, candidate_name: str, role: str, minutes: int = 60,
+                 turns: Optional[List[Turn]] = None, coverage: Optional[Dict[str, int]] = None,
+                 started_at: Optional[float] = None, transcripts: Optional[List[Dict[str, Any]]] = None,
+                 pending_question: Optional[Dict[str, Any]] = None, partial: Optional[List[str]] = None,
+                 plan: Optional[Dict[str, Any]] = None):
+        self.session_id = session_id
+        self.candidate_name = candidate_name
+        self.role = role
+        self.minutes = minutes
+        self.turns = turns if turns is not None else []
+        self.coverage = coverage if coverage is not None else {}
+        self.started_at = started_at if started_at is not None else time.time()
+        self.transcripts = transcripts if transcripts is not None else []
+        self.pending_question = pending_question
+        self.partial = partial if partial is not None else []
+        self.plan = plan
+
+    def to_dict(self) -> Dict[str, Any]:
+        d = {k: getattr(self, k) for k in self.__slots__}
+        d["turns"] = [t.to_dict() for t in self.turns]
+        return d
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "Session":
+        d = dict(d)
+        d["turns"] = [Turn.from_dict(t) for t in d.get("turns", [])]
+        return cls(**d)
+
+    def copy(self) -> "Session":
+        # Snapshot: the containers changes go into are copied (turns, items and questions are only
+        # ever added or replaced, never edited in place); the plan is edited in place, so deep-copied
+        return Session(self.session_id, self.candidate_name, self.role, self.minutes, list(self.turns),
+                       dict(self.coverage), self.started_at, list(self.transcripts), self.pending_question,
+                       list(self.partial), copy.deepcopy(self.plan))
+
+class SessionStore(ABC):
+    """
+    Where sessions live between requests. `get` returns a snapshot; changes to
+    an existing session go through `update`, which applies them to the current
+    stored version atomically, so concurrent writers (other requests, other
+    workers sharing the store) do not overwrite each other. `put` stores a new
+    session. The async methods are for the event loop; they default to the
+    sync ones, which is right for in-process stores; stores doing blocking
+    I/O override them.
+    """
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[Session]:
+        ...
+
+    @abstractmethod
+    def put(self, session: Session) -> None:
+        ...
+
+    @abstractmethod
+    def update(self, session_id: str, fn: Callable[[Session], Any]) -> Optional[Session]:
+        """Apply `fn` to the stored session and save it; returns the updated session, None if there is none."""
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None:
+        ...
+
+    async def aget(self, session_id: str) -> Optional[Session]:
+        return self.get(session_id)
+
+    async def aput(self, session: Session) -> None:
+        self.put(session)
+
+    async def aupdate(self, session_id: str, fn: Callable[[Session], Any]) -> Optional[Session]:
+        return self.update(session_id, fn)
+
+    async def adelete(self, session_id: str) -> None:
+        self.delete(session_id)
+
+class MemorySessionStore(SessionStore):
+    """
+    Per-process store, bounded by LRU size and an idle TTL (refreshed on every
+    put). Holds one object per session; `get` and `update` hand out copies.
+    """
+    def __init__(self, maxsize: int = SESSION_MAX, ttl: float = SESSION_TTL):
+        self._cache = LRUCache(maxsize=maxsize, ttl=ttl, name="sessions")
+
+    def get(self, session_id: str) -> Optional[Session]:
+        sess = self._cache.get(session_id)
+        return sess.copy() if sess is not None else None
+
+    def put(self, session: Session) -> None:
+        self._cache.put(session.session_id, session)
+
+    def update(self, session_id: str, fn: Callable[[Session], Any]) -> Optional[Session]:
+        # One shared object per session: `fn` never awaits, so it cannot interleave with another writer
+        sess = self._cache.get(session_id)
+        if sess is None:
+            return None
+        fn(sess)
+        self._cache.put(session_id, sess)
+        return sess.copy()
+
+    def delete(self, session_id: str) -> None:
+        self._cache.pop(session_id)
+
+class SqliteSessionStore(SessionStore):
+    """
+    Shared across the workers of one node: a WAL-mode sqlite file, one JSON row
+    per session. Sessions idle past the TTL are ignored and purged lazily.
+    Writes can wait up to 10 s for another worker's write lock, so the async
+    methods run on the store's own thread, never on the event loop.
+    """
+    PURGE_EVERY = 256
+
+    def __init__(self, path: str = SESSION_DB_PATH, ttl: float = SESSION_TTL):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # One connection behind one lock: more threads would only queue on it
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="session-db")
+        self._puts = 0
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS sessions (id TEXT PRIMARY KEY, data TEXT NOT NULL, updated REAL NOT NULL)")
+        self._db.commit()
+
+    def get(self, session_id: str) -> Optional[Session]:
+        with self._lock:
+            row = self._db.execute("SELECT data FROM sessions WHERE id = ? AND updated > ?",
+                                   (session_id, time.time() - self.ttl)).fetchone()
+        return Session.from_dict(json.loads(row[0])) if row else None
+
+    def _write(self, session: Session) -> None:
+        data = json.dumps(session.to_dict(), separators=(",", ":"))
+        self._db.execute("INSERT OR REPLACE INTO sessions (id, data, updated) VALUES (?, ?, ?)",
+                         (session.session_id, data, time.time()))
+        self._puts += 1
+        if self._puts % self.PURGE_EVERY == 0:
+            self._db.execute("DELETE FROM sessions WHERE updated <= ?", (time.time() - self.ttl,))
+
+    def put(self, session: Session) -> None:
+        with self._lock:
+            self._write(session)
+            self._db.commit()
+
+    def update(self, session_id: str, fn: Callable[[Session], Any]) -> Optional[Session]:
+        # Read-modify-write in one write transaction: other workers' updates wait on the database lock
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute("SELECT data FROM sessions WHERE id = ? AND updated > ?",
+                                       (session_id, time.time() - self.ttl)).fetchone()
+                if row is None:
+                    self._db.rollback()
+                    return None
+                sess = Session.from_dict(json.loads(row[0]))
+                fn(sess)
+                self._write(sess)
+                self._db.commit()
+            except BaseException:
+                self._db.rollback()
+                raise
+        return sess
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+            self._db.commit()
+
+    async def _run(self, fn: Callable, *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def aget(self, session_id: str) -> Optional[Session]:
+        return await self._run(self.get, session_id)
+
+    async def aput(self, session: Session) -> None:
+        await self._run(self.put, session)
+
+    async def aupdate(self, session_id: str, fn: Callable[[Session], Any]) -> Optional[Session]:
+        return await self._run(self.update, session_id, fn)
+
+    async def adelete(self, session_id: str) -> None:
+        await self._run(self.delete, session_id)
+
+    def scan(self, *, idle_s: float = 0.0, page: int = 256) -> Iterator[Session]:
+        """
+        Sessions not updated for `idle_s` seconds, in id order, a page at a time
+        (for offline jobs; rows past the TTL are included until purged).
+        """
+        last = ""
+        while True:
+            with self._lock:
+                rows = self._db.execute("SELECT id, data FROM sessions WHERE id > ? AND updated <= ? ORDER BY id LIMIT ?",
+                                        (last, time.time() - idle_s, page)).fetchall()
+            if not rows:
+                return
+            for _, data in rows:
+                yield Session.from_dict(json.loads(data))
+            last = rows[-1][0]
+
+def make_store() -> SessionStore:
+    if SESSION_STORE == "sqlite":
+        return SqliteSessionStore()
+    if SESSION_STORE == "memory":
+        return MemorySessionStore()
+    raise ValueError(f"Unknown SESSION_STORE '{SESSION_STORE}' (expected 'memory' or 'sqlite')")
@@ -0,0 +1,88 @@
+# app/tokens.py
+import functools, re, threading
+from typing import Any, List
+
+ENCODING = "o200k_base"        # gpt-4o / gpt-4o-mini; text-embedding-3 uses cl100k but counts are close
+CHARS_PER_TOKEN = 4            # fallback estimate for English prose
+
+_enc_lock = threading.Lock()
+_enc: Any = None               # tiktoken Encoding, False once loading failed
+
+def _encoding():
+    """tiktoken needs the BPE file (downloaded once, then cached); without it we estimate."""
+    global _enc
+    if _enc is None:
+        with _enc_lock:
+            if _enc is None:
+                try:
+                    import tiktoken
+                    _enc = tiktoken.get_encoding(ENCODING)
+                except Exception:
+                    _enc = False
+    return _enc or None
+
+def tokenizer() -> str:
+    return "tiktoken" if _encoding() else "estimate"
+
+def count_tokens(text: str) -> int:
+    enc = _encoding()
+    if enc:
+        return len(enc.encode_ordinary(text))
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+@functools.lru_cache(maxsize=64)
+def static_tokens(text: str) -> int:
+    """Token count of a fixed prompt part (system prompts), computed once."""
+    return count_tokens(text)
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    enc = _encoding()
+    if enc:
+        ids = enc.encode_ordinary(text)
+        return text if len(ids) <= max_tokens else enc.decode(ids[:max_tokens])
+    return text[:max_tokens * CHARS_PER_TOKEN]
+
+# Sentence-ish units, each keeping its trailing whitespace so chunks read like the source
+_UNIT = re.compile(r"[^.!?\n]*(?:[.!?]+|\n+|$)\s*")
+
+def _hard_split(text: str, max_tokens: int) -> List[str]:
+    enc = _encoding()
+    if enc:
+        ids = enc.encode_ordinary(text)
+        return [enc.decode(ids[i:i + max_tokens]) for i in range(0, len(ids), max_tokens)]
+    step = max_tokens * CHARS_PER_TOKEN
+    return [text[i:i + step] for i in range(0, len(text), step)]
+
+def split_text(text: str, max_tokens: int, overlap_tokens: int = 0) -> List[str]:
+    """
+    Chunks of at most `max_tokens`, cut at sentence/line boundaries (a unit
+    longer than a chunk is cut by tokens). Consecutive chunks share up to
+    `overlap_tokens` of trailing sentences.
+    """
+    units = []
+    for u in _UNIT.findall(text):
+        if not u:
+            continue
+        n = count_tokens(u)
+        if n > max_tokens:
+            units.extend((p, count_tokens(p)) for p in _hard_split(u, max_tokens))
+        else:
+            units.append((u, n))
+
+    chunks, cur, size = [], [], 0
+    for u, n in units:
+        if cur and size + n > max_tokens:
+            chunks.append("".join(x for x, _ in cur).strip())
+            # carry the tail sentences over as overlap
+            keep, kept = [], 0
+            for x, m in reversed(cur):
+                if kept + m > overlap_tokens or kept + m + n > max_tokens:
+                    break
+                keep.insert(0, (x, m))
+                kept += m
+            cur, size = keep, kept
+        cur.append((u, n))
+        size += n
+    if cur:
+        chunks.append("".join(x for x, _ in cur).strip())
+    return [c for c in chunks if c]
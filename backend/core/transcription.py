@@ -0,0 +1,64 @@
+# app/transcription.py
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Any, Optional, Tuple
+from config import TRANSCRIBE_MODEL, TRANSCRIBE_BACKEND, MAX_CONCURRENT_TRANSCRIBES, TRANSCRIBE_QUEUE_TIMEOUT
+import metrics, upstream
+
+# (filename, bytes or readable stream, content type) -- the SDK's multipart file tuple
+AudioFile = Tuple[str, Any, str]
+
+class TranscriptionBackend(ABC):
+    """Speech-to-text behind /transcribe and the /ws/transcribe segments."""
+    name = "base"
+
+    @abstractmethod
+    async def transcribe(self, file: AudioFile, *, language: str) -> str:
+        ...
+
+class OpenAITranscription(TranscriptionBackend):
+    name = "openai"
+
+    def __init__(self, client=None, model: str = TRANSCRIBE_MODEL):
+        self._client = client
+        self.model = model
+
+    @property
+    def client(self):
+        # The shared client (and the openai import) only when the first upload arrives
+        return self._client or upstream.aopenai_client()
+
+    async def transcribe(self, file: AudioFile, *, language: str) -> str:
+        def attempt(t: float):
+            if hasattr(file[1], "seek"):  # a retry re-sends the upload from the start
+                file[1].seek(0)
+            return self.client.audio.transcriptions.create(model=self.model, file=file, language=language, timeout=t)
+        result = await upstream.acall("transcribe", attempt)
+        return getattr(result, "text", str(result))
+
+def _make_backend() -> TranscriptionBackend:
+    if TRANSCRIBE_BACKEND == "openai":
+        return OpenAITranscription()
+    raise ValueError(f"Unknown TRANSCRIBE_BACKEND '{TRANSCRIBE_BACKEND}' (expected 'openai')")
+
+# Replaceable at runtime (e.g. an in-process stub in bench/)
+backend: TranscriptionBackend = _make_backend()
+
+class TranscriptionBusy(Exception):
+    """No transcription slot freed up within the queue timeout."""
+
+# Backpressure: bounds in-flight upstream transcriptions (and the audio buffers they pin)
+_SLOTS = asyncio.Semaphore(MAX_CONCURRENT_TRANSCRIBES)
+
+async def transcribe(file: AudioFile, *, language: Optional[str] = None,
+                     queue_timeout: float = TRANSCRIBE_QUEUE_TIMEOUT) -> str:
+    try:
+        with metrics.stage("upload_queue"):
+            await asyncio.wait_for(_SLOTS.acquire(), queue_timeout)
+    except asyncio.TimeoutError:
+        raise TranscriptionBusy("Too many transcriptions in flight; retry shortly.")
+    try:
+        with metrics.stage("transcribe"):
+            return await backend.transcribe(file, language=language or "en")
+    finally:
+        _SLOTS.release()
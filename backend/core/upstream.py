@@ -0,0 +1,420 @@
+# app/upstream.py
+"""
+Every OpenAI and Qdrant call goes through here:
+
+  - one pooled HTTP client per service (HTTP/2 when h2 is installed, bounded
+    keep-alive pool, connect/read timeouts), shared by all modules;
+  - per-attempt timeouts: min(the call kind's cap, what is left of the
+    current turn budget, see `budget()`);
+  - retries of transient failures (timeouts, connection errors, 429/5xx) with
+    jittered backoff, limited per call and to UPSTREAM_RETRY_RATIO of traffic;
+  - hedging for idempotent async calls: if the first attempt outlives the
+    kind's observed p95, a second one races it (at most UPSTREAM_HEDGE_RATIO
+    of calls) and the loser is cancelled;
+  - a circuit breaker per call kind: after UPSTREAM_BREAKER_FAILURES
+    consecutive failures calls fail fast with CircuitOpen until a probe call
+    succeeds, so callers switch to cached/fallback behaviour immediately.
+
+Callers catch UpstreamError (raised once the layer gives up) to degrade;
+other exceptions (bad request, auth, ...) pass through unchanged.
+`state()` reports every kind for /upstreams; counters go to /metrics.
+"""
+import asyncio, contextvars, random, threading, time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, TypeVar
+import httpx
+from config import (
+    OPENAI_API_KEY, UPSTREAM_MAX_CONNECTIONS, UPSTREAM_MAX_KEEPALIVE, UPSTREAM_KEEPALIVE_S, UPSTREAM_HTTP2,
+    UPSTREAM_CONNECT_TIMEOUT, UPSTREAM_TIMEOUTS, TURN_BUDGET_S, UPSTREAM_RETRIES, UPSTREAM_RETRY_RATIO,
+    UPSTREAM_HEDGE, UPSTREAM_HEDGE_RATIO, UPSTREAM_HEDGE_MIN_MS, UPSTREAM_BREAKER_FAILURES,
+    UPSTREAM_BREAKER_COOLDOWN,
+)
+import metrics
+
+T = TypeVar("T")
+
+MIN_ATTEMPT_S = 0.05     # less budget than this left: do not start another attempt
+BACKOFF_S = 0.05         # first retry delay; doubles per retry, full jitter
+LATENCY_WINDOW = 256     # recent successful attempts per kind (hedge delay = their p95)
+HEDGE_MIN_SAMPLES = 20
+TOKENS_MAX = 10.0        # burst allowance of the retry/hedge budgets
+
+def parse_timeouts(spec: str) -> Dict[str, float]:
+    out = {}
+    for part in spec.split(","):
+        kind, _, secs = part.strip().partition("=")
+        if kind and secs:
+            out[kind.strip()] = float(secs)
+    return out
+
+TIMEOUTS = parse_timeouts(UPSTREAM_TIMEOUTS)
+DEFAULT_TIMEOUT = 10.0
+
+class UpstreamError(Exception):
+    """The upstream layer gave up on a call (breaker open, turn budget spent or retries exhausted)."""
+    def __init__(self, kind: str, detail: str):
+        super().__init__(f"{kind}: {detail}")
+        self.kind = kind
+
+class CircuitOpen(UpstreamError):
+    def __init__(self, kind: str, retry_after: float):
+        super().__init__(kind, f"circuit open, retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+class DeadlineExceeded(UpstreamError):
+    pass
+
+# ---------- turn deadline ----------
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("upstream_deadline", default=None)
+
+@contextmanager
+def budget(seconds: float = TURN_BUDGET_S) -> Iterator[None]:
+    """Bound every upstream call inside the block by one deadline (a nested budget can only shorten it)."""
+    end = time.monotonic() + seconds
+    prev = _deadline.get()
+    token = _deadline.set(end if prev is None else min(prev, end))
+    try:
+        yield
+    finally:
+        try:
+            _deadline.reset(token)
+        except ValueError:  # an async generator finalized from another context
+            _deadline.set(prev)
+
+def remaining() -> Optional[float]:
+    end = _deadline.get()
+    return None if end is None else end - time.monotonic()
+
+def spawn(coro: Awaitable[T]) -> "asyncio.Task[T]":
+    """create_task without the caller's turn deadline (background work outlives the turn)."""
+    ctx = contextvars.copy_context()
+    ctx.run(_deadline.set, None)
+    return asyncio.create_task(coro, context=ctx)
+
+# ---------- failure classification ----------
+# By name, so classifying does not import the SDKs: openai's connection/timeout errors and
+# qdrant-client's transport error; HTTP status errors of either SDK carry `status_code`.
+_TRANSIENT_TYPES = {"APIConnectionError", "APITimeoutError", "ResponseHandlingException"}
+
+def _named(e: BaseException, names) -> bool:
+    return any(c.__name__ in names for c in type(e).__mro__)
+
+def is_timeout(e: BaseException) -> bool:
+    return isinstance(e, (TimeoutError, httpx.TimeoutException)) or _named(e, {"APITimeoutError"})
+
+def is_transient(e: BaseException) -> bool:
+    if is_timeout(e) or isinstance(e, httpx.TransportError) or _named(e, _TRANSIENT_TYPES):
+        return True
+    status = getattr(e, "status_code", None)
+    return isinstance(status, int) and (status == 429 or status >= 500)
+
+# ---------- per-kind state ----------
+def _pct(xs: List[float], q: float) -> float:
+    # Nearest-rank below: the same index rule for every percentile, so p50 <= p95 on any window
+    return xs[int(q * (len(xs) - 1))]
+
+class _Bucket:
+    """Token bucket: every call earns `ratio` tokens, every retry/hedge spends one."""
+    def __init__(self, ratio: float):
+        self.ratio, self.tokens = ratio, TOKENS_MAX
+
+    def earn(self) -> None:
+        self.tokens = min(TOKENS_MAX, self.tokens + self.ratio)
+
+    def spend(self) -> bool:
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+class Upstream:
+    """Breaker, latency window and retry/hedge budgets of one call kind."""
+    def __init__(self, kind: str, timeout: float, *, failures: int = UPSTREAM_BREAKER_FAILURES,
+                 cooldown: float = UPSTREAM_BREAKER_COOLDOWN):
+        self.kind, self.timeout = kind, timeout
+        self.failures, self.cooldown = failures, cooldown
+        self.lock = threading.Lock()
+        self.state = "closed"
+        self.consecutive = 0
+        self.opened_at = 0.0
+        self.probe_at = 0.0      # half_open: when the probe call was let through (0: none yet)
+        self.latencies: deque = deque(maxlen=LATENCY_WINDOW)
+        self.retry_budget, self.hedge_budget = _Bucket(UPSTREAM_RETRY_RATIO), _Bucket(UPSTREAM_HEDGE_RATIO)
+        self.counts = {"calls": 0, "ok": 0, "failed": 0, "short_circuited": 0, "retries": 0,
+                       "hedges": 0, "hedge_wins": 0, "opened": 0}
+
+    # breaker: closed -> open after `failures` in a row; open -> half_open after `cooldown`,
+    # where a single probe call decides between closed and open again
+    def admit(self) -> None:
+        with self.lock:
+            now = time.monotonic()
+            if self.state == "open" and now - self.opened_at >= self.cooldown:
+                self.state, self.probe_at = "half_open", 0.0
+            # A probe that never reported back (cancelled) stops blocking after its timeout
+            probing = self.state == "half_open" and self.probe_at and now - self.probe_at < self.timeout
+            if self.state == "open" or probing:
+                self.counts["short_circuited"] += 1
+                wait = self._retry_after(now)
+            else:
+                self.probe_at = now if self.state == "half_open" else 0.0
+                self.counts["calls"] += 1
+                self.retry_budget.earn()
+                self.hedge_budget.earn()
+                return
+        metrics.inc("upstream_calls_total", upstream=self.kind, outcome="short_circuited")
+        raise CircuitOpen(self.kind, wait)
+
+    def _retry_after(self, now: float) -> float:
+        # open: until the cooldown ends; half_open with a probe in flight: until the probe times out
+        if self.state == "half_open":
+            return max(0.0, self.timeout - (now - self.probe_at))
+        return max(0.0, self.cooldown - (now - self.opened_at))
+
+    def succeeded(self, seconds: Optional[float]) -> None:
+        with self.lock:
+            self.counts["ok"] += 1
+            self.consecutive, self.probe_at = 0, 0.0
+            if seconds is not None:
+                self.latencies.append(seconds)
+            if self.state != "closed":
+                self.state = "closed"
+                metrics.inc("upstream_breaker_transitions_total", upstream=self.kind, to="closed")
+        metrics.inc("upstream_calls_total", upstream=self.kind, outcome="ok")
+
+    def failed(self) -> None:
+        with self.lock:
+            self.consecutive += 1
+            self.probe_at = 0.0
+            if self.state == "half_open" or (self.state == "closed" and self.consecutive >= self.failures):
+                self.state, self.opened_at = "open", time.monotonic()
+                self.counts["opened"] += 1
+                metrics.inc("upstream_breaker_transitions_total", upstream=self.kind, to="open")
+
+    def release(self) -> None:
+        # The attempt ended without telling anything about the upstream: let another probe through
+        with self.lock:
+            self.probe_at = 0.0
+
+    def gave_up(self, outcome: str) -> None:
+        with self.lock:
+            self.counts["failed"] += 1
+        metrics.inc("upstream_calls_total", upstream=self.kind, outcome=outcome)
+
+    def attempt_timeout(self) -> float:
+        left = remaining()
+        if left is None:
+            return self.timeout
+        if left < MIN_ATTEMPT_S:
+            raise DeadlineExceeded(self.kind, "turn budget spent")
+        return min(self.timeout, left)
+
+    def may_retry(self, attempt: int) -> bool:
+        left = remaining()
+        with self.lock:
+            if (attempt >= UPSTREAM_RETRIES or self.state == "open"
+                    or (left is not None and left < MIN_ATTEMPT_S * 2) or not self.retry_budget.spend()):
+                return False
+            self.counts["retries"] += 1
+        metrics.inc("upstream_retries_total", upstream=self.kind)
+        return True
+
+    def hedge_delay(self) -> Optional[float]:
+        with self.lock:
+            if len(self.latencies) < HEDGE_MIN_SAMPLES:
+                return None
+            xs = sorted(self.latencies)
+        return max(UPSTREAM_HEDGE_MIN_MS / 1000, _pct(xs, 0.95))
+
+    def may_hedge(self) -> bool:
+        with self.lock:
+            if not self.hedge_budget.spend():
+                return False
+            self.counts["hedges"] += 1
+        metrics.inc("upstream_hedges_total", upstream=self.kind)
+        return True
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            xs = sorted(self.latencies)
+            out = {"state": self.state, "consecutive_failures": self.consecutive, "timeout_s": self.timeout,
+                   **self.counts}
+            if self.state == "open" or (self.state == "half_open" and self.probe_at):
+                out["retry_after_s"] = round(self._retry_after(time.monotonic()), 2)
+        if xs:
+            out["p50_ms"] = round(_pct(xs, 0.5) * 1000, 1)
+            out["p95_ms"] = round(_pct(xs, 0.95) * 1000, 1)
+        return out
+
+_registry: Dict[str, Upstream] = {}
+_registry_lock = threading.Lock()
+
+def get(kind: str) -> Upstream:
+    up = _registry.get(kind)
+    if up is None:
+        with _registry_lock:
+            up = _registry.setdefault(kind, Upstream(kind, TIMEOUTS.get(kind, DEFAULT_TIMEOUT)))
+    return up
+
+def state() -> Dict[str, Dict[str, Any]]:
+    return {kind: up.snapshot() for kind, up in sorted(_registry.items())}
+
+def _backoff(attempt: int) -> float:
+    return min(random.uniform(0, BACKOFF_S * 2 ** attempt), max(0.0, (remaining() or 1.0) - MIN_ATTEMPT_S))
+
+def _retry_after(up: Upstream, e: Exception, t: float, attempt: int, retry: bool) -> bool:
+    """After a failed attempt: True to retry, False to re-raise `e` as is; raises UpstreamError to give up."""
+    if not is_transient(e):
+        up.succeeded(None)  # the upstream answered; the request was at fault
+        return False
+    if t < up.timeout and is_timeout(e) and (remaining() or 0.0) < MIN_ATTEMPT_S:
+        # Cut short by the turn budget, not slowness beyond the kind's cap: not the upstream's failure
+        up.release()
+        up.gave_up("deadline")
+        raise DeadlineExceeded(up.kind, "turn budget spent") from e
+    up.failed()
+    if retry and up.may_retry(attempt):
+        return True
+    up.gave_up("error")
+    raise UpstreamError(up.kind, f"{type(e).__name__}: {e}") from e
+
+# ---------- calls ----------
+def call(kind: str, fn: Callable[[float], T], *, retry: bool = True) -> T:
+    """
+    Run `fn(timeout_s)` (one attempt; it must enforce the timeout itself, e.g.
+    the SDK's `timeout=`) under the kind's breaker, deadline and retries.
+    """
+    up = get(kind)
+    up.admit()
+    attempt = 0
+    while True:
+        try:
+            t = up.attempt_timeout()
+        except DeadlineExceeded:
+            up.release()
+            up.gave_up("deadline")
+            raise
+        t0 = time.perf_counter()
+        try:
+            result = fn(t)
+        except Exception as e:
+            if not _retry_after(up, e, t, attempt, retry):
+                raise
+            attempt += 1
+            time.sleep(_backoff(attempt))
+            continue
+        up.succeeded(time.perf_counter() - t0)
+        return result
+
+async def acall(kind: str, fn: Callable[[float], Awaitable[T]], *, retry: bool = True,
+                hedge: bool = False) -> T:
+    """
+    Async `call`: each attempt is `await fn(timeout_s)` bounded by the timeout.
+    `hedge=True` (idempotent requests only) races a second attempt against a
+    slow first one.
+    """
+    up = get(kind)
+    up.admit()
+    attempt = 0
+    while True:
+        try:
+            t = up.attempt_timeout()
+        except DeadlineExceeded:
+            up.release()
+            up.gave_up("deadline")
+            raise
+        t0 = time.perf_counter()
+        try:
+            if hedge and UPSTREAM_HEDGE:
+                result = await _hedged(up, fn, t)
+            else:
+                result = await asyncio.wait_for(fn(t), t)
+        except Exception as e:
+            if not _retry_after(up, e, t, attempt, retry):
+                raise
+            attempt += 1
+            await asyncio.sleep(_backoff(attempt))
+            continue
+        up.succeeded(time.perf_counter() - t0)
+        return result
+
+async def _hedged(up: Upstream, fn: Callable[[float], Awaitable[T]], t: float) -> T:
+    first = asyncio.ensure_future(asyncio.wait_for(fn(t), t))
+    delay = up.hedge_delay()
+    if delay is None or delay >= t - MIN_ATTEMPT_S:
+        return await first
+    tasks = {first}
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if done or not up.may_hedge():
+            return await first
+        second = asyncio.ensure_future(asyncio.wait_for(fn(t - delay), t - delay))
+        tasks.add(second)
+        pending, error = set(tasks), None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for d in done:
+                if d.exception() is None:
+                    if d is second:
+                        with up.lock:
+                            up.counts["hedge_wins"] += 1
+                    return d.result()
+                error = d.exception()
+        raise error
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+# ---------- shared clients ----------
+_clients: Dict[str, Any] = {}
+_clients_lock = threading.Lock()
+
+def _http2() -> bool:
+    if not UPSTREAM_HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401  (httpx's optional HTTP/2 support)
+        return True
+    except ImportError:
+        return False
+
+def limits() -> httpx.Limits:
+    return httpx.Limits(max_connections=UPSTREAM_MAX_CONNECTIONS, max_keepalive_connections=UPSTREAM_MAX_KEEPALIVE,
+                        keepalive_expiry=UPSTREAM_KEEPALIVE_S)
+
+def _shared(name: str, build: Callable[[], Any]) -> Any:
+    client = _clients.get(name)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(name)
+            if client is None:
+                client = _clients[name] = build()
+    return client
+
+def _read_timeout() -> float:
+    # Per-request timeouts are passed on every call; this only bounds calls made without one
+    return max(TIMEOUTS.values(), default=DEFAULT_TIMEOUT)
+
+def openai_client():
+    """The process-wide sync OpenAI client (SDK retries off: retries happen here, within the deadline)."""
+    def build():
+        from openai import OpenAI
+        http = httpx.Client(http2=_http2(), limits=limits(),
+                            timeout=httpx.Timeout(_read_timeout(), connect=UPSTREAM_CONNECT_TIMEOUT))
+        return OpenAI(api_key=OPENAI_API_KEY, http_client=http, max_retries=0)
+    return _shared("openai", build)
+
+def aopenai_client():
+    """The process-wide async OpenAI client."""
+    def build():
+        from openai import AsyncOpenAI
+        http = httpx.AsyncClient(http2=_http2(), limits=limits(),
+                                 timeout=httpx.Timeout(_read_timeout(), connect=UPSTREAM_CONNECT_TIMEOUT))
+        return AsyncOpenAI(api_key=OPENAI_API_KEY, http_client=http, max_retries=0)
+    return _shared("aopenai", build)
+
+def qdrant_options() -> Dict[str, Any]:
+    """QdrantClient/AsyncQdrantClient kwargs: pooled keep-alive connections (its default keeps none)."""
+    return {"timeout": int(max(TIMEOUTS.get("qdrant_write", DEFAULT_TIMEOUT), 1)), "limits": limits(),
+            "http2": _http2()}
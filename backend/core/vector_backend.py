@@ -0,0 +1,57 @@
+# app/vector_backend.py
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+Point = Tuple[str, List[float], Dict[str, Any]]      # (id, vector, payload)
+ScoredPayload = Tuple[Dict[str, Any], float]           # (payload, cosine score)
+ScoredPoint = Tuple[Dict[str, Any], float, List[float]]  # (payload, cosine score, vector) with with_vectors=True
+
+class VectorBackend(ABC):
+    """
+    Storage/search primitives behind core/vectorstore.py. Vectors are compared
+    by cosine similarity; `filters` are exact-match conditions on payload
+    fields (all must hold; a tuple value matches any of its items). Async methods default to the sync ones, which is
+    right for in-process backends; network backends override them.
+    """
+    name = "base"
+
+    @abstractmethod
+    def ensure_collection(self) -> None:
+        ...
+
+    @abstractmethod
+    def upsert(self, points: List[Point]) -> None:
+        ...
+
+    @abstractmethod
+    def existing_ids(self, ids: Iterable[str]) -> Set[str]:
+        ...
+
+    @abstractmethod
+    def delete(self, filters: Dict[str, Any], keep_ids: Optional[Iterable[str]] = None) -> None:
+        """Delete points matching `filters`, except those in `keep_ids`."""
+
+    @abstractmethod
+    def count(self) -> int:
+        ...
+
+    @abstractmethod
+    def search(self, vectors: List[List[float]], *, top_k: int,
+               filters: Optional[Dict[str, Any]] = None, with_vectors: bool = False) -> List[List[ScoredPayload]]:
+        """One ranked hit list per query vector, best first; `with_vectors` adds each point's vector (ScoredPoint)."""
+
+    @abstractmethod
+    def scroll(self, filters: Optional[Dict[str, Any]] = None, *,
+               limit: Optional[int] = None) -> List[Tuple[Dict[str, Any], List[float]]]:
+        """(payload, vector) for points matching `filters`; may stop once more than `limit` are seen."""
+
+    async def aensure_collection(self) -> None:
+        self.ensure_collection()
+
+    async def asearch(self, vectors: List[List[float]], *, top_k: int,
+                      filters: Optional[Dict[str, Any]] = None, with_vectors: bool = False) -> List[List[ScoredPayload]]:
+        return self.search(vectors, top_k=top_k, filters=filters, with_vectors=with_vectors)
+
+    async def ascroll(self, filters: Optional[Dict[str, Any]] = None, *,
+                      limit: Optional[int] = None) -> List[Tuple[Dict[str, Any], List[float]]]:
+        return self.scroll(filters, limit=limit)
@@ -1,63 +1,185 @@
 # app/vectorstore.py
-from typing import List, Dict, Any
-from qdrant_client import QdrantClient
-from qdrant_client.http.models import Distance, VectorParams, PointStruct, Filter, FieldCondition, MatchValue
-import uuid
-from config import QDRANT_URL, QDRANT_API_KEY, QDRANT_COLLECTION
-from embeddings import embed_texts
+from typing import List, Dict, Any, Tuple
+import hashlib, threading, uuid
+from config import (
+    VECTOR_BACKEND, QDRANT_URL, QDRANT_API_KEY, QDRANT_COLLECTION, LOCAL_VECTOR_PATH,
+    CHUNK_TOKENS, CHUNK_OVERLAP_TOKENS, VECTOR_QUANTIZATION, QUANT_OVERSAMPLING,
+)
+from embeddings import embed_texts, aembed_texts, EMBED_DIM
+from vector_backend import VectorBackend
+from tokens import split_text, tokenizer
+import metrics
 
-client = QdrantClient(url=QDRANT_URL, api_key=QDRANT_API_KEY)
+VECTOR_SIZE = EMBED_DIM  # 3072 for text-embedding-3-large unless EMBED_DIMENSIONS is set
+
+def _make_backend() -> VectorBackend:
+    if VECTOR_BACKEND == "local":
+        from local_backend import LocalBackend
+        return LocalBackend(path=LOCAL_VECTOR_PATH, collection=QDRANT_COLLECTION, size=VECTOR_SIZE,
+                            quantization=VECTOR_QUANTIZATION, oversampling=QUANT_OVERSAMPLING)
+    if VECTOR_BACKEND == "qdrant":
+        from qdrant_backend import QdrantBackend
+        return QdrantBackend(url=QDRANT_URL, api_key=QDRANT_API_KEY, collection=QDRANT_COLLECTION, size=VECTOR_SIZE,
+                             quantization=VECTOR_QUANTIZATION, oversampling=QUANT_OVERSAMPLING)
+    raise ValueError(f"Unknown VECTOR_BACKEND '{VECTOR_BACKEND}' (expected 'qdrant' or 'local')")
+
+_backend_lock = threading.Lock()
+
+def get_backend() -> VectorBackend:
+    """
+    The configured backend, built on first use: the Qdrant client pulls in
+    grpc/protobuf, so importing this module stays cheap. Replaceable at runtime
+    by assigning `vectorstore.backend` (e.g. an in-memory client in bench/).
+    """
+    b = globals().get("backend")
+    if b is None:
+        with _backend_lock:
+            b = globals().get("backend")
+            if b is None:
+                b = globals()["backend"] = _make_backend()
+    return b
+
+def __getattr__(name: str):
+    if name == "backend":
+        return get_backend()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def ensure_collection():
-    cols = client.get_collections().collections
-    if QDRANT_COLLECTION not in [c.name for c in cols]:
-        client.recreate_collection(
-            collection_name=QDRANT_COLLECTION,
-            vectors_config=VectorParams(size=3072, distance=Distance.COSINE)
-        )
-
-def _chunk(text: str, max_chars=1800, overlap=200) -> List[str]:
-    out, i, n = [], 0, len(text)
-    while i < n:
-        j = min(i + max_chars, n)
-        out.append(text[i:j])
-        if j == n: break
-        i = max(0, j - overlap)
-    return out
+    get_backend().ensure_collection()
+
+async def aensure_collection():
+    await get_backend().aensure_collection()
+
+def chunk(text: str) -> List[str]:
+    # Token-bounded, sentence-aligned chunks (embedding inputs and prompt snippets are budgeted in tokens)
+    return split_text(text, CHUNK_TOKENS, CHUNK_OVERLAP_TOKENS)
+
+def content_hash(*parts: str) -> str:
+    h = hashlib.sha256()
+    for p in parts:
+        h.update(p.encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+def doc_hash(text: str, meta: Dict[str, Any]) -> str:
+    # Chunking settings are part of the version: changing them re-chunks on the next index. So is the
+    # tokenizer: without the tiktoken BPE file chunks are cut on a character estimate instead
+    chunking = f"chunk:{CHUNK_TOKENS}/{CHUNK_OVERLAP_TOKENS}:{tokenizer()}"
+    return content_hash(text, repr(sorted(meta.items())), chunking)
+
+def doc_fingerprint(text: str, meta: Dict[str, Any]) -> Dict[str, Any]:
+    return {"hash": doc_hash(text, meta), "chunks": len(chunk(text))}
+
+# Document ids. Bulk-ingested documents (core/ingest.py) live under their own prefix, so they
+# add to the corpus instead of overwriting the data/content.py documents the index manifest tracks
+INGESTED = "ingest::"
+
+def rubric_doc_id(role: str) -> str: return f"rubric::{role}"
+
+def resume_doc_id(candidate_name: str, role: str) -> str: return f"resume::{candidate_name}::{role}"
+
+def point_id(doc_id: str, chunk_idx: int, chunk_hash: str) -> str:
+    # Deterministic: re-indexing unchanged content overwrites instead of duplicating
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{doc_id}#{chunk_idx}#{chunk_hash}"))
+
+def count_points() -> int:
+    ensure_collection()
+    return get_backend().count()
 
 def upsert_document(*, doc_id: str, text: str, meta: Dict[str, Any]) -> int:
+    """
+    Incrementally index a document. Only chunks whose deterministic id is not
+    already stored get embedded; stale points for `doc_id` are deleted.
+    Returns the number of chunks embedded.
+    """
+    ensure_collection()
+    chunks = chunk(text)
+    meta_sig = repr(sorted(meta.items()))
+    ids = [point_id(doc_id, idx, content_hash(ch, meta_sig)) for idx, ch in enumerate(chunks)]
+    backend = get_backend()
+    present = backend.existing_ids(ids)
+    todo = [(idx, ch, pid) for idx, (ch, pid) in enumerate(zip(chunks, ids)) if pid not in present]
+    if todo:
+        vecs = embed_texts([ch for _, ch, _ in todo], bulk=True)
+        points = []
+        for (idx, ch, pid), v in zip(todo, vecs):
+            payload = {
+                "doc_id": doc_id,
+                "chunk_idx": idx,
+                "text": ch,
+                **meta,  # expected: dtype ('resume'|'rubric'), role, candidate_name (opt)
+            }
+            points.append((pid, v, payload))
+        backend.upsert(points)
+    # Drop chunks from older versions of this document (incl. legacy random-id points)
+    backend.delete({"doc_id": doc_id}, keep_ids=ids)
+    return len(todo)
+
+def delete_document(doc_id: str) -> None:
     ensure_collection()
-    chunks = _chunk(text)
-    vecs = embed_texts(chunks)
-    points = []
-    for idx, (ch, v) in enumerate(zip(chunks, vecs)):
-        pid = str(uuid.uuid4())
-        payload = {
-            "doc_id": doc_id,
-            "chunk_idx": idx,
-            "text": ch,
-            **meta,  # expected: dtype ('resume'|'rubric'), role, candidate_name (opt)
-        }
-        points.append(PointStruct(id=pid, vector=v, payload=payload))
-    client.upsert(collection_name=QDRANT_COLLECTION, points=points)
-    return len(points)
+    get_backend().delete({"doc_id": doc_id})
+
+def to_hit(p: Dict[str, Any], score: float, vector=None) -> Dict[str, Any]:
+    hit = {
+        "score": score,
+        "doc_id": p.get("doc_id"),
+        "chunk_idx": p.get("chunk_idx"),
+        "text": p.get("text"),
+        "meta": {k: v for k, v in p.items() if k not in ["doc_id","chunk_idx","text"]}
+    }
+    if vector is not None:
+        hit["vector"] = vector  # for reranking only; stripped before snippets reach the LLM
+    return hit
+
+def _to_hits(scored) -> List[Dict[str, Any]]:
+    return [to_hit(*t) for t in scored]
 
 def search(query: str, *, top_k=8, filters: Dict[str, Any] | None=None):
     ensure_collection()
     qv = embed_texts([query])[0]
-    qf = None
-    if filters:
-        conds = [FieldCondition(key=k, match=MatchValue(value=v)) for k, v in filters.items()]
-        qf = Filter(must=conds)
-    hits = client.search(collection_name=QDRANT_COLLECTION, query_vector=qv, limit=top_k, query_filter=qf)
-    out = []
-    for h in hits:
-        p = h.payload or {}
-        out.append({
-            "score": h.score,
-            "doc_id": p.get("doc_id"),
-            "chunk_idx": p.get("chunk_idx"),
-            "text": p.get("text"),
-            "meta": {k: v for k, v in p.items() if k not in ["doc_id","chunk_idx","text"]}
-        })
-    return out
+    with metrics.stage("vector_search"):
+        return _to_hits(get_backend().search([qv], top_k=top_k, filters=filters)[0])
+
+def search_many(queries: List[str], *, top_k=8, filters: Dict[str, Any] | None=None,
+                stats: Dict[str, int] | None=None, with_vectors: bool=False) -> List[List[Dict[str, Any]]]:
+    """
+    Batched variant of `search`: one embedding call for all queries and one
+    backend batch search. Returns one hit list per query, in order; hits
+    carry a "vector" when `with_vectors`.
+    Upstream round-trips are tallied into `stats` when given.
+    """
+    if not queries:
+        return []
+    ensure_collection()
+    qvs = embed_texts(queries, stats=stats)
+    backend = get_backend()
+    with metrics.stage("vector_search"):
+        batches = backend.search(qvs, top_k=top_k, filters=filters, with_vectors=with_vectors)
+    if stats is not None and backend.name != "local":
+        stats["search"] = stats.get("search", 0) + 1
+    return [_to_hits(hits) for hits in batches]
+
+async def asearch_many(queries: List[str], *, top_k=8, filters: Dict[str, Any] | None=None,
+                       stats: Dict[str, int] | None=None, with_vectors: bool=False) -> List[List[Dict[str, Any]]]:
+    """Async `search_many`."""
+    if not queries:
+        return []
+    await aensure_collection()
+    qvs = await aembed_texts(queries, stats=stats)
+    backend = get_backend()
+    with metrics.stage("vector_search"):
+        batches = await backend.asearch(qvs, top_k=top_k, filters=filters, with_vectors=with_vectors)
+    if stats is not None and backend.name != "local":
+        stats["search"] = stats.get("search", 0) + 1
+    return [_to_hits(hits) for hits in batches]
+
+def scroll_points(filters: Dict[str, Any] | None=None, *, limit: int | None=None) -> List[Tuple[Dict[str, Any], List[float]]]:
+    """All (payload, vector) pairs matching `filters`; stops early once more than `limit` are seen."""
+    ensure_collection()
+    with metrics.stage("vector_scroll"):
+        return get_backend().scroll(filters, limit=limit)
+
+async def ascroll_points(filters: Dict[str, Any] | None=None, *, limit: int | None=None) -> List[Tuple[Dict[str, Any], List[float]]]:
+    await aensure_collection()
+    with metrics.stage("vector_scroll"):
+        return await get_backend().ascroll(filters, limit=limit)
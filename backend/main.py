@@ -1,24 +1,108 @@
 # main.py
-from fastapi import FastAPI, UploadFile, File, Form
+from fastapi import FastAPI, UploadFile, File, Form, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse
 from pydantic import BaseModel
-from typing import Dict, List, Optional
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
 from uuid import uuid4
-import tempfile, os, time
+import asyncio, math, os, time, json
 
-from config import OPENAI_API_KEY, ALLOWED_ORIGINS, TRANSCRIBE_MODEL
-from openai import OpenAI
+from config import (
+    ALLOWED_ORIGINS, TRANSCRIBE_MODEL, PIPELINE_TURNS, PREWARM_ARTIFACTS, MAX_UPLOAD_BYTES, MAX_PENDING_UPLOADS,
+    STARTUP_MODE,
+)
+
+# Same module instances the core/ modules use (they import each other flat)
+import metrics, transcription, upstream
+from segmenter import PCMSegmenter, to_wav, MIN_SAMPLE_RATE, MAX_SAMPLE_RATE
 
 # === Interview brain (Qdrant-only, local rubric/resume) ===
 from core.orchestrator import (
-    start_session as brain_start_session,
-    next_turn as brain_next_turn,
-    index_all_content as brain_index_all_content,
+    astart_session as brain_start_session,
+    anext_turn as brain_next_turn,
+    astream_next_turn as brain_stream_next_turn,
+    aprefetch_turn as brain_prefetch_turn,
+    aprewarm as brain_prewarm,
+    prepare_worker as brain_prepare_worker,
+    worker_ready as brain_worker_ready,
+    afirst_question_pending as brain_first_question_pending,
+    atake_first_question as brain_take_first_question,
+    arecord_transcript as brain_record_transcript,
+    arecord_partial as brain_record_partial,
+    aupcoming_targets as brain_upcoming_targets,
 )
 
 app = FastAPI(title="Transcriber + Interview Brain", version="1.1.0")
 
+
+class UploadGuard:
+    """
+    ASGI middleware for the audio upload endpoints: refuses a request before
+    its multipart body is received and spooled, so the MAX_UPLOAD_BYTES limit
+    protects bandwidth, disk and the transcription slots rather than only the
+    transcription API. 413 on a Content-Length over the limit (or once a body
+    without one grows past it); 503 + Retry-After while MAX_PENDING_UPLOADS
+    uploads are already being received, queued or transcribed.
+    """
+    PATHS = ("/transcribe", "/transcribe_stream")
+    MULTIPART_SLACK = 64 * 1024  # boundaries, part headers and the small form fields
+
+    def __init__(self, app):
+        self.app = app
+        self.pending = 0
+
+    @staticmethod
+    async def _reject(send, status: int, error: str, detail: str, headers=()) -> None:
+        metrics.inc("uploads_rejected_total", reason="too_large" if status == 413 else "busy")
+        body = json.dumps({"session_id": None, "error": error, "detail": detail}).encode()
+        await send({"type": "http.response.start", "status": status,
+                    "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()),
+                                *headers]})
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.PATHS:
+            return await self.app(scope, receive, send)
+        limit = MAX_UPLOAD_BYTES + self.MULTIPART_SLACK
+        length = dict(scope["headers"]).get(b"content-length")
+        if length is not None and length.isdigit() and int(length) > limit:
+            return await self._reject(send, 413, "upload_too_large",
+                                      f"Request is {int(length)} bytes; audio is limited to {MAX_UPLOAD_BYTES} bytes.")
+        if self.pending >= MAX_PENDING_UPLOADS:
+            return await self._reject(send, 503, "transcription_busy", "Too many uploads in flight; retry shortly.",
+                                      [(b"retry-after", b"1")])
+        received, started, rejected = 0, False, False
+
+        async def limited_receive():
+            # Past the limit: answer 413 here and tell the app the client went away
+            nonlocal received, rejected
+            if rejected:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            received += len(message.get("body", b""))
+            if received > limit and not rejected:
+                rejected = True
+                if not started:
+                    await self._reject(send, 413, "upload_too_large", f"Audio is limited to {MAX_UPLOAD_BYTES} bytes.")
+            return {"type": "http.disconnect"} if rejected else message
+
+        async def send_wrapper(message):
+            nonlocal started
+            if rejected:
+                return  # the 413 already went out
+            started = started or message["type"] == "http.response.start"
+            await send(message)
+
+        self.pending += 1
+        try:
+            await self.app(scope, limited_receive, send_wrapper)
+        finally:
+            self.pending -= 1
+
+
+# Innermost, so its early 413/503 responses still get CORS headers
+app.add_middleware(UploadGuard)
+
 # CORS
 allowed = [o.strip() for o in ALLOWED_ORIGINS.split(",") if o.strip()]
 app.add_middleware(
@@ -27,14 +111,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
-
-client = OpenAI(api_key=OPENAI_API_KEY)
-
-# In-memory stores
-SESSIONS_TRANSCRIPTS: Dict[str, List[Dict]] = {}
-FIRST_QUESTIONS_CACHE: Dict[str, Dict] = {}  # session_id -> first question JSON
-
+app.add_middleware(metrics.ServerTimingMiddleware)
 
 class TranscriptItem(BaseModel):
     id: str
@@ -44,10 +123,39 @@ class TranscriptItem(BaseModel):
     created_ts: int
 
 
+_BOOT_T0 = time.perf_counter()  # ~process start: main is imported first
+
+async def _boot():
+    # Index local rubric & resume content, build the clients; transient failures retry with backoff
+    delay = 1.0
+    while True:
+        try:
+            await asyncio.to_thread(brain_prepare_worker)
+            app.state.boot_error = None
+            app.state.ready_s = round(time.perf_counter() - _BOOT_T0, 3)
+            return
+        except Exception as e:
+            app.state.boot_error = f"{type(e).__name__}: {e}"
+            metrics.inc("boot_failures_total")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+@app.on_event("startup")
+async def _startup():
+    # /health answers as soon as the app is up; /ready once the worker can take interviews
+    app.state.boot_error, app.state.ready_s = None, None
+    if STARTUP_MODE == "blocking":
+        await asyncio.to_thread(brain_prepare_worker)
+        app.state.ready_s = round(time.perf_counter() - _BOOT_T0, 3)
+    else:
+        app.state.boot_task = asyncio.create_task(_boot())
+
+
 @app.on_event("startup")
-def _startup():
-    # Ensure Qdrant is indexed with local rubric & resume content
-    brain_index_all_content()
+async def _prewarm():
+    # Optional: build shared intros / first questions in the background
+    if PREWARM_ARTIFACTS:
+        app.state.prewarm_task = asyncio.create_task(brain_prewarm())
 
 
 @app.get("/health")
@@ -55,6 +163,26 @@ def health():
     return {"ok": True, "model": TRANSCRIBE_MODEL}
 
 
+@app.get("/ready")
+def ready():
+    # Readiness (route traffic here), unlike /health (liveness): content indexed, clients built
+    if brain_worker_ready():
+        return {"ready": True, "ready_s": getattr(app.state, "ready_s", None)}
+    return JSONResponse(status_code=503, content={"ready": False, "error": getattr(app.state, "boot_error", None)})
+
+
+@app.get("/metrics")
+def metrics_endpoint():
+    # Prometheus text format: per-stage latency histograms + p50/p95/p99, tokens, cache outcomes
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/upstreams")
+def upstreams_endpoint():
+    # Circuit breaker state, call/retry/hedge counts and recent latency per upstream call kind
+    return upstream.state()
+
+
 # ---------- 1) Startup API: greeting only (no question) ----------
 class StartupIn(BaseModel):
     candidate_name: str
@@ -62,7 +190,7 @@ class StartupIn(BaseModel):
     minutes: Optional[int] = 60
 
 @app.post("/startup_interview")
-def startup_interview(payload: StartupIn):
+async def startup_interview(payload: StartupIn):
     """
     Initialize an interview session:
       - Returns greetings/intro only (no question).
@@ -70,14 +198,13 @@ def startup_interview(payload: StartupIn):
     Client should then call /transcribe to start Q&A.
     """
     try:
-        start_payload = brain_start_session(
+        start_payload = await brain_start_session(
             candidate_name=payload.candidate_name,
             role=payload.role,
             minutes=int(payload.minutes or 60),
         )
+        # The first question stays pending in the session; only return the intro now
         session_id = start_payload["session_id"]
-        # Cache the first question; only return the intro now
-        FIRST_QUESTIONS_CACHE[session_id] = start_payload["question"]
         return JSONResponse(
             {
                 "session_id": session_id,
@@ -91,6 +218,110 @@ def startup_interview(payload: StartupIn):
         )
 
 
+# ---------- Shared helpers for the transcribe endpoints ----------
+class UploadRejected(Exception):
+    """Upload refused before reaching the transcription API (too large / server saturated)."""
+    def __init__(self, status_code: int, error: str, detail: str, headers: Optional[Dict[str, str]] = None):
+        super().__init__(detail)
+        self.status_code, self.error, self.detail, self.headers = status_code, error, detail, headers
+
+    def response(self, sid: Optional[str]) -> JSONResponse:
+        return JSONResponse(status_code=self.status_code, headers=self.headers,
+                            content={"session_id": sid, "error": self.error, "detail": self.detail})
+
+
+class _UploadStream:
+    """
+    Read-only view of the spooled upload for the multipart encoder. Hiding
+    fileno() matters: httpx sizes real files with fstat, and fileno() on a
+    SpooledTemporaryFile rolls an in-memory upload over to disk.
+    """
+    def __init__(self, f):
+        self._f = f
+
+    def read(self, n: int = -1) -> bytes:
+        return self._f.read(n)
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        return self._f.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._f.tell()
+
+
+def _upload_size(file: UploadFile) -> int:
+    if file.size is not None:
+        return file.size
+    f = file.file
+    pos = f.tell()
+    size = f.seek(0, os.SEEK_END)
+    f.seek(pos)
+    return size
+
+
+async def _transcribe_upload(file: UploadFile, language_hint: Optional[str]) -> str:
+    # Starlette already spooled the body (memory up to 1 MB, then disk): hand that
+    # buffer straight to the SDK instead of copying it through a temp file
+    size = _upload_size(file)
+    if size > MAX_UPLOAD_BYTES:
+        metrics.inc("uploads_rejected_total", reason="too_large")
+        raise UploadRejected(413, "upload_too_large",
+                             f"Audio is {size} bytes; the limit is {MAX_UPLOAD_BYTES} bytes.")
+    file.file.seek(0)
+    upload = (file.filename or "audio.webm", _UploadStream(file.file), file.content_type or "application/octet-stream")
+    try:
+        text = await transcription.transcribe(upload, language=language_hint)
+    except transcription.TranscriptionBusy as e:
+        metrics.inc("uploads_rejected_total", reason="busy")
+        raise UploadRejected(503, "transcription_busy", str(e), headers={"Retry-After": "1"})
+    except upstream.CircuitOpen as e:
+        metrics.inc("uploads_rejected_total", reason="upstream_down")
+        raise UploadRejected(503, "transcription_unavailable", str(e),
+                             headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))})
+    metrics.inc("upload_bytes_total", size)
+    return text
+
+
+async def _prefetch(sid: str) -> Optional[Dict]:
+    if await brain_first_question_pending(sid):
+        return None  # this upload only starts the Q&A
+    return await brain_prefetch_turn(sid)
+
+
+def _start_prefetch(sid: str) -> Optional[asyncio.Task]:
+    # Pipelined mode: retrieval for the predicted next target overlaps transcription
+    if not PIPELINE_TURNS:
+        return None
+    return asyncio.create_task(_prefetch(sid))
+
+
+async def _await_prefetch(task: Optional[asyncio.Task]) -> Optional[Dict]:
+    if task is None:
+        return None
+    try:
+        return await task
+    except Exception:
+        return None  # next_turn falls back to full retrieval
+
+
+def _timings(t_start: float, transcribe_ms: float, brain: Dict[str, float]) -> Dict[str, float]:
+    out = {"transcribe_ms": transcribe_ms, **brain}
+    if "prefetch_ms" in brain:
+        out["overlap_saved_ms"] = min(brain["prefetch_ms"], transcribe_ms)
+    out["total_ms"] = (time.perf_counter() - t_start) * 1000
+    return {k: round(v, 1) for k, v in out.items()}
+
+
+async def _record_transcript(sid: str, text: str) -> Dict:
+    item = TranscriptItem(
+        id=str(uuid4()),
+        text=text,
+        created_ts=int(time.time() * 1000),
+    ).model_dump()
+    await brain_record_transcript(sid, item)
+    return item
+
+
 # ---------- 2) Transcribe API: start Q&A (then subsequent turns) ----------
 @app.post("/transcribe")
 async def transcribe_audio(
@@ -102,6 +333,9 @@ async def transcribe_audio(
     Upload audio (webm/ogg/wav/m4a) and get:
       - On first call right after /startup_interview: the first grounded question (ignores transcript for Q&A start)
       - On subsequent calls: treats transcript as candidate's answer and returns next grounded question
+    Uploads over MAX_UPLOAD_BYTES get 413 before the body is read (UploadGuard); when
+    MAX_PENDING_UPLOADS are in flight, every transcription slot stays busy or the
+    transcription upstream's circuit is open, 503 + Retry-After.
     """
     if not session_id:
         return JSONResponse(
@@ -113,31 +347,18 @@ async def transcribe_audio(
         )
 
     sid = session_id
+    t_start = time.perf_counter()
+    prefetch = _start_prefetch(sid)
 
-    # Save upload to a temp file so OpenAI SDK can read a real file handle
-    suffix = os.path.splitext(file.filename or "")[-1] or ".webm"
-    tmp_path = None
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-            content = await file.read()
-            tmp.write(content)
-            tmp_path = tmp.name
-
-        # ---- Transcribe ----
-        with open(tmp_path, "rb") as f:
-            result = client.audio.transcriptions.create(
-                model=TRANSCRIBE_MODEL,
-                file=f,
-                language=(language_hint or "en"),
-            )
-        text = getattr(result, "text", str(result))
-
+        text = await _transcribe_upload(file, language_hint)
+    except UploadRejected as e:
+        if prefetch:
+            prefetch.cancel()
+        return e.response(sid)
     except Exception as e:
-        if tmp_path:
-            try:
-                os.remove(tmp_path)
-            except:
-                pass
+        if prefetch:
+            prefetch.cancel()
         return JSONResponse(
             status_code=500,
             content={
@@ -146,42 +367,36 @@ async def transcribe_audio(
                 "detail": str(e),
             },
         )
-    finally:
-        if tmp_path:
-            try:
-                os.remove(tmp_path)
-            except:
-                pass
+    transcribe_ms = (time.perf_counter() - t_start) * 1000
 
     # Save transcript chunk locally (optional)
-    item = TranscriptItem(
-        id=str(uuid4()),
-        text=text,
-        created_ts=int(time.time() * 1000),
-    ).model_dump()
-    SESSIONS_TRANSCRIPTS.setdefault(sid, []).append(item)
+    item = await _record_transcript(sid, text)
 
-    # If we still have the FIRST question cached for this session, return it now and clear the cache.
-    if sid in FIRST_QUESTIONS_CACHE:
-        first_q = FIRST_QUESTIONS_CACHE.pop(sid)
+    # If the FIRST question is still pending for this session, return it now (served once).
+    first_q = await brain_take_first_question(sid)
+    if first_q is not None:
         return JSONResponse(
             {
                 "session_id": sid,
                 "item": item,             # user's "ready" / greeting transcript
                 "ai_question": first_q,   # first grounded question (with citations)
                 "coverage": {"Resume Projects": 1},  # aligns with brain’s first hit
+                "upcoming": await brain_upcoming_targets(sid),  # next planned {dimension, difficulty} targets
                 "note": "First Q&A has started. Subsequent /transcribe calls will treat audio as your answer.",
             }
         )
 
     # Otherwise, treat this transcript as the candidate's answer and advance Q&A
     try:
-        nxt = brain_next_turn(session_id=sid, candidate_text=text)
+        nxt = await brain_next_turn(session_id=sid, candidate_text=text,
+                                    prefetched=await _await_prefetch(prefetch))
         response_payload = {
             "session_id": sid,
             "item": item,           # transcript chunk
             "ai_question": nxt["question"],  # next grounded question JSON (with citations)
             "coverage": nxt.get("coverage"),
+            "upcoming": nxt.get("upcoming"),
+            "timings": _timings(t_start, transcribe_ms, nxt.get("timings", {})),
         }
         return JSONResponse(response_payload)
     except Exception as e:
@@ -194,3 +409,227 @@ async def transcribe_audio(
                 "detail": str(e),
             },
         )
+
+
+# ---------- 3) Streaming Transcribe API: same as /transcribe, question streamed over SSE ----------
+def _sse(event: str, data: Dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _turn_events(sid: str, text: str, item: Dict, prefetch: Optional[asyncio.Task],
+                       t_start: float, transcribe_ms: float) -> AsyncIterator[Tuple[str, Dict]]:
+    # (event, data) pairs shared by the SSE and WebSocket endpoints
+    yield "transcript", {"session_id": sid, "item": item}
+    first_q = await brain_take_first_question(sid)
+    if first_q is not None:
+        yield "final", {"session_id": sid, "ai_question": first_q, "coverage": {"Resume Projects": 1},
+                        "upcoming": await brain_upcoming_targets(sid)}
+        return
+    try:
+        async for ev in brain_stream_next_turn(session_id=sid, candidate_text=text,
+                                               prefetched=await _await_prefetch(prefetch)):
+            if ev["type"] == "delta":
+                yield "delta", {"text": ev["text"]}
+            else:
+                yield "final", {"session_id": sid, "ai_question": ev["question"], "coverage": ev.get("coverage"),
+                                "upcoming": ev.get("upcoming"),
+                                "timings": _timings(t_start, transcribe_ms, ev.get("timings", {}))}
+    except Exception as e:
+        yield "error", {"session_id": sid, "error": "interview_brain_failed", "detail": str(e)}
+
+
+@app.post("/transcribe_stream")
+async def transcribe_audio_stream(
+    file: UploadFile = File(...),
+    session_id: Optional[str] = Form(None),
+    language_hint: Optional[str] = Form(None),
+):
+    """
+    Server-Sent Events variant of /transcribe. Emits:
+      - `transcript`: the transcript item, as soon as transcription finishes
+      - `delta`:      incremental text of the next question while the model writes it
+      - `final`:      the full question JSON (followups, dimension, citations) + coverage, upcoming targets
+      - `error`:      if the interview brain fails
+    The `final` question is authoritative (grounding check / fallbacks applied).
+    """
+    if not session_id:
+        return JSONResponse(
+            status_code=400,
+            content={
+                "error": "missing_session_id",
+                "detail": "Provide 'session_id' from /startup_interview.",
+            },
+        )
+
+    sid = session_id
+    t_start = time.perf_counter()
+    prefetch = _start_prefetch(sid)
+    try:
+        text = await _transcribe_upload(file, language_hint)
+    except UploadRejected as e:
+        if prefetch:
+            prefetch.cancel()
+        return e.response(sid)
+    except Exception as e:
+        if prefetch:
+            prefetch.cancel()
+        return JSONResponse(
+            status_code=500,
+            content={
+                "session_id": sid,
+                "error": "transcription_failed",
+                "detail": str(e),
+            },
+        )
+    transcribe_ms = (time.perf_counter() - t_start) * 1000
+    item = await _record_transcript(sid, text)
+
+    async def events():
+        async for event, data in _turn_events(sid, text, item, prefetch, t_start, transcribe_ms):
+            yield _sse(event, data)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+# ---------- 4) Live answers over a WebSocket: transcribe segments while the candidate speaks ----------
+_BLOB_EXT = {"audio/webm": ".webm", "audio/ogg": ".ogg", "audio/wav": ".wav", "audio/mp4": ".m4a", "audio/mpeg": ".mp3"}
+
+
+class _LiveAnswer:
+    """
+    One answer in progress. PCM16 audio is cut into segments as it arrives and
+    each segment is transcribed concurrently, so when the answer ends only the
+    tail segment is still outstanding. "blob" frames are pieces of one encoded
+    recording (e.g. MediaRecorder timeslices: only the first carries the
+    container header), so they are joined and transcribed as one file at the end.
+    """
+    def __init__(self, sid: str, fmt: str, sample_rate: int, mime: str, language: Optional[str],
+                 send: Callable[[Dict[str, Any]], Any]):
+        self.sid, self.fmt, self.sample_rate, self.mime, self.language = sid, fmt, sample_rate, mime, language
+        self.segmenter = PCMSegmenter(sample_rate) if fmt == "pcm16" else None
+        self.tasks: List[asyncio.Task] = []
+        self.chunks: List[bytes] = []
+        self.prefetch: Optional[asyncio.Task] = None
+        self.bytes = 0
+        self.send = send
+
+    def feed(self, data: bytes) -> None:
+        if not self.bytes:
+            self.prefetch = _start_prefetch(self.sid)  # retrieval overlaps the whole answer
+        self.bytes += len(data)
+        if not self.segmenter:
+            self.chunks.append(data)
+            return
+        for seg in self.segmenter.feed(data):
+            self._submit(seg)
+
+    def _submit(self, audio: bytes) -> None:
+        idx = len(self.tasks)
+        if self.segmenter:
+            file = (f"segment-{idx}.wav", to_wav(audio, self.sample_rate), "audio/wav")
+        else:
+            file = (f"segment-{idx}{_BLOB_EXT.get(self.mime, '.webm')}", audio, self.mime)
+        self.tasks.append(asyncio.create_task(self._transcribe(idx, file)))
+
+    async def _transcribe(self, idx: int, file) -> str:
+        text = (await transcription.transcribe(file, language=self.language)).strip()
+        await brain_record_partial(self.sid, idx, text)
+        await self.send({"type": "segment", "index": idx, "text": text})
+        return text
+
+    async def finish(self) -> str:
+        tail = self.segmenter.flush() if self.segmenter else (b"".join(self.chunks) or None)
+        if tail is not None:
+            self._submit(tail)
+        texts = await asyncio.gather(*self.tasks)
+        return " ".join(t for t in texts if t)
+
+    def cancel(self) -> None:
+        for t in self.tasks + ([self.prefetch] if self.prefetch else []):
+            t.cancel()
+
+
+@app.websocket("/ws/transcribe")
+async def transcribe_ws(ws: WebSocket):
+    """
+    Live variant of /transcribe_stream. Protocol (JSON text frames unless noted):
+      -> {"type":"start","session_id", "format":"pcm16"|"blob", "sample_rate":16000 (8000-48000), "mime":"audio/webm",
+          "language"}
+      -> binary frames: raw mono little-endian PCM16 ("pcm16", segmented on silence / max window),
+         or consecutive pieces of one encoded recording ("blob", e.g. MediaRecorder timeslices;
+         transcribed as a whole on "end", so no rolling segments)
+      -> {"type":"end"}: the answer is over; the socket then carries the next answer
+      <- {"type":"segment","index","text"} as segments are transcribed (rolling transcript)
+      <- transcript / delta / final / error, as in /transcribe_stream
+    """
+    await ws.accept()
+    lock = asyncio.Lock()
+
+    async def send(msg: Dict[str, Any]) -> None:
+        async with lock:
+            await ws.send_json(msg)
+
+    try:
+        start = await ws.receive_json()
+    except (WebSocketDisconnect, ValueError):
+        return
+    if not isinstance(start, dict):
+        start = {}
+    sid = start.get("session_id")
+    fmt = start.get("format", "pcm16")
+    try:
+        sample_rate = int(start.get("sample_rate") or 16000)
+    except (TypeError, ValueError):
+        sample_rate = 0
+    if (start.get("type") != "start" or not sid or fmt not in ("pcm16", "blob")
+            or not MIN_SAMPLE_RATE <= sample_rate <= MAX_SAMPLE_RATE):
+        await send({"type": "error", "error": "bad_start",
+                    "detail": "First frame must be {\"type\":\"start\",\"session_id\":...,\"format\":\"pcm16\"|\"blob\"}, "
+                              f"with a sample_rate of {MIN_SAMPLE_RATE}-{MAX_SAMPLE_RATE} Hz if given."})
+        await ws.close(code=1008)
+        return
+
+    def new_answer() -> _LiveAnswer:
+        return _LiveAnswer(sid, fmt, sample_rate, start.get("mime") or "audio/webm", start.get("language"), send)
+
+    answer = new_answer()
+    try:
+        while True:
+            msg = await ws.receive()
+            if msg["type"] == "websocket.disconnect":
+                break
+            if msg.get("bytes") is not None:
+                if answer.bytes + len(msg["bytes"]) > MAX_UPLOAD_BYTES:
+                    answer.cancel()
+                    answer = new_answer()
+                    await send({"type": "error", "session_id": sid, "error": "upload_too_large",
+                                "detail": f"Answer audio exceeds {MAX_UPLOAD_BYTES} bytes; it was discarded."})
+                    continue
+                answer.feed(msg["bytes"])
+                continue
+            try:
+                kind = json.loads(msg.get("text") or "{}").get("type")
+            except (ValueError, AttributeError):
+                await send({"type": "error", "session_id": sid, "error": "bad_frame",
+                            "detail": "Text frames must be JSON objects such as {\"type\":\"end\"}."})
+                continue
+            if kind != "end":
+                continue
+
+            current, answer = answer, new_answer()
+            t_end = time.perf_counter()
+            try:
+                text = await current.finish()
+            except Exception as e:
+                current.cancel()
+                await send({"type": "error", "session_id": sid, "error": "transcription_failed", "detail": str(e)})
+                continue
+            tail_ms = (time.perf_counter() - t_end) * 1000  # what the candidate actually waited on
+            item = await _record_transcript(sid, text)
+            async for event, data in _turn_events(sid, text, item, current.prefetch, t_end, tail_ms):
+                await send({"type": event, **data})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        answer.cancel()